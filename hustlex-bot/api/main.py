@@ -1,14 +1,19 @@
 # api/main.py
-import os, hashlib, hmac, urllib.parse, re
+import os, sys, json, hashlib, hmac, urllib.parse, re
 from fastapi import FastAPI, Request, Form, UploadFile, File, HTTPException
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 import httpx
 from typing import Optional
 
+# Shares the bot's modules (and its CV store) when run from hustlex-bot/api
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bot.cv_store import CVStore, CVTooLarge, upload_chunks
+
 app = FastAPI()
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
 CHANNEL_ID = os.environ.get("CHANNEL_ID", "-1003194542999")
+cv_store = CVStore(os.environ.get("CV_STORE_DIR", "uploads/cv"))
 
 def verify_init_data(init_data_str: str, bot_token: str) -> bool:
     # init_data_str is the raw query-like string Telegram sends (contains hash param)
@@ -22,6 +27,16 @@ def verify_init_data(init_data_str: str, bot_token: str) -> bool:
     hmac_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
     return hmac_hash == hash_received
 
+def init_data_user_id(init_data_str: str):
+    """Telegram user id from initData (``user`` JSON, or the bot's own ``user_id=``)"""
+    params = dict(urllib.parse.parse_qsl(init_data_str, keep_blank_values=True))
+    try:
+        if "user" in params:
+            return int(json.loads(params["user"])["id"])
+        return int(params["user_id"])
+    except (KeyError, ValueError, TypeError):
+        return None
+
 @app.post("/api/profile")
 async def save_profile(
     name: str = Form(...),
@@ -49,14 +64,18 @@ async def save_profile(
     
     # Handle CV file if provided
     if cv_file:
-        # Save the CV file
-        file_path = f"uploads/cv/{cv_file.filename}"
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "wb") as f:
-            f.write(await cv_file.read())
+        # Stream the CV into the content-addressed store (same file for every user who has it)
+        user_id = init_data_user_id(init_data)
+        if user_id is None:
+            raise HTTPException(status_code=400, detail="initData has no user")
+        try:
+            stored = await cv_store.put(f"tg:{user_id}", upload_chunks(cv_file),
+                                        filename=cv_file.filename, mime_type=cv_file.content_type)
+        except CVTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
-        profile_data["cv_file_path"] = file_path
+        profile_data["cv_file_path"] = cv_store.path_for(stored["sha256"])
+        profile_data["cv_sha256"] = stored["sha256"]
     
     # Handle profile picture if provided
     if profile_pic:
@@ -1,8 +1,11 @@
 from flask import Flask, render_template, request, redirect, url_for
-import sqlite3, os, requests, html
+import os, requests, html
 from urllib.parse import urlparse
 from werkzeug.utils import secure_filename
 
+from bot.job_store import JobStore
+from bot.post_expiry import deadline_timestamp
+
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = "uploads"
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16 MB limit
@@ -10,6 +13,11 @@ app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16 MB limit
 BOT_TOKEN = os.getenv("BOT_TOKEN", "8034250378:AAH9wK5c10AC69BerzHz7zriXs3eI6X9B5A")
 CHANNEL_ID = os.getenv("CHANNEL_ID", "-1003194542999")
 WEBSITE_URL = os.getenv("WEBSITE_URL", "https://hustlexeth.netlify.app/")
+JOB_DEADLINE_UTC_OFFSET = float(os.getenv("JOB_DEADLINE_UTC_OFFSET", "3"))
+# Digest mode (see the bot): jobs are queued for the bot's next channel digest instead of posted
+DIGEST_INTERVAL_MINUTES = float(os.getenv("DIGEST_INTERVAL_MINUTES", "0"))
+
+job_store = JobStore(os.getenv("JOBS_DB", "jobs.db"))
 
 # Allowed extensions
 ALLOWED_EXTENSIONS = {"pdf", "docx", "png", "jpg", "jpeg"}
@@ -17,33 +25,9 @@ ALLOWED_EXTENSIONS = {"pdf", "docx", "png", "jpg", "jpeg"}
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# Save job to DB including file paths
+# Save job to DB including file paths (same store and search index the bot uses)
 def save_job(job_data):
-    conn = sqlite3.connect("jobs.db")
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            job_title TEXT, job_type TEXT, work_location TEXT,
-            salary TEXT, deadline TEXT, description TEXT,
-            client_type TEXT, company_name TEXT, verified TEXT,
-            previous_jobs TEXT, job_link TEXT,
-            cv_file TEXT, profile_image TEXT
-        )
-    """)
-    cur.execute("""
-        INSERT INTO jobs (job_title, job_type, work_location, salary, deadline, description,
-            client_type, company_name, verified, previous_jobs, job_link, cv_file, profile_image)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        job_data["job_title"], job_data["job_type"], job_data["work_location"],
-        job_data["salary"], job_data["deadline"], job_data["description"],
-        job_data["client_type"], job_data["company_name"], job_data["verified"],
-        job_data["previous_jobs"], job_data["job_link"],
-        job_data.get("cv_file"), job_data.get("profile_image")
-    ))
-    conn.commit()
-    conn.close()
+    return job_store.add(job_data, source="web")
 
 def _ensure_uploads_dir(path: str) -> None:
     try:
@@ -52,8 +36,8 @@ def _ensure_uploads_dir(path: str) -> None:
         print(f"[WARN] Could not ensure uploads directory '{path}': {e}")
 
 
-# Send job to Telegram channel (basic info only)
-def post_to_telegram(job_data):
+# Send job to Telegram channel (basic info only); the bot closes the post at the deadline
+def post_to_telegram(job_data, job_id=None):
     if not BOT_TOKEN:
         return False, "BOT_TOKEN environment variable is not set."
     if not CHANNEL_ID:
@@ -123,6 +107,9 @@ def post_to_telegram(job_data):
             ok = bool(data.get("ok"))
             if not ok:
                 details = data.get("description") or details
+            elif job_id is not None:
+                job_store.add_posts(job_id, [(CHANNEL_ID, data["result"]["message_id"])],
+                                    deadline_timestamp(job_data.get("deadline"), JOB_DEADLINE_UTC_OFFSET))
         except Exception:
             details = resp.text or details
         return ok, details if not ok else "Posted to Telegram"
@@ -199,8 +186,12 @@ def post_job():
             profile_image.save(img_path)
             job_data["profile_image"] = img_path
 
-        save_job(job_data)
-        ok, details = post_to_telegram(job_data)
+        job_id = save_job(job_data)
+        if DIGEST_INTERVAL_MINUTES > 0:
+            job_store.queue_digest([job_id])
+            ok, details = True, "Queued for the next channel digest"
+        else:
+            ok, details = post_to_telegram(job_data, job_id)
         if not ok:
             print(f"[ERROR] Telegram post failed: {details}")
         return render_template("success.html", posted=ok, details=details)
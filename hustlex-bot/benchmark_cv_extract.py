@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark: CV text extraction throughput (docs/sec and docs/sec per core) in the process pool.
+
+Synthetic CVs (half PDF with Flate-compressed pages, half DOCX) are extracted serially
+in this process, then through make_pool() at each worker count. The last part drives
+the pool from an event loop, like the bot does, and reports how long the loop stalled,
+next to parsing the same files on the loop itself.
+"""
+
+import io
+import os
+import sys
+import time
+import zlib
+import random
+import asyncio
+import zipfile
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.cv_extract import ExtractionPipeline, extract_cv, make_pool
+
+DOCS = int(os.getenv("BENCH_DOCS", "400"))
+PAGES = int(os.getenv("BENCH_PAGES", "3"))
+CORES = os.cpu_count() or 1
+WORKER_COUNTS = [int(n) for n in os.getenv("BENCH_WORKERS", ",".join(
+    str(n) for n in (1, 2, 4, 8) if n <= max(CORES, 1))).split(",")]
+
+SKILLS = ("Python", "Django", "React", "Flutter", "Excel", "SQL", "QuickBooks", "Peachtree", "AutoCAD",
+          "Figma", "Photoshop", "Accounting", "Bookkeeping", "Payroll", "Marketing", "SEO", "Amharic",
+          "English", "Networking", "Linux", "Java", "C++", "Node.js", "Tableau", "Procurement")
+WORDS = ("managed", "team", "delivered", "projects", "for", "clients", "in", "Addis", "Ababa", "with",
+         "responsible", "reporting", "monthly", "budget", "and", "improved", "process", "by", "customer",
+         "support", "designed", "implemented", "systems", "trained", "staff", "company", "years")
+
+
+def cv_lines(rng):
+    lines = [f"Candidate {rng.randrange(100000)}", "Curriculum Vitae", "Experience"]
+    for _ in range(PAGES * 40):
+        words = [rng.choice(WORDS) for _ in range(rng.randrange(6, 14))]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(SKILLS))
+        lines.append(" ".join(words))
+    lines.append("Skills: " + ", ".join(rng.sample(SKILLS, 6)))
+    return lines
+
+
+def make_pdf(lines) -> bytes:
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages = []
+    for start in range(0, len(lines), 45):
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines[start:start + 45]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"({escaped}) Tj T*")
+        ops.append("ET")
+        content = zlib.compress("\n".join(ops).encode("latin-1"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /Contents %d 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+                       % content_id)
+        pages.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page for page in pages), len(pages))
+    out = bytearray(b"%PDF-1.4\n")
+    for number, body in enumerate(objects, 1):
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    return bytes(out + b"trailer\n<< /Root 1 0 R >>\n%%EOF\n")
+
+
+def make_docx(lines) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{line}</w:t></w:r></w:p>" for line in lines)
+    xml = ('<?xml version="1.0" encoding="UTF-8"?><w:document '
+           'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+           f"<w:body>{body}</w:body></w:document>")
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", xml)
+    return out.getvalue()
+
+
+def make_corpus(directory):
+    rng = random.Random(22)
+    files = []
+    for number in range(DOCS):
+        kind = "pdf" if number % 2 == 0 else "docx"
+        path = os.path.join(directory, f"cv{number}.{kind}")
+        with open(path, "wb") as f:
+            f.write(make_pdf(cv_lines(rng)) if kind == "pdf" else make_docx(cv_lines(rng)))
+        files.append((path, kind))
+    return files
+
+
+async def loop_stall(run):
+    """Longest gap between 10 ms ticks of the event loop while ``run()`` is awaited"""
+    worst = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            worst = max(worst, now - last - 0.01)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    await run()
+    running = False
+    await task
+    return worst
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        files = make_corpus(directory)
+        size = sum(os.path.getsize(path) for path, _ in files) / len(files)
+        print(f"{DOCS} CVs ({PAGES} pages, {size / 1024:.1f} KB average), {CORES} cores")
+
+        start = time.perf_counter()
+        results = [extract_cv(path, kind) for path, kind in files]
+        serial = DOCS / (time.perf_counter() - start)
+        tokens = sum(len(result["tokens"]) for result in results) / DOCS
+        print(f"in-process:  {serial:8.1f} docs/s  ({tokens:.0f} unique tokens per CV)")
+
+        for workers in WORKER_COUNTS:
+            with make_pool(workers) as pool:
+                list(pool.map(extract_cv, *zip(*files[:workers])))   # start the workers
+                start = time.perf_counter()
+                list(pool.map(extract_cv, *zip(*files), chunksize=4))
+                rate = DOCS / (time.perf_counter() - start)
+            print(f"{workers} worker{'s' if workers > 1 else ' '}:   {rate:8.1f} docs/s  "
+                  f"{rate / min(workers, CORES):8.1f} docs/s per core")
+
+        # The bot's view: the loop keeps ticking while the pipeline works
+        async def on_loop():
+            for path, kind in files:
+                extract_cv(path, kind)
+
+        async def pipelined():
+            loop = asyncio.get_running_loop()
+            done = asyncio.Event()
+            saved = []
+
+            def save(sha256, result):   # called in a thread (asyncio.to_thread)
+                saved.append(result)
+                if len(saved) == DOCS:
+                    loop.call_soon_threadsafe(done.set)
+
+            pipeline = ExtractionPipeline(save, workers=min(CORES, 4), max_pending=DOCS)
+            await pipeline.start()
+            for number, (path, kind) in enumerate(files):
+                pipeline.submit(f"{number:064x}", path, kind)
+            await done.wait()
+            await pipeline.stop()
+
+        print()
+        print(f"event loop stall, parsing on the loop: {asyncio.run(loop_stall(on_loop)) * 1e3:8.1f} ms")
+        print(f"event loop stall, ExtractionPipeline:  {asyncio.run(loop_stall(pipelined)) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
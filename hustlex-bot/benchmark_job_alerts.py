@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: matching new jobs against 100k job-alert subscriptions (inverted index vs. scanning)
+"""
+
+import os
+import sys
+import time
+import random
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.job_alerts import AlertIndex, job_terms, spec_terms
+
+SUBSCRIPTIONS = int(os.getenv("BENCH_SUBSCRIPTIONS", "100000"))
+JOBS = int(os.getenv("BENCH_JOBS", "1000"))
+
+ROLES = ("developer", "engineer", "designer", "accountant", "analyst", "manager", "writer", "nurse",
+         "driver", "translator", "teacher", "tutor", "cashier", "receptionist", "architect", "pharmacist",
+         "electrician", "photographer", "editor", "marketer", "recruiter", "consultant", "auditor",
+         "technician", "researcher", "lawyer", "chef", "mechanic", "surveyor", "planner")
+SKILLS = ("python", "django", "react", "flutter", "kotlin", "php", "laravel", "excel", "sql", "figma",
+          "photoshop", "illustrator", "seo", "copywriting", "bookkeeping", "quickbooks", "peachtree",
+          "autocad", "revit", "sap", "tableau", "powerbi", "java", "golang", "aws", "linux", "networking",
+          "amharic", "oromo", "tigrinya", "arabic", "french", "english", "sales", "nursing", "pharmacy",
+          "logistics", "procurement", "payroll", "tax", "audit", "video", "animation", "wordpress",
+          "shopify", "android", "ios", "node", "vue", "angular", "devops", "security", "support")
+CITIES = ("Addis Ababa", "Remote", "Bahir Dar", "Hawassa", "Mekelle", "Adama", "Dire Dawa", "Gondar",
+          "Jimma", "Dessie", "Harar", "Arba Minch", "Debre Markos", "Shashemene", "Bishoftu", "Sodo",
+          "Nekemte", "Gambela", "Assosa", "Semera", "Jijiga", "Axum", "Lalibela", "Woldia")
+FILLER = ("the", "and", "to", "of", "a", "in", "for", "with", "we", "you", "our", "is", "are", "team",
+          "experience", "work", "years", "skills", "strong", "required", "apply", "good", "candidate")
+TYPES = ("Full-time", "Part-time", "Freelance", "Contract", "Internship")
+
+
+def make_job(rng):
+    skills = rng.sample(SKILLS, rng.randrange(2, 6))
+    description = [rng.choice(FILLER) for _ in range(rng.randrange(20, 60))] + skills
+    rng.shuffle(description)
+    return {
+        "job_title": f"{rng.choice(('Senior ', 'Junior ', ''))}{rng.choice(skills).title()} {rng.choice(ROLES).title()}",
+        "job_type": rng.choice(TYPES),
+        "work_location": rng.choice(CITIES),
+        "description": " ".join(description),
+        "company_name": f"Company {rng.randrange(500)}",
+    }
+
+
+def make_spec(rng):
+    """Alerts people actually set: a role and/or a skill, often a place, sometimes a job type"""
+    keywords = rng.choice(([rng.choice(ROLES)], [rng.choice(SKILLS)], [rng.choice(SKILLS), rng.choice(ROLES)]))
+    spec = {"keywords": keywords}
+    if rng.random() < 0.5:
+        spec["location"] = rng.choice(CITIES)
+    if rng.random() < 0.3:
+        spec["job_type"] = rng.choice(TYPES)
+    return spec
+
+
+def main():
+    rng = random.Random(11)
+    specs = [(sub_id, rng.randrange(1, SUBSCRIPTIONS // 2), spec_terms(make_spec(rng)))
+             for sub_id in range(SUBSCRIPTIONS)]
+    jobs = [job_terms(make_job(rng)) for _ in range(JOBS)]
+
+    start = time.perf_counter()
+    index = AlertIndex()
+    for sub_id, user_id, terms in specs:
+        index.add(sub_id, user_id, terms)
+    print(f"Indexed {len(index):,} subscriptions in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    matched = [index.match(terms) for terms in jobs]
+    indexed = (time.perf_counter() - start) / JOBS
+    avg_users = sum(len(users) for users in matched) / JOBS
+    print(f"inverted index: {indexed * 1e3:8.3f} ms/job  ({index.candidates_checked / JOBS:,.0f} candidates "
+          f"checked, {avg_users:,.0f} users matched per job)")
+
+    sample = jobs[:min(JOBS, 50)]
+    start = time.perf_counter()
+    scanned = [{user_id for _, user_id, terms in specs if terms <= job} for job in sample]
+    scan = (time.perf_counter() - start) / len(sample)
+    print(f"linear scan:    {scan * 1e3:8.3f} ms/job  (x{scan / indexed:.0f} slower)")
+    assert scanned == matched[:len(sample)]
+
+    # Same jobs against a tenth of the subscriptions: the index cost follows the matches
+    print()
+    for size in (SUBSCRIPTIONS // 10, SUBSCRIPTIONS):
+        subset = AlertIndex()
+        for sub_id, user_id, terms in specs[:size]:
+            subset.add(sub_id, user_id, terms)
+        start = time.perf_counter()
+        found = sum(len(subset.match(terms)) for terms in jobs)
+        per_job = (time.perf_counter() - start) / JOBS
+        print(f"{size:>8,} subscriptions: {per_job * 1e3:.3f} ms/job, {found / JOBS:,.0f} users matched per job")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /search latency over the FTS5 job index (100k jobs by default)
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.job_store import JobStore
+
+JOBS = int(os.getenv("BENCH_JOBS", "100000"))
+QUERIES = int(os.getenv("BENCH_QUERIES", "2000"))
+PAGE_SIZE = 5
+
+TITLES = ("Python Developer", "Frontend Engineer", "Graphic Designer", "Accountant", "Data Analyst",
+          "Sales Manager", "Content Writer", "Mobile Developer", "Project Manager", "Nurse",
+          "Civil Engineer", "Marketing Specialist", "Customer Support Agent", "Translator", "Driver")
+LOCATIONS = ("Addis Ababa", "Remote", "Bahir Dar", "Hawassa", "Mekelle", "Adama", "Dire Dawa", "Gondar")
+COMPANIES = ("Acme", "HustleX", "Ethio Telecom", "Safaricom", "Dashen Bank", "Gebeya", "Kifiya", "Chapa")
+# Description vocabulary with a Zipf-like frequency: filler words first, then domain
+# words, then a long tail of rarer terms (generated syllable words)
+FILLER = ("the", "and", "to", "of", "a", "in", "for", "with", "we", "you", "our", "is", "are", "on",
+          "will", "be", "work", "as", "your", "an", "at", "this", "who", "have", "job")
+WORDS = ("team", "experience", "remote", "flexible", "senior", "junior", "django", "react", "excel",
+         "design", "figma", "sql", "english", "amharic", "deadline", "contract", "startup", "growth")
+SYLLABLES = ("ka", "lo", "mi", "ne", "ra", "su", "te", "vo", "zi", "ba", "do", "ge")
+_TAIL = sorted({"".join(random.Random(n).choice(SYLLABLES) for _ in range(3 + n % 2)) for n in range(4000)})
+VOCABULARY = FILLER + WORDS + tuple(_TAIL)
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+SEARCHES = ("python", "pyth dev", "designer addis", "remote react", "accountant", "engineer bahir",
+            "data sql", "senior manager", "translator amharic", "nur", "hustlex developer", "gebeya remote")
+
+
+def make_job(rng, n):
+    return {
+        "job_title": f"{rng.choice(('Senior ', 'Junior ', ''))}{rng.choice(TITLES)}",
+        "job_type": rng.choice(("Full-time", "Part-time", "Freelance")),
+        "work_location": rng.choice(LOCATIONS),
+        "salary": f"{rng.randrange(5, 80) * 1000} ETB",
+        "deadline": "2026-12-31",
+        "description": " ".join(rng.choices(VOCABULARY, WEIGHTS, k=rng.randrange(15, 60))),
+        "client_type": rng.choice(("Private", "Other")),
+        "company_name": rng.choice(COMPANIES),
+        "verified": "No",
+        "previous_jobs": "None",
+        "job_link": f"https://hustlexeth.netlify.app/jobs/{n}",
+    }
+
+
+def main():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "jobs.db"))
+
+        start = time.perf_counter()
+        for offset in range(0, JOBS, 5000):
+            store.add_many([make_job(rng, n) for n in range(offset, min(JOBS, offset + 5000))], source="bench")
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {store.count():,} jobs in {elapsed:.1f}s ({elapsed / JOBS * 1e6:.0f} us/job incl. FTS5)")
+
+        # Incremental indexing: a single new job is searchable right away
+        start = time.perf_counter()
+        store.add({"job_title": "Quantum Blockchain Sommelier", "description": "one of a kind"}, source="bench")
+        added = time.perf_counter() - start
+        assert store.search("sommelier")[0][0]["job_title"] == "Quantum Blockchain Sommelier"
+        print(f"Single insert + index: {added * 1e3:.2f} ms\n")
+
+        for page in (0, 5):
+            timings = []
+            for n in range(QUERIES):
+                query = SEARCHES[n % len(SEARCHES)]
+                t0 = time.perf_counter()
+                store.search(query, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
+                timings.append((time.perf_counter() - t0) * 1e3)
+            timings.sort()
+            print(f"page {page + 1}: median {statistics.median(timings):.2f} ms, "
+                  f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, max {timings[-1]:.2f} ms")
+
+        print()
+        for query in SEARCHES:
+            t0 = time.perf_counter()
+            results, has_more = store.search(query, limit=PAGE_SIZE)
+            took = (time.perf_counter() - t0) * 1e3
+            top = results[0]["job_title"] if results else "-"
+            print(f"{query!r:<24} {took:6.2f} ms  top: {top}{'  (more)' if has_more else ''}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: update throughput of the sharded bot at 1/2/4/8 worker processes.
+
+Real worker processes (bot/main.py with BOT_ROLE=worker) handle /start updates from
+many users, routed by the same ShardRouter the ingress uses. Their Bot API calls go
+to a local fake Bot API served by several processes, so the fake is not the bottleneck.
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import multiprocessing
+
+from aiohttp import web
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.sharding import ShardRouter, WorkerProcess, WORKER_PATH, worker_env
+
+FAKE_TOKEN = "123456:TEST-TOKEN"
+WORKER_COUNTS = [int(n) for n in os.getenv("BENCH_WORKERS", "1,2,4,8").split(",")]
+USERS = int(os.getenv("BENCH_USERS", "2000"))
+UPDATES_PER_USER = int(os.getenv("BENCH_UPDATES_PER_USER", "5"))
+API_PROCESSES = int(os.getenv("BENCH_API_PROCESSES", str(min(8, os.cpu_count() or 1))))
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot", "main.py")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fake_api(port: int, replies):
+    """One fake Bot API process; all of them share ``port`` (SO_REUSEPORT) and ``replies``"""
+    async def handle(request):
+        method = request.match_info["method"]
+        params = await request.post()
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "HustleX", "username": "HustleXet_bot"}
+        elif method == "getChat":
+            result = {"id": int(params["chat_id"]), "type": "channel", "title": "HustleX Jobs"}
+        elif method == "getChatMember":
+            result = {"status": "administrator", "can_be_edited": False, "is_anonymous": False,
+                      "can_manage_chat": True, "can_delete_messages": True, "can_manage_video_chats": True,
+                      "can_restrict_members": True, "can_promote_members": False, "can_change_info": True,
+                      "can_invite_users": True, "can_post_messages": True,
+                      "user": {"id": 123456, "is_bot": True, "first_name": "HustleX"}}
+        elif method == "sendMessage":
+            with replies.get_lock():
+                replies.value += 1
+            result = {"message_id": 1, "date": int(time.time()),
+                      "chat": {"id": int(params["chat_id"]), "type": "private"}, "text": params.get("text", "")}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+    web.run_app(app, host="127.0.0.1", port=port, reuse_port=True, access_log=None, print=None)
+
+
+def start_update(update_id: int, user_id: int) -> dict:
+    return {"update_id": update_id, "message": {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+        "text": "/start",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+    }}
+
+
+async def wait_for(replies, target: int, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    while replies.value < target:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"only {replies.value}/{target} replies")
+        await asyncio.sleep(0.01)
+
+
+async def run(workers: int, api_port: int, replies, tmp: str) -> float:
+    os.environ.update({
+        "BOT_TOKEN": FAKE_TOKEN,
+        "BOT_API_BASE_URL": f"http://127.0.0.1:{api_port}/bot",
+        "USER_STATE_DB": os.path.join(tmp, f"state_{workers}.db"),
+        "JOBS_DB": os.path.join(tmp, f"jobs_{workers}.db"),
+        "SEND_GLOBAL_RATE": "100000",  # the fake API has no flood limits
+    })
+    ports = [free_port() for _ in range(workers)]
+    secret = "bench"
+    processes = [WorkerProcess(i, [sys.executable, MAIN], worker_env(i, workers, port, secret))
+                 for i, port in enumerate(ports)]
+    router = ShardRouter([f"http://127.0.0.1:{port}{WORKER_PATH}" for port in ports], secret)
+    for process in processes:
+        process.start()
+    await router.start()
+    try:
+        # Warm-up: one user per shard, so every worker has started and answered
+        base = replies.value
+        for i in range(workers):
+            await router.route(start_update(i + 1, i + 1))
+        await wait_for(replies, base + workers)
+
+        updates = [start_update(10 + n, 1000 + n % USERS) for n in range(USERS * UPDATES_PER_USER)]
+        base = replies.value
+        start = time.perf_counter()
+        for data in updates:
+            await router.route(data)
+        await wait_for(replies, base + len(updates))
+        return len(updates) / (time.perf_counter() - start)
+    finally:
+        await router.stop()
+        await asyncio.gather(*(process.stop() for process in processes))
+
+
+def main():
+    context = multiprocessing.get_context("spawn")
+    replies = context.Value("q", 0)
+    api_port = free_port()
+    api = [context.Process(target=fake_api, args=(api_port, replies), daemon=True) for _ in range(API_PROCESSES)]
+    for process in api:
+        process.start()
+    time.sleep(1.5)
+
+    print(f"{USERS:,} users x {UPDATES_PER_USER} /start updates, {API_PROCESSES} fake Bot API processes, "
+          f"{os.cpu_count()} CPUs\n")
+    baseline = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in WORKER_COUNTS:
+                rate = asyncio.run(run(workers, api_port, replies, tmp))
+                baseline = baseline or rate
+                print(f"{workers} worker(s): {rate:>8.0f} updates/s   (x{rate / baseline:.2f})")
+    finally:
+        for process in api:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite-backed user state store vs. the plain dicts it replaces
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.user_store import UserStore
+
+USERS = int(os.getenv("BENCH_USERS", "50000"))
+LOOKUPS = int(os.getenv("BENCH_LOOKUPS", "1000000"))
+LANGS = ('en', 'es', 'fr', 'de', 'it', 'pt', 'am')
+
+
+def per_op(label, ops, seconds):
+    print(f"{label:<42} {seconds / ops * 1e9:>10.0f} ns/op   ({ops:,} ops in {seconds:.3f}s)")
+
+
+def bench_lookups(name, get, ids):
+    start = time.perf_counter()
+    for user_id in ids:
+        get(user_id, 'en')
+    per_op(name, len(ids), time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(7)
+    user_ids = list(range(1, USERS + 1))
+    lookup_ids = [rng.choice(user_ids) for _ in range(LOOKUPS)]
+
+    print(f"{USERS:,} users, {LOOKUPS:,} lookups\n")
+
+    # Baseline: the old module-level dict
+    plain = {user_id: rng.choice(LANGS) for user_id in user_ids}
+    bench_lookups("dict.get (old user_languages)", plain.get, lookup_ids)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = UserStore(os.path.join(tmp, "user_state.db"), max_hot=USERS * 2)
+        store.open()
+        languages = store.table("languages")
+
+        # Writes: memory update + dirty mark, then one batched flush
+        start = time.perf_counter()
+        for user_id in user_ids:
+            languages[user_id] = plain[user_id]
+        per_op("store write (hot layer + dirty mark)", USERS, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        store.flush_sync()
+        per_op("write-behind flush (per row)", USERS, time.perf_counter() - start)
+
+        # Warm reads come straight from the hot layer
+        bench_lookups("store.get, hot", languages.get, lookup_ids)
+
+        # Cold reads: a fresh store over the same file reads each row through once
+        cold = UserStore(store.path, max_hot=USERS * 2)
+        cold.open()
+        cold_languages = cold.table("languages")
+        sample = user_ids[:min(USERS, 20000)]
+        start = time.perf_counter()
+        for user_id in sample:
+            cold_languages.get(user_id, 'en')
+        per_op("store.get, cold (SQLite read-through)", len(sample), time.perf_counter() - start)
+
+        # Users without a row are cached as absent after the first miss
+        missing = [USERS + i for i in range(1, 1001)]
+        for user_id in missing:
+            cold_languages.get(user_id, 'en')
+        bench_lookups("store.get, known-missing user", cold_languages.get, missing * 100)
+
+        assert all(cold_languages.get(user_id) == plain[user_id] for user_id in sample)
+        print(f"\nstore stats: {store.stats()}")
+
+
+if __name__ == "__main__":
+    main()
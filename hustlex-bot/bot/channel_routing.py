@@ -0,0 +1,167 @@
+# bot/channel_routing.py
+# Job -> target channel routing rules and concurrent multi-channel posting
+import asyncio
+import json
+import logging
+import re
+
+from telegram.error import BadRequest, Forbidden, TelegramError, TimedOut
+
+logger = logging.getLogger(__name__)
+
+ROUTED_FIELDS = ("job_type", "work_location", "client_type")
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(value) -> str:
+    """Routing form of a field value: case-folded words ("Full-time" -> "full time")"""
+    return " ".join(_SEPARATORS.split(str(value).casefold())).strip()
+
+
+class RoutingTable:
+    """Maps a job's ``job_type`` / ``work_location`` / ``client_type`` to channels.
+
+    Each rule lists accepted values for some of the routed fields (a missing field
+    accepts anything) and the channels it posts to, e.g.::
+
+        [{"job_type": ["Freelance", "Part-time"], "channels": ["-1001", "@gigs"]},
+         {"work_location": "Remote", "client_type": "Private", "channels": ["-1002"]}]
+
+    A job goes to the union of the channels of every matching rule, or to
+    ``default_channels`` when no rule matches. The rules are compiled once into a
+    bitset per (field, value), so matching is a few dict lookups and ANDs no matter
+    how many rules there are.
+    """
+
+    def __init__(self, rules=(), default_channels=()):
+        self.default_channels = tuple(dict.fromkeys(str(c) for c in default_channels))
+        self.rules = list(rules)
+        self._compile()
+
+    def _compile(self):
+        self._index = {field: {} for field in ROUTED_FIELDS}
+        self._wildcard = {field: 0 for field in ROUTED_FIELDS}
+        self._rule_channels = []
+        for position, rule in enumerate(self.rules):
+            bit = 1 << position
+            unknown = set(rule) - set(ROUTED_FIELDS) - {"channels"}
+            if unknown:
+                raise ValueError(f"Routing rule {position}: unknown fields {sorted(unknown)}")
+            channels = rule.get("channels")
+            if not channels:
+                raise ValueError(f"Routing rule {position} has no channels")
+            if isinstance(channels, (str, int)):
+                channels = [channels]
+            self._rule_channels.append(tuple(str(c) for c in channels))
+            for field in ROUTED_FIELDS:
+                values = rule.get(field)
+                if values is None:
+                    self._wildcard[field] |= bit
+                    continue
+                if isinstance(values, str):
+                    values = [values]
+                index = self._index[field]
+                for value in values:
+                    key = normalize(value)
+                    index[key] = index.get(key, 0) | bit
+        self._all_rules = (1 << len(self.rules)) - 1
+        self._cache = {}
+
+    @classmethod
+    def from_json(cls, raw: str, default_channels=()):
+        """Table from a JSON rule list; an empty/invalid value leaves only the defaults"""
+        if not raw:
+            return cls((), default_channels)
+        try:
+            return cls(json.loads(raw), default_channels)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error(f"Invalid channel routing rules, posting to the default channel only: {e}")
+            return cls((), default_channels)
+
+    def channels_for(self, job: dict) -> tuple:
+        key = tuple(normalize(job.get(field, "")) for field in ROUTED_FIELDS)
+        channels = self._cache.get(key)
+        if channels is None:
+            matched = self._all_rules
+            for field, value in zip(ROUTED_FIELDS, key):
+                matched &= self._index[field].get(value, 0) | self._wildcard[field]
+                if not matched:
+                    break
+            found = {}
+            while matched:
+                low = matched & -matched
+                found.update(dict.fromkeys(self._rule_channels[low.bit_length() - 1]))
+                matched ^= low
+            channels = tuple(found) or self.default_channels
+            if len(self._cache) > 4096:
+                self._cache.clear()
+            self._cache[key] = channels
+        return channels
+
+    def all_channels(self) -> tuple:
+        found = dict.fromkeys(self.default_channels)
+        for channels in self._rule_channels:
+            found.update(dict.fromkeys(channels))
+        return tuple(found)
+
+
+class ChannelResult:
+    """Outcome of posting one job to one channel"""
+
+    __slots__ = ("channel_id", "message", "error", "attempts")
+
+    def __init__(self, channel_id: str):
+        self.channel_id = channel_id
+        self.message = None
+        self.error = None
+        self.attempts = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.message is not None
+
+    @property
+    def uncertain(self) -> bool:
+        """Timed out: Telegram may have posted it all the same"""
+        return isinstance(self.error, TimedOut)
+
+    @property
+    def retryable(self) -> bool:
+        # Bad markup, missing channel or missing rights fail the same way next time;
+        # a timed-out post may already be in the channel, and sending again would double it
+        return not self.ok and not isinstance(self.error, (BadRequest, Forbidden, TimedOut))
+
+    def __repr__(self):
+        return f"ChannelResult({self.channel_id!r}, ok={self.ok}, attempts={self.attempts}, error={self.error!r})"
+
+
+async def fan_out(channels, post, attempts: int = 3, retry_delay: float = 2.0) -> dict:
+    """Post to every channel at once with ``post(channel_id)``; returns channel -> ChannelResult.
+
+    Channels that fail with a transient error are retried (only those; channels
+    that already have their post are never sent to again) up to ``attempts``
+    times. A timeout is not retried: the post may have gone out anyway.
+    """
+    results = {str(channel_id): ChannelResult(str(channel_id)) for channel_id in channels}
+
+    async def attempt(result: ChannelResult):
+        result.attempts += 1
+        try:
+            result.message = await post(result.channel_id)
+            result.error = None
+        except TelegramError as e:
+            result.error = e
+
+    pending = list(results.values())
+    for round_number in range(attempts):
+        if round_number:
+            await asyncio.sleep(retry_delay * 2 ** (round_number - 1))
+        await asyncio.gather(*(attempt(r) for r in pending))
+        pending = [r for r in pending if r.retryable]
+        if not pending:
+            break
+    failed = [r for r in results.values() if not r.ok]
+    if failed:
+        logger.warning(f"Job posted to {len(results) - len(failed)}/{len(results)} channels; failed: {failed}")
+    return results
@@ -0,0 +1,139 @@
+# bot/channel_state.py
+# Cached channel validity / bot permission state for job posting
+import logging
+import time
+from collections import OrderedDict
+
+from telegram import Chat, ChatMember
+from telegram.error import BadRequest, NetworkError, TelegramError
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelState:
+    """What we know about one target channel.
+
+    ``error`` is set when the channel could not be checked at all (network error,
+    timeout): such a state says nothing about the channel and is not cached.
+    """
+
+    __slots__ = ("channel_id", "valid", "title", "can_post", "checked_at", "error")
+
+    def __init__(self, channel_id: str, valid: bool, title: str = None, can_post: bool = False, error=None):
+        self.channel_id = channel_id
+        self.valid = valid
+        self.title = title
+        self.can_post = can_post
+        self.error = error
+        self.checked_at = time.monotonic()
+
+    def __repr__(self):
+        return f"ChannelState({self.channel_id!r}, valid={self.valid}, can_post={self.can_post})"
+
+
+def is_transient(error) -> bool:
+    """No answer from Telegram (network error, timeout); BadRequest subclasses NetworkError but is an answer"""
+    return isinstance(error, NetworkError) and not isinstance(error, BadRequest)
+
+
+def member_can_post(member) -> bool:
+    """Whether a ChatMember (the bot's own) allows posting messages"""
+    if member.status == ChatMember.OWNER:
+        return True
+    if member.status != ChatMember.ADMINISTRATOR:
+        return False
+    # can_post_messages is only set for channels; group admins can always send
+    return getattr(member, "can_post_messages", None) is not False
+
+
+class ChannelStateCache:
+    """Channel state keyed by channel id, filled at startup and kept by invalidation.
+
+    Entries are refreshed with ``get_chat`` + ``get_chat_member`` only when missing
+    (or older than ``ttl``). ``my_chat_member`` updates patch the entry in place and
+    a failed send drops it, so the normal posting path needs no extra API calls.
+    At most ``max_size`` keys are kept; the least recently used go first (the bot
+    is added to groups it never posts to, and each one sends my_chat_member).
+    """
+
+    def __init__(self, ttl: float = 6 * 3600, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._states = OrderedDict()
+
+    def get(self, channel_id):
+        key = str(channel_id)
+        state = self._states.get(key)
+        if state is None or time.monotonic() - state.checked_at > self.ttl:
+            return None
+        self._states.move_to_end(key)
+        return state
+
+    def _put(self, key, state):
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+    def invalidate(self, channel_id):
+        state = self._states.pop(str(channel_id), None)
+        if state is not None:
+            # Drop the @username alias of the same entry as well
+            for key in [k for k, v in self._states.items() if v is state]:
+                del self._states[key]
+            logger.info(f"Channel state for {channel_id} invalidated")
+
+    async def refresh(self, bot, channel_id) -> ChannelState:
+        """Check the channel with the API and cache the result; a transient failure is returned, not cached"""
+        key = str(channel_id)
+        try:
+            chat_info = await bot.get_chat(chat_id=channel_id)
+        except TelegramError as e:
+            if is_transient(e):
+                logger.warning(f"Could not check channel {channel_id}, will check again: {e}")
+                return ChannelState(key, valid=False, error=e)
+            logger.error(f"Invalid channel ID {channel_id}: {e}")
+            state = ChannelState(key, valid=False)
+            self._put(key, state)
+            return state
+
+        try:
+            bot_member = await bot.get_chat_member(chat_id=channel_id, user_id=bot.id)
+            can_post = member_can_post(bot_member)
+        except TelegramError as e:
+            if is_transient(e):
+                logger.warning(f"Could not check bot permissions in channel {channel_id}, will check again: {e}")
+                return ChannelState(key, valid=True, title=chat_info.title, error=e)
+            logger.error(f"Error checking bot permissions in channel {channel_id}: {e}")
+            can_post = False
+        if can_post:
+            logger.info(f"Bot has necessary permissions in channel {channel_id} ({chat_info.title})")
+        else:
+            logger.warning(f"Bot cannot post in channel {channel_id} ({chat_info.title})")
+
+        state = ChannelState(key, valid=True, title=chat_info.title, can_post=can_post)
+        self._put(key, state)
+        if chat_info.username:
+            self._put(f"@{chat_info.username}", state)
+        return state
+
+    async def ensure(self, bot, channel_id) -> ChannelState:
+        """Cached state, fetching it only on a miss"""
+        return self.get(channel_id) or await self.refresh(bot, channel_id)
+
+    def apply_member_update(self, chat_member_updated):
+        """Update the entry from a my_chat_member update without any API call"""
+        chat = chat_member_updated.chat
+        if chat.type == Chat.PRIVATE:
+            return  # a user blocked or unblocked the bot: not a posting target
+        member = chat_member_updated.new_chat_member
+        keys = [str(chat.id)]
+        if chat.username:
+            keys.append(f"@{chat.username}")
+        if member.status in (ChatMember.LEFT, ChatMember.BANNED):
+            state = ChannelState(str(chat.id), valid=False, title=chat.title)
+        else:
+            state = ChannelState(str(chat.id), valid=True, title=chat.title, can_post=member_can_post(member))
+        for key in keys:
+            self._put(key, state)
+        logger.info(f"Channel state updated from my_chat_member: {state}")
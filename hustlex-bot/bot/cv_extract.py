@@ -0,0 +1,401 @@
+# bot/cv_extract.py
+# CV text extraction in a process pool: pure-Python PDF/DOCX readers, token normalisation, the pipeline
+import asyncio
+import io
+import logging
+import multiprocessing
+import re
+import signal
+import sqlite3
+import zipfile
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r"[^\W_]+(?:[+#.][^\W_]*)*")
+
+# Frequent words that say nothing about a candidate
+STOPWORDS = frozenset("""
+a an and are as at be been by for from has have he her his i in is it its me my of on or our she that the
+their them they this to was we were will with you your am can do did not no so than then there these those
+who whom which what when where why how all any each few more most other some such only own same too very
+s t just also into over under about after before during through up down out off again further once here
+""".split())
+
+# Skill terms recognised for the "skills" view (matched on the normalised tokens)
+SKILL_TERMS = frozenset("""
+python java javascript typescript kotlin swift php laravel django flask react vue angular node nodejs flutter
+android ios html css sql mysql postgresql mongodb excel powerpoint word access quickbooks peachtree sap
+tableau powerbi figma photoshop illustrator autocad revit linux aws azure docker kubernetes git devops
+networking security accounting bookkeeping auditing payroll tax finance marketing sales seo copywriting
+translation amharic oromo tigrinya arabic french english nursing pharmacy logistics procurement
+management leadership communication teamwork research statistics spss stata r c c++ c# golang rust
+""".split())
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Limits against decompression bombs: a CV is a few pages of text
+MAX_PART = 8 * 1024 * 1024      # Bytes of one DOCX XML part or one decompressed PDF stream
+MAX_DECODED = 64 * 1024 * 1024  # Decompressed PDF stream bytes per file
+MAX_TEXT = 200_000              # Characters of text kept per CV
+
+
+# ---------------------------
+# DOCX
+# ---------------------------
+def extract_docx(data: bytes) -> str:
+    """Paragraph text of a .docx (body, headers and footers), from its XML parts"""
+    lines, size = [], 0
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        parts = [info for info in archive.infolist()
+                 if info.filename == "word/document.xml" or re.match(r"word/(header|footer)\d*\.xml$", info.filename)]
+        for info in parts:
+            if info.file_size > MAX_PART:
+                raise ValueError(f"{info.filename} is {info.file_size} bytes uncompressed")
+            with archive.open(info) as part:
+                xml = part.read(MAX_PART + 1)   # the size in the header may lie
+            if len(xml) > MAX_PART:
+                raise ValueError(f"{info.filename} is over {MAX_PART} bytes uncompressed")
+            root = ElementTree.fromstring(xml)
+            for paragraph in root.iter(f"{WORD_NS}p"):
+                text = []
+                for node in paragraph.iter():
+                    if node.tag == f"{WORD_NS}t" and node.text:
+                        text.append(node.text)
+                    elif node.tag in (f"{WORD_NS}tab", f"{WORD_NS}br"):
+                        text.append(" ")
+                if text:
+                    lines.append("".join(text))
+                    size += len(lines[-1]) + 1
+                    if size > MAX_TEXT:
+                        return "\n".join(lines)[:MAX_TEXT]
+    return "\n".join(lines)
+
+
+# ---------------------------
+# PDF
+# ---------------------------
+_STREAM = re.compile(rb"<<((?:[^<>]|<<(?:[^<>]|<<[^<>]*>>)*>>|<[^<>]*>)*)>>\s*stream\r?\n", re.S)
+_CONTENT_TOKENS = re.compile(
+    rb"\((?:\\.|[^\\()]|\((?:\\.|[^\\()])*\))*\)"   # literal string (one level of nested parens)
+    rb"|<[0-9A-Fa-f\s]*>"                          # hex string
+    rb"|\[|\]"                                     # array brackets
+    rb"|[A-Za-z'\"*]+"                             # operators (and names without their slash)
+    rb"|/[^\s/\[\]()<>]+"                          # names
+    rb"|[-+]?\d*\.?\d+",                           # numbers
+    re.S,
+)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+            b"(": b"(", b")": b")", b"\\": b"\\"}
+
+
+def _pdf_streams(data: bytes):
+    """(dictionary, decoded bytes) of every stream object, skipping images and embedded fonts.
+
+    A stream is cut at MAX_PART decompressed bytes, and decoding stops once the
+    file's streams add up to MAX_DECODED.
+    """
+    budget = MAX_DECODED
+    for match in _STREAM.finditer(data):
+        header = match.group(1)
+        start = match.end()
+        length = re.search(rb"/Length\s+(\d+)(?!\s+\d+\s+R)", header)
+        end = start + int(length.group(1)) if length else data.find(b"endstream", start)
+        if end < start or data[end:end + 30].find(b"endstream") < 0:
+            end = data.find(b"endstream", start)
+        if end < 0:
+            continue
+        if re.search(rb"/Subtype\s*/Image|/Length1|/Length2|/Length3|/FontFile|/Type\s*/XRef", header):
+            continue
+        raw = data[start:end]
+        if b"/FlateDecode" in header:
+            try:
+                raw = zlib.decompressobj().decompress(raw, min(MAX_PART, budget))
+            except zlib.error:
+                continue
+            budget -= len(raw)
+        elif b"/Filter" in header:
+            continue  # DCT, LZW, ... carry no text we can read
+        yield header, raw
+        if budget <= 0:
+            return
+
+
+def _literal(token: bytes) -> bytes:
+    body, out, i = token[1:-1], bytearray(), 0
+    while i < len(body):
+        byte = body[i:i + 1]
+        if byte != b"\\":
+            out += byte
+            i += 1
+            continue
+        nxt = body[i + 1:i + 2]
+        if nxt in _ESCAPES:
+            out += _ESCAPES[nxt]
+            i += 2
+        elif nxt.isdigit():
+            octal = re.match(rb"[0-7]{1,3}", body[i + 1:i + 4]).group(0)
+            out.append(int(octal, 8) & 0xFF)
+            i += 1 + len(octal)
+        else:
+            i += 2  # line continuation or unknown escape
+    return bytes(out)
+
+
+def _cmap(stream: bytes) -> dict:
+    """ToUnicode CMap: character code (bytes) -> text"""
+    mapping = {}
+
+    def text(hex_value):
+        raw = bytes.fromhex(hex_value.decode())
+        return raw.decode("utf-16-be", "ignore")
+
+    for block in re.findall(rb"beginbfchar(.*?)endbfchar", stream, re.S):
+        for src, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>", block):
+            mapping[bytes.fromhex(src.decode())] = text(dst)
+    for block in re.findall(rb"beginbfrange(.*?)endbfrange", stream, re.S):
+        for low, high, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>", block):
+            width = len(low) // 2
+            start, stop, first = int(low, 16), int(high, 16), int(dst, 16)
+            for offset in range(min(stop - start + 1, 65536)):
+                mapping[(start + offset).to_bytes(width, "big")] = chr(min(first + offset, 0x10FFFF))
+    return mapping
+
+
+def _decode(raw: bytes, cmap: dict, widths: set) -> str:
+    if cmap:
+        out, i = [], 0
+        while i < len(raw):
+            for width in widths:
+                piece = cmap.get(raw[i:i + width])
+                if piece is not None:
+                    out.append(piece)
+                    i += width
+                    break
+            else:
+                out.append(chr(raw[i]) if 32 <= raw[i] < 127 else "")
+                i += 1
+        return "".join(out)
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", "ignore")
+    return raw.decode("cp1252", "ignore")
+
+
+def extract_pdf(data: bytes) -> str:
+    """Text shown by the content streams of a PDF (Tj/TJ/'/" operators).
+
+    Good enough for CVs exported by word processors: Flate-compressed streams,
+    simple fonts and ToUnicode maps (merged across fonts). Scanned CVs have no
+    text to find, and encrypted ones are not readable this way.
+    """
+    streams = list(_pdf_streams(data))
+    cmap = {}
+    for _, stream in streams:
+        if b"begincmap" in stream:
+            cmap.update(_cmap(stream))
+    widths = sorted({len(code) for code in cmap}, reverse=True)
+    lines, line, size = [], [], 0
+    for header, stream in streams:
+        if b"begincmap" in stream or b"BT" not in stream:
+            continue
+        operands = []
+        for match in _CONTENT_TOKENS.finditer(stream):
+            if size > MAX_TEXT:
+                break
+            token = match.group(0)
+            first = token[:1]
+            if first == b"(":
+                operands.append(_decode(_literal(token), cmap, widths))
+            elif first == b"<":
+                digits = re.sub(rb"\s", b"", token[1:-1])
+                digits += b"0" * (len(digits) % 2)  # an odd final digit is padded with 0
+                operands.append(_decode(bytes.fromhex(digits.decode()), cmap, widths))
+            elif first.isdigit() or first in b"-+.":
+                # Big negative TJ kerning means a word gap
+                operands.append(float(token) if token.strip(b"-+.") else 0.0)
+            elif token in (b"Tj", b"TJ", b"'", b'"'):
+                if token in (b"'", b'"') and line:
+                    lines.append("".join(line))
+                    line = []
+                for operand in operands:
+                    if isinstance(operand, str):
+                        line.append(operand)
+                        size += len(operand)
+                    elif token == b"TJ" and operand < -200:
+                        line.append(" ")
+                operands = []
+            elif token in (b"T*", b"ET", b"Td", b"TD", b"Tm"):
+                # A move without vertical offset (Td/TD with ty 0) stays on the same line
+                same_line = token in (b"Td", b"TD") and len(operands) >= 2 and not operands[-1]
+                if line and not same_line:
+                    lines.append("".join(line))
+                    line = []
+                operands = []
+            elif token not in (b"[", b"]") and first != b"/":
+                operands = []
+    if line:
+        lines.append("".join(line))
+    return "\n".join(lines)[:MAX_TEXT]
+
+
+# ---------------------------
+# Tokens
+# ---------------------------
+def tokenize(text: str) -> list:
+    """Case-folded words of a CV without stopwords and bare numbers ("C++", "node.js" kept whole)"""
+    tokens = []
+    for word in _WORDS.findall(text.casefold()):
+        word = word.rstrip(".")
+        if len(word) < 2 and word not in ("c", "r"):
+            continue
+        if word in STOPWORDS or word.isdigit():
+            continue
+        tokens.append(word)
+    return tokens
+
+
+def extract_cv(path: str, kind: str, timeout: float = 0) -> dict:
+    """Worker entry point: text statistics, ordered unique tokens and skills of one CV file.
+
+    ``timeout`` (seconds) is enforced inside the worker with SIGALRM, so a file
+    that sends the parser into a very long loop frees its worker again.
+    """
+    if timeout and hasattr(signal, "SIGALRM"):
+        def expired(signum, frame):
+            raise TimeoutError(f"extraction took longer than {timeout:g}s")
+        signal.signal(signal.SIGALRM, expired)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        text = extract_pdf(data) if kind == "pdf" else extract_docx(data)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+        skills = sorted({token for token in counts if token in SKILL_TERMS}, key=lambda t: (-counts[t], t))
+        return {"chars": len(text), "tokens": list(dict.fromkeys(tokens)), "skills": skills}
+    finally:
+        if timeout and hasattr(signal, "SIGALRM"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def cv_kind(filename: str, mime_type: str = None):
+    name = (filename or "").lower()
+    if name.endswith(".pdf") or mime_type == "application/pdf":
+        return "pdf"
+    if name.endswith(".docx") or (mime_type or "").endswith("wordprocessingml.document"):
+        return "docx"
+    return None
+
+
+def make_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers are forked from a fork server, not from the bot's process.
+
+    The server imports the main script and this module once, so new workers start
+    with them loaded but without the bot's event loop, sockets or database handles.
+    Where there is no fork server, workers are spawned.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["__main__", __name__])
+    else:
+        context = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+# ---------------------------
+# Pipeline
+# ---------------------------
+class ExtractionPipeline:
+    """Extracts uploaded CVs off the event loop and saves the results with ``save(sha256, result)``.
+
+    :meth:`submit` never waits. At most ``max_pending`` CVs are queued, and past
+    that it returns False, so a burst of uploads cannot grow memory or delay
+    without bound. ``workers`` asyncio tasks each feed a pool of their own with
+    one process, so replacing a worker never breaks another task's job. Each
+    job gets ``timeout`` seconds inside its worker. The loop stops waiting a
+    little later in case the worker itself hangs, and then replaces that pool.
+    """
+
+    def __init__(self, save, workers: int = 1, max_pending: int = 100, timeout: float = 20):
+        self.save = save
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._queue = None
+        self._pools = []        # one single-process pool per task
+        self._tasks = []
+        self.done = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, sha256: str, path: str, kind: str) -> bool:
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait((sha256, path, kind))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"CV extraction queue full ({self.max_pending}), skipped {sha256[:12]}")
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _work(self, index: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            sha256, path, kind = await self._queue.get()
+            try:
+                future = loop.run_in_executor(self._pools[index], extract_cv, path, kind, self.timeout)
+                result = await asyncio.wait_for(future, self.timeout + 5)
+            except asyncio.TimeoutError:
+                logger.error(f"CV extraction of {sha256[:12]} hung, restarting worker {index}")
+                self._restart_pool(index)
+                result = {"error": "timeout"}
+            except BrokenProcessPool:
+                logger.error(f"CV extraction worker {index} died on {sha256[:12]}, restarting it")
+                self._restart_pool(index)
+                result = {"error": "worker crashed"}
+            except Exception as e:
+                # Unreadable or malformed file (bad zip/XML, TimeoutError from the worker's alarm...)
+                result = {"error": f"{type(e).__name__}: {e}"}
+            finally:
+                self._queue.task_done()
+            if "error" in result:
+                self.failed += 1
+                logger.info(f"CV {sha256[:12]} not extracted: {result['error']}")
+            else:
+                self.done += 1
+            try:
+                await asyncio.to_thread(self.save, sha256, result)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to save extracted CV text for {sha256[:12]}: {e}")
+
+    def _restart_pool(self, index: int):
+        old = self._pools[index]
+        self._pools[index] = make_pool(1)
+        for process in list(getattr(old, "_processes", {}).values()):
+            process.terminate()
+        old.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_pending)
+        self._pools = [make_pool(1) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(index)) for index in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for pool in self._pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools = []
+        self._queue = None
+        logger.info(f"CV extraction stopped: {self.done} extracted, {self.failed} failed, "
+                    f"{self.rejected} rejected (queue full)")
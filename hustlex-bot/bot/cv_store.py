@@ -0,0 +1,281 @@
+# bot/cv_store.py
+# Content-addressed CV storage: streamed to disk under their SHA-256, shared and reference-counted
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from bot.cv_extract import tokenize
+from bot.user_store import connect
+
+logger = logging.getLogger(__name__)
+
+MAX_CV_BYTES = 16 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cv_blobs (
+        sha256 TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        refs INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS cv_refs (
+        owner TEXT PRIMARY KEY,
+        sha256 TEXT NOT NULL,
+        filename TEXT,
+        mime_type TEXT,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    # Text extracted from each file (bot/cv_extract.py), searchable through cv_text_fts
+    """
+    CREATE TABLE IF NOT EXISTS cv_text (
+        sha256 TEXT PRIMARY KEY,
+        tokens TEXT NOT NULL,
+        skills TEXT NOT NULL,
+        chars INTEGER NOT NULL,
+        error TEXT,
+        extracted_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS cv_text_fts USING fts5(
+        tokens, content='cv_text', content_rowid='rowid', tokenize="unicode61 tokenchars '+#.'"
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cv_text_ai AFTER INSERT ON cv_text BEGIN
+        INSERT INTO cv_text_fts (rowid, tokens) VALUES (new.rowid, new.tokens);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS cv_text_ad AFTER DELETE ON cv_text BEGIN
+        INSERT INTO cv_text_fts (cv_text_fts, rowid, tokens) VALUES ('delete', old.rowid, old.tokens);
+    END
+    """,
+)
+REF_FIELDS = ("owner", "sha256", "filename", "mime_type", "size", "created_at")
+
+
+class CVTooLarge(ValueError):
+    """The upload went past the store's size limit (raised mid-stream; nothing is kept)"""
+
+
+async def upload_chunks(upload, chunk_size: int = CHUNK_SIZE):
+    """Chunks of an async file-like upload (FastAPI's ``UploadFile``)"""
+    while chunk := await upload.read(chunk_size):
+        yield chunk
+
+
+class CVStore:
+    """CV files kept once per content, whoever uploaded them.
+
+    Files live at ``<root>/objects/<2 hex>/<sha256>``. Each owner (``tg:<user id>``)
+    has at most one CV. Owners pointing at the same file share it, and the file is
+    deleted when its last owner replaces or removes their CV. The counts and
+    owners are kept in ``<root>/index.db``, whose IMMEDIATE transactions also
+    serialise the file moves, so the bot and the web API can share one store.
+
+    :meth:`put` consumes an async iterator of chunks. Each chunk is hashed and
+    written to a temporary file as it arrives, so memory use does not depend on
+    the file size, and the size limit is checked before each write.
+    """
+
+    def __init__(self, root: str, max_bytes: int = MAX_CV_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self.deduplicated = 0
+
+    def open(self):
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+                os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+                conn = connect(os.path.join(self.root, "index.db"))
+                for statement in SCHEMA:
+                    conn.execute(statement)
+                self._conn = conn
+            return self._conn
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    async def put(self, owner: str, chunks, filename: str = None, mime_type: str = None) -> dict:
+        """Store the streamed file as ``owner``'s CV (replacing any previous one); returns its record"""
+        self.open()
+        fd, temp = tempfile.mkstemp(dir=os.path.join(self.root, "tmp"))
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise CVTooLarge(f"CV is larger than {self.max_bytes // (1024 * 1024)} MB")
+                    digest.update(chunk)
+                    out.write(chunk)
+            return await asyncio.to_thread(self._commit, owner, temp, digest.hexdigest(), size, filename, mime_type)
+        finally:
+            if os.path.exists(temp):
+                os.unlink(temp)
+
+    def _commit(self, owner, temp, sha256, size, filename, mime_type) -> dict:
+        path = self.path_for(sha256)
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT refs FROM cv_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+                if row and os.path.exists(path):
+                    conn.execute("UPDATE cv_blobs SET refs = refs + 1 WHERE sha256 = ?", (sha256,))
+                    self.deduplicated += 1
+                else:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temp, path)
+                    conn.execute(
+                        "INSERT INTO cv_blobs (sha256, size, refs) VALUES (?, ?, 1) "
+                        "ON CONFLICT (sha256) DO UPDATE SET refs = refs + 1",
+                        (sha256, size),
+                    )
+                old = conn.execute("SELECT sha256 FROM cv_refs WHERE owner = ?", (owner,)).fetchone()
+                record = dict(zip(REF_FIELDS, (owner, sha256, filename, mime_type, size, time.time())))
+                conn.execute(
+                    f"INSERT OR REPLACE INTO cv_refs ({', '.join(REF_FIELDS)}) VALUES ({', '.join('?' * len(REF_FIELDS))})",
+                    tuple(record.values()),
+                )
+                if old:
+                    self._release_blob(old[0])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return record
+
+    def _release_blob(self, sha256: str):
+        conn = self._conn
+        conn.execute("UPDATE cv_blobs SET refs = refs - 1 WHERE sha256 = ?", (sha256,))
+        row = conn.execute("SELECT refs FROM cv_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        if row and row[0] <= 0:
+            conn.execute("DELETE FROM cv_blobs WHERE sha256 = ?", (sha256,))
+            conn.execute("DELETE FROM cv_text WHERE sha256 = ?", (sha256,))
+            try:
+                os.unlink(self.path_for(sha256))
+            except FileNotFoundError:
+                pass
+
+    def release(self, owner: str) -> bool:
+        """Drop ``owner``'s CV; the file goes once nobody else has it. False if there was none"""
+        self.open()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT sha256 FROM cv_refs WHERE owner = ?", (owner,)).fetchone()
+                if row:
+                    conn.execute("DELETE FROM cv_refs WHERE owner = ?", (owner,))
+                    self._release_blob(row[0])
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    def get(self, owner: str):
+        """``owner``'s CV record with the file's ``path``, or None"""
+        conn = self.open()
+        with self._lock:
+            row = conn.execute(f"SELECT {', '.join(REF_FIELDS)} FROM cv_refs WHERE owner = ?", (owner,)).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(REF_FIELDS, row))
+        record["path"] = self.path_for(record["sha256"])
+        return record
+
+    def has_text(self, sha256: str) -> bool:
+        conn = self.open()
+        with self._lock:
+            return conn.execute("SELECT 1 FROM cv_text WHERE sha256 = ?", (sha256,)).fetchone() is not None
+
+    def save_text(self, sha256: str, result: dict):
+        """Store an extraction result (``tokens``/``skills``/``chars``, or ``error``) for a file still in the store"""
+        conn = self.open()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM cv_blobs WHERE sha256 = ?", (sha256,)).fetchone():
+                    # Through DELETE + INSERT so the FTS triggers see the change
+                    conn.execute("DELETE FROM cv_text WHERE sha256 = ?", (sha256,))
+                    conn.execute(
+                        "INSERT INTO cv_text (sha256, tokens, skills, chars, error, extracted_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (sha256, " ".join(result.get("tokens", ())), json.dumps(result.get("skills", [])),
+                         result.get("chars", 0), result.get("error"), time.time()),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def unextracted(self, limit: int = 100) -> list:
+        """Records (``sha256``, ``filename``, ``mime_type``) of stored files with no extraction result yet"""
+        conn = self.open()
+        with self._lock:
+            rows = conn.execute(
+                "SELECT r.sha256, min(r.filename), min(r.mime_type) FROM cv_refs r "
+                "LEFT JOIN cv_text t ON t.sha256 = r.sha256 WHERE t.sha256 IS NULL "
+                "GROUP BY r.sha256 LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(zip(("sha256", "filename", "mime_type"), row)) for row in rows]
+
+    def text_for(self, owner: str):
+        """Extraction result of ``owner``'s CV: {"skills", "chars", "error", "extracted_at"}; None if not (yet) extracted"""
+        conn = self.open()
+        with self._lock:
+            row = conn.execute(
+                "SELECT t.skills, t.chars, t.error, t.extracted_at FROM cv_refs r "
+                "JOIN cv_text t ON t.sha256 = r.sha256 WHERE r.owner = ?",
+                (owner,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"skills": json.loads(row[0]), "chars": row[1], "error": row[2], "extracted_at": row[3]}
+
+    def search(self, text: str, limit: int = 20) -> list:
+        """Owners whose CV contains every word of ``text``, best match first"""
+        words = tokenize(text)
+        if not words:
+            return []
+        query = " ".join('"' + word.replace('"', '""') + '"' for word in words)
+        conn = self.open()
+        with self._lock:
+            rows = conn.execute(
+                "SELECT r.owner FROM cv_text_fts f JOIN cv_text t ON t.rowid = f.rowid "
+                "JOIN cv_refs r ON r.sha256 = t.sha256 WHERE cv_text_fts MATCH ? "
+                "ORDER BY f.rank, r.created_at DESC LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> dict:
+        conn = self.open()
+        with self._lock:
+            files, stored = conn.execute("SELECT count(*), coalesce(sum(size), 0) FROM cv_blobs").fetchone()
+            owners, uploaded = conn.execute("SELECT count(*), coalesce(sum(size), 0) FROM cv_refs").fetchone()
+        return {"files": files, "owners": owners, "bytes_stored": stored, "bytes_saved": uploaded - stored}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
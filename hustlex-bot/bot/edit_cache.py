@@ -0,0 +1,50 @@
+# bot/edit_cache.py
+# Fingerprints of the last text/markup rendered into each bot message
+from collections import OrderedDict
+
+
+def fingerprint(text, reply_markup=None, parse_mode=None) -> int:
+    """Hash of everything an edit would change; registry keyboards serialise for free"""
+    markup = reply_markup.to_json() if reply_markup is not None else None
+    return hash((text, parse_mode, markup))
+
+
+def message_key(query):
+    """(chat_id, message_id) of a callback query's message, or its inline_message_id"""
+    if query.message is not None:
+        return (query.message.chat.id, query.message.message_id)
+    return query.inline_message_id
+
+
+class EditFingerprints:
+    """Bounded LRU of message key -> fingerprint of what the message shows now.
+
+    Lets ``safe_edit_message`` skip an edit that would render the exact same
+    content (Telegram answers those with "message is not modified"). Every edit of
+    a tracked message must go through :meth:`remember`, otherwise the entry is
+    stale; :meth:`forget` drops it when the outcome is unknown.
+    """
+
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.skipped = 0
+
+    def is_current(self, key, fp: int) -> bool:
+        if self._entries.get(key) != fp:
+            return False
+        self._entries.move_to_end(key)
+        self.skipped += 1
+        return True
+
+    def remember(self, key, fp: int):
+        self._entries[key] = fp
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def forget(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
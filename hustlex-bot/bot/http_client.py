@@ -0,0 +1,80 @@
+# bot/http_client.py
+# Process-wide pooled aiohttp client for all outbound HTTP from the bot
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientPool:
+    """One shared ``aiohttp.ClientSession`` for the bot process.
+
+    Created in the Application's post_init and closed in post_shutdown. The
+    connector keeps connections alive, caches DNS lookups and caps connections
+    per host; every request gets ``timeout`` unless it passes its own. A trace
+    config counts new vs. reused connections per host (see :meth:`stats`).
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, dns_ttl: int = 300,
+                 keepalive_timeout: float = 30, timeout: float = 15):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+        self._hosts = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP client pool is not started")
+        return self._session
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.host = params.url.host
+
+    async def _on_connection_create_end(self, session, ctx, params):
+        self._count(ctx, "new")
+
+    async def _on_connection_reuseconn(self, session, ctx, params):
+        self._count(ctx, "reused")
+
+    def _count(self, ctx, kind: str):
+        host = getattr(ctx, "host", None) or "unknown"
+        counters = self._hosts.get(host)
+        if counters is None:
+            counters = self._hosts[host] = {"new": 0, "reused": 0}
+        counters[kind] += 1
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_connection_create_end.append(self._on_connection_create_end)
+        trace.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                              trace_configs=[trace])
+
+    async def close(self):
+        if self._session is not None:
+            logger.info(f"HTTP connection reuse per host: {self.stats()}")
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> dict:
+        """Per-host connection counters with the share of requests that reused a connection"""
+        report = {}
+        for host, counters in self._hosts.items():
+            total = counters["new"] + counters["reused"]
+            report[host] = dict(counters, reuse_ratio=round(counters["reused"] / total, 3) if total else 0.0)
+        return report
@@ -0,0 +1,67 @@
+# bot/i18n.py
+# Precompiled message catalog for all bot screens
+import json
+import logging
+import os
+import sys
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = 'en'
+LANGUAGES = ('en', 'es', 'fr', 'de', 'it', 'pt', 'am')
+
+LANGUAGE_NAMES = MappingProxyType({
+    'en': '🇺🇸 English',
+    'es': '🇪🇸 Español',
+    'fr': '🇫🇷 Français',
+    'de': '🇩🇪 Deutsch',
+    'it': '🇮🇹 Italiano',
+    'pt': '🇵🇹 Português',
+    'am': '🇪🇹 አማርኛ (Amharic)'
+})
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+
+
+def load_catalog(locales_dir: str = LOCALES_DIR):
+    """Load ``<lang>.json`` files into immutable per-language tables.
+
+    Every table is completed from English at load time, so a lookup is a single
+    dict access. Keys missing from a translation (or unknown to English) are
+    reported here instead of at request time.
+    """
+    raw = {}
+    for lang in LANGUAGES:
+        with open(os.path.join(locales_dir, f'{lang}.json'), encoding='utf-8') as f:
+            raw[lang] = json.load(f)
+
+    base = raw[DEFAULT_LANGUAGE]
+    tables = {}
+    for lang in LANGUAGES:
+        strings = raw[lang]
+        missing = base.keys() - strings.keys()
+        if missing:
+            logger.warning(f"Catalog '{lang}' is missing {len(missing)} key(s), falling back to English: {sorted(missing)}")
+        extra = strings.keys() - base.keys()
+        if extra:
+            logger.warning(f"Catalog '{lang}' has keys unknown to English: {sorted(extra)}")
+        table = {sys.intern(key): sys.intern(base[key]) for key in base}
+        table.update((sys.intern(key), sys.intern(text)) for key, text in strings.items() if key in base)
+        tables[lang] = MappingProxyType(table)
+    return MappingProxyType(tables)
+
+
+CATALOG = load_catalog()
+_FALLBACK = CATALOG[DEFAULT_LANGUAGE]
+
+
+def table(lang_code: str):
+    """The complete string table for a language (English for unknown codes)"""
+    return CATALOG.get(lang_code, _FALLBACK)
+
+
+def t(lang_code: str, key: str, **params) -> str:
+    """Look up ``key`` for ``lang_code`` and fill in ``params`` if given"""
+    text = CATALOG.get(lang_code, _FALLBACK)[key]
+    return text.format(**params) if params else text
@@ -0,0 +1,64 @@
+# bot/identity.py
+# Bot identity verified once at startup and kept fresh in the background
+import asyncio
+import logging
+
+from telegram.error import InvalidToken, Forbidden, TelegramError
+
+logger = logging.getLogger(__name__)
+
+
+class BotIdentity:
+    """Cached copy of the bot's own ``User`` (the result of ``get_me``).
+
+    The value is seeded from ``Application.initialize()``, which already calls
+    ``get_me``, and refreshed by a background task every ``ttl / 2`` seconds.
+    Network hiccups keep the last known identity; only an authentication failure
+    (revoked or invalid token) is recorded and re-raised by :meth:`check`.
+    """
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.user = None
+        self.error = None
+        self._task = None
+
+    def check(self):
+        """Return the cached identity, raising the recorded auth error if there is one"""
+        if self.error is not None:
+            raise self.error
+        return self.user
+
+    def set(self, user):
+        self.user = user
+        self.error = None
+
+    async def refresh(self, bot):
+        try:
+            self.set(await bot.get_me())
+            logger.info(f"Bot token validated successfully: @{self.user.username}")
+        except (InvalidToken, Forbidden) as e:
+            self.error = e
+            logger.error(f"Invalid bot token: {e}")
+        except TelegramError as e:
+            # Keep serving the last known identity on transient errors
+            logger.warning(f"Could not refresh bot identity, keeping cached value: {e}")
+
+    async def _refresh_loop(self, bot):
+        while True:
+            await asyncio.sleep(self.ttl / 2)
+            await self.refresh(bot)
+
+    async def start(self, bot):
+        # Bot.initialize() has already fetched and validated get_me
+        self.set(bot.bot)
+        self._task = asyncio.create_task(self._refresh_loop(bot))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,73 @@
+# bot/inline_search.py
+# Inline-mode job search helpers: query normalisation, result cache, per-user debounce
+import asyncio
+import re
+import time
+from collections import OrderedDict
+
+_WORDS = re.compile(r"\w+")
+
+
+def normalize_query(text: str) -> str:
+    """Cache form of an inline query: case-folded words, punctuation and spacing dropped"""
+    return " ".join(_WORDS.findall((text or "").casefold()))
+
+
+class QueryCache:
+    """LRU of (normalised query, offset) -> rendered page, each entry valid for ``ttl`` seconds.
+
+    Users typing the same prefixes ("dev", "deve", "devel"...) and popular queries
+    are answered without touching the job index. New jobs show up once the entry
+    for a query expires.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl: float = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Debouncer:
+    """Latest-wins per user: only a query that is still the newest after ``delay`` runs.
+
+    Telegram sends an inline query for almost every keystroke; superseded ones are
+    simply left unanswered (the client has already moved on to the newer query).
+    """
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self._latest = {}
+        self.dropped = 0
+
+    async def settle(self, user_id, token) -> bool:
+        """Wait out the delay; True if ``token`` is still this user's newest query"""
+        self._latest[user_id] = token
+        if self.delay > 0:
+            await asyncio.sleep(self.delay)
+        if self._latest.get(user_id) != token:
+            self.dropped += 1
+            return False
+        del self._latest[user_id]
+        return True
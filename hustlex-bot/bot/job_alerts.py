@@ -0,0 +1,304 @@
+# bot/job_alerts.py
+# Job-alert subscriptions: inverted-index matcher and the dispatcher that tails new jobs
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import time
+
+from bot.user_store import connect
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r"\w+")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS job_alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        spec TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS job_alerts_user ON job_alerts (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS job_alert_cursor (
+        shard INTEGER PRIMARY KEY,
+        last_job_id INTEGER NOT NULL
+    )
+    """,
+)
+
+NEW_JOBS = """
+SELECT id, job_title, job_type, work_location, salary, deadline, description, company_name, job_link
+FROM jobs WHERE id > ? ORDER BY id LIMIT ?
+"""
+JOB_COLUMNS = ("id", "job_title", "job_type", "work_location", "salary", "deadline", "description",
+               "company_name", "job_link")
+
+
+def words(text) -> list:
+    return _WORDS.findall(str(text or "").casefold())
+
+
+def job_terms(job: dict) -> set:
+    """Everything a subscription term can match in a job.
+
+    Keywords match words of the title, description or company; location and
+    job type words are prefixed ("loc:remote", "type:freelance") so they only
+    match their own field.
+    """
+    terms = set(words(job.get("job_title")))
+    terms.update(words(job.get("description")))
+    terms.update(words(job.get("company_name")))
+    terms.update(f"loc:{w}" for w in words(job.get("work_location")))
+    terms.update(f"type:{w}" for w in words(job.get("job_type")))
+    return terms
+
+
+def spec_terms(spec: dict) -> frozenset:
+    """Terms a job must contain (all of them) to match a subscription"""
+    terms = set(words(" ".join(spec.get("keywords", ()))))
+    terms.update(f"loc:{w}" for w in words(spec.get("location")))
+    terms.update(f"type:{w}" for w in words(spec.get("job_type")))
+    return frozenset(terms)
+
+
+def parse_spec(text: str):
+    """``python developer | location: Addis Ababa | type: Full-time`` -> spec dict (None if empty)"""
+    spec = {"keywords": []}
+    for part in text.split("|"):
+        label, sep, value = part.partition(":")
+        label = label.strip().lower()
+        if sep and label in ("location", "loc", "where"):
+            spec["location"] = value.strip()
+        elif sep and label in ("type", "job type"):
+            spec["job_type"] = value.strip()
+        else:
+            spec["keywords"] += words(part)
+    return spec if spec_terms(spec) else None
+
+
+def describe_spec(spec: dict) -> str:
+    parts = []
+    if spec.get("keywords"):
+        parts.append(" ".join(spec["keywords"]))
+    if spec.get("location"):
+        parts.append(f"location: {spec['location']}")
+    if spec.get("job_type"):
+        parts.append(f"type: {spec['job_type']}")
+    return " | ".join(parts)
+
+
+class AlertIndex:
+    """Inverted index of subscriptions, matched per job in time proportional to the job.
+
+    Every subscription is filed under one of its terms, its anchor: a keyword if
+    it has one (location and job type take few values, so nearly every job has
+    one of them), otherwise the term with the shortest posting list. A job looks
+    up the postings of its own terms only, so subscriptions whose anchor term is
+    not in the job are never looked at. Within a posting, subscriptions with the
+    same terms share one entry: popular alerts ("developer | location: Remote")
+    are checked once per job however many users set them.
+    """
+
+    def __init__(self):
+        self._postings = {}     # anchor term -> {terms: {sub_id: user_id}}
+        self._subs = {}         # sub_id -> (anchor, terms)
+        self.candidates_checked = 0
+
+    def add(self, sub_id: int, user_id: int, terms: frozenset):
+        if not terms:
+            return
+        self.remove(sub_id)
+        anchor = min(sorted(terms), key=lambda term: (":" in term, len(self._postings.get(term, ()))))
+        self._postings.setdefault(anchor, {}).setdefault(terms, {})[sub_id] = user_id
+        self._subs[sub_id] = (anchor, terms)
+
+    def remove(self, sub_id: int):
+        entry = self._subs.pop(sub_id, None)
+        if entry is None:
+            return
+        anchor, terms = entry
+        posting = self._postings[anchor]
+        del posting[terms][sub_id]
+        if not posting[terms]:
+            del posting[terms]
+            if not posting:
+                del self._postings[anchor]
+
+    def match(self, terms: set) -> set:
+        """User ids with at least one subscription fully contained in ``terms``"""
+        users = set()
+        postings = self._postings
+        for term in terms:
+            posting = postings.get(term)
+            if posting is None:
+                continue
+            self.candidates_checked += len(posting)
+            for required, subscribers in posting.items():
+                if required <= terms:
+                    users.update(subscribers.values())
+        return users
+
+    def __len__(self):
+        return len(self._subs)
+
+
+class AlertStore:
+    """Subscriptions and the alert cursor, in the jobs database (next to the jobs they watch)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader = None
+        self._writer = None
+
+    def open(self):
+        if self._reader is None:
+            self._writer = connect(self.path)
+            for statement in SCHEMA:
+                self._writer.execute(statement)
+            self._reader = connect(self.path)
+        return self._reader
+
+    def load(self, shard=None) -> list:
+        """(id, user_id, spec) of every subscription (of one shard: ``(index, count)``)"""
+        query, params = "SELECT id, user_id, spec FROM job_alerts", ()
+        if shard:
+            query += " WHERE user_id % ? = ?"
+            params = (shard[1], shard[0])
+        return [(sub_id, user_id, json.loads(spec)) for sub_id, user_id, spec in self.open().execute(query, params)]
+
+    def for_user(self, user_id: int) -> list:
+        rows = self.open().execute("SELECT id, spec FROM job_alerts WHERE user_id = ? ORDER BY id", (user_id,))
+        return [(sub_id, json.loads(spec)) for sub_id, spec in rows]
+
+    def add(self, user_id: int, spec: dict) -> int:
+        self.open()
+        cursor = self._writer.execute(
+            "INSERT INTO job_alerts (user_id, spec, created_at) VALUES (?, ?, ?)",
+            (user_id, json.dumps(spec), time.time()),
+        )
+        return cursor.lastrowid
+
+    def remove(self, user_id: int, sub_id: int = None) -> int:
+        """Delete one subscription of a user, or all of them; returns how many went"""
+        self.open()
+        if sub_id is None:
+            cursor = self._writer.execute("DELETE FROM job_alerts WHERE user_id = ?", (user_id,))
+        else:
+            cursor = self._writer.execute("DELETE FROM job_alerts WHERE id = ? AND user_id = ?", (sub_id, user_id))
+        return cursor.rowcount
+
+    def cursor(self, shard: int):
+        row = self.open().execute("SELECT last_job_id FROM job_alert_cursor WHERE shard = ?", (shard,)).fetchone()
+        return row[0] if row else None
+
+    def save_cursor(self, shard: int, last_job_id: int):
+        self.open()
+        self._writer.execute(
+            "INSERT INTO job_alert_cursor (shard, last_job_id) VALUES (?, ?) "
+            "ON CONFLICT (shard) DO UPDATE SET last_job_id = excluded.last_job_id",
+            (shard, last_job_id),
+        )
+
+    def new_jobs(self, after_id: int, limit: int = 100) -> list:
+        rows = self.open().execute(NEW_JOBS, (after_id, limit)).fetchall()
+        return [dict(zip(JOB_COLUMNS, row)) for row in rows]
+
+    def last_job_id(self) -> int:
+        return self.open().execute("SELECT coalesce(max(id), 0) FROM jobs").fetchone()[0]
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class AlertDispatcher:
+    """Tails the jobs table and hands every new job's matching users to ``notify(bot, job, user_ids)``.
+
+    Jobs from the bot wizard and from ``app.py`` are picked up alike. Its position
+    is saved, so jobs posted while the bot was down are alerted after a restart.
+    With sharded workers each one alerts only its own users (``shard``), from an
+    index of just their subscriptions.
+    """
+
+    def __init__(self, store: AlertStore, notify, poll_interval: float = 5, shard=None):
+        self.store = store
+        self.notify = notify
+        self.poll_interval = poll_interval
+        self.shard = shard
+        self.index = AlertIndex()
+        self.bot = None
+        self._last_id = 0
+        self._wakeup = None
+        self._task = None
+        self.jobs_seen = 0
+        self.alerts_queued = 0
+
+    def _owns(self, user_id: int) -> bool:
+        return not self.shard or user_id % self.shard[1] == self.shard[0]
+
+    def subscribe(self, user_id: int, sub_id: int, spec: dict):
+        if self._owns(user_id):
+            self.index.add(sub_id, user_id, spec_terms(spec))
+
+    def unsubscribe(self, sub_id: int):
+        self.index.remove(sub_id)
+
+    def poke(self):
+        """Check for new jobs now (e.g. right after this process stored one)"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _poll(self):
+        while True:
+            jobs = self.store.new_jobs(self._last_id)
+            if not jobs:
+                return
+            for job in jobs:
+                self.jobs_seen += 1
+                user_ids = self.index.match(job_terms(job))
+                if user_ids:
+                    self.alerts_queued += len(user_ids)
+                    await self.notify(self.bot, job, user_ids)
+            self._last_id = jobs[-1]["id"]
+            await asyncio.to_thread(self.store.save_cursor, self.shard[0] if self.shard else 0, self._last_id)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._poll()
+            except sqlite3.Error as e:
+                logger.error(f"Job alert poll failed: {e}")
+
+    async def start(self, bot):
+        self.bot = bot
+        for sub_id, user_id, spec in self.store.load(self.shard):
+            self.index.add(sub_id, user_id, spec_terms(spec))
+        cursor = self.store.cursor(self.shard[0] if self.shard else 0)
+        # First start: only jobs posted from now on are alerted
+        self._last_id = cursor if cursor is not None else self.store.last_job_id()
+        logger.info(f"Job alerts: {len(self.index)} subscriptions loaded, watching jobs after #{self._last_id}")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        logger.info(f"Job alerts stopped: {self.jobs_seen} jobs matched, {self.alerts_queued} alerts queued")
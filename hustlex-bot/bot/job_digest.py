@@ -0,0 +1,161 @@
+# bot/job_digest.py
+# Digest mode: queued jobs go out as a few compact channel messages instead of one post each
+import asyncio
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_LIMIT = 4096    # Telegram's limit for a message text
+MAX_BUTTONS = 20        # Deep-link buttons (one per job) per digest message
+BUTTON_TEXT = 40        # Longer job titles are cut on the button
+LINE_LIMIT = 300        # A single job's summary line
+
+
+def _cut(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def summary_line(number: int, job: dict) -> str:
+    """``3. Python Developer — Acme · Remote · Full-time · 20,000 ETB · apply by 2026-12-01``"""
+    details = [job.get(field) for field in ("company_name", "work_location", "job_type", "salary")]
+    details = [str(value).strip() for value in details if value and str(value).strip()]
+    if job.get("deadline"):
+        details.append(f"apply by {job['deadline']}")
+    title = str(job.get("job_title") or "Untitled job").strip()
+    return _cut(f"{number}. {title}" + (f" — {' · '.join(details)}" if details else ""), LINE_LIMIT)
+
+
+def render_digest(jobs, link_for, header: str = "📢 New jobs on HustleX"):
+    """Digest messages for ``jobs``: a list of (text, [(button text, url)]) pairs.
+
+    One numbered line and one button (``link_for(job)``) per job. A new message is
+    started whenever the next line would push the text past Telegram's 4096
+    characters, or the message already has MAX_BUTTONS buttons. The header of each
+    message counts the parts ("(2/3)") when there is more than one.
+    """
+    budget = MESSAGE_LIMIT - len(header) - len(" (99/99)\n\n")
+    pages, lines, buttons, size = [], [], [], 0
+    for number, job in enumerate(jobs, 1):
+        line = summary_line(number, job)
+        if lines and (size + len(line) + 1 > budget or len(buttons) >= MAX_BUTTONS):
+            pages.append((lines, buttons))
+            lines, buttons, size = [], [], 0
+        lines.append(line)
+        size += len(line) + 1
+        title = str(job.get("job_title") or "Untitled job").strip()
+        buttons.append((_cut(f"{number}. {title}", BUTTON_TEXT), link_for(job)))
+    if lines:
+        pages.append((lines, buttons))
+    messages = []
+    for index, (lines, buttons) in enumerate(pages, 1):
+        title = header if len(pages) == 1 else f"{header} ({index}/{len(pages)})"
+        messages.append((title + "\n\n" + "\n".join(lines), buttons))
+    return messages
+
+
+class DigestPoster:
+    """Flushes the store's digest queue through ``send(bot, jobs, sent)``.
+
+    A flush happens once ``max_jobs`` jobs are waiting, or once the oldest has
+    waited ``interval`` seconds. Jobs are queued in the jobs database, so app.py
+    can queue them too (the queue is checked every ``poll_interval`` seconds), and
+    none are lost across a restart.
+
+    ``send`` returns the ids of the jobs done with every channel they are routed
+    to (posted, or given up on for a channel the bot cannot post to); only those
+    leave the queue. ``sent`` maps job id -> channels that
+    already got it, so a retry only posts to the channels that failed. After a
+    failure the flush waits ``retry_backoff`` seconds, doubling up to
+    ``max_backoff``, before it tries again.
+    """
+
+    def __init__(self, store, send, interval: float = 900, max_jobs: int = 20, poll_interval: float = 30,
+                 retry_backoff: float = 60, max_backoff: float = 900):
+        self.store = store
+        self.send = send
+        self.interval = interval
+        self.max_jobs = max_jobs
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.bot = None
+        self._wakeup = None
+        self._task = None
+        self._sent = {}         # job id -> channels it is already posted to
+        self._failures = 0      # failed flushes in a row
+        self._retry_at = 0.0
+        self.digests = 0
+        self.jobs_sent = 0
+        self.retries = 0
+
+    def poke(self):
+        """Check the queue now (e.g. right after this process queued a job)"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _due(self) -> bool:
+        if time.time() < self._retry_at:
+            return False
+        count, oldest = self.store.digest_backlog()
+        return bool(count) and (count >= self.max_jobs or time.time() - oldest >= self.interval)
+
+    async def flush(self):
+        """Send everything that is queued, ``max_jobs`` jobs per digest"""
+        while True:
+            jobs = self.store.digest_batch(self.max_jobs)
+            if not jobs:
+                return
+            delivered = await self.send(self.bot, jobs, self._sent)
+            if delivered:
+                await asyncio.to_thread(self.store.dequeue_digest, delivered)
+                for job_id in delivered:
+                    self._sent.pop(job_id, None)
+                self.digests += 1
+                self.jobs_sent += len(delivered)
+            if len(delivered) < len(jobs):
+                self._failures += 1
+                self.retries += 1
+                wait = min(self.max_backoff, self.retry_backoff * 2 ** (self._failures - 1))
+                self._retry_at = time.time() + wait
+                logger.warning(f"{len(jobs) - len(delivered)} digest jobs not posted everywhere, "
+                               f"kept queued and retried in {wait:.0f}s")
+                return
+            self._failures = 0
+            self._retry_at = 0.0
+            if len(jobs) < self.max_jobs:
+                return
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                if self._due():
+                    await self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"Job digest failed: {e}")
+
+    async def start(self, bot):
+        self.bot = bot
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        count, _ = self.store.digest_backlog()
+        logger.info(f"Digest mode: {count} jobs queued, flushing every {self.interval:.0f}s "
+                    f"or at {self.max_jobs} jobs")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        logger.info(f"Digest mode stopped: {self.jobs_sent} jobs sent in {self.digests} digests, "
+                    f"{self.retries} retries")
@@ -0,0 +1,258 @@
+# bot/job_import.py
+# Bulk job import (/importjobs): streaming CSV/JSON row readers, wizard-field validation, progress report
+import codecs
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from urllib.parse import urlparse
+
+# The fields the /postjob wizard asks for, in its order
+WIZARD_FIELDS = (
+    "job_title", "job_type", "work_location", "salary", "deadline", "description",
+    "client_type", "company_name", "verified", "previous_jobs", "job_link",
+)
+# What the wizard would have stored when the user typed "None" / "No"
+DEFAULTS = {"previous_jobs": "None", "verified": "No"}
+
+# Header spellings people use for the wizard fields (after normalize_header)
+ALIASES = {
+    "title": "job_title", "position": "job_title",
+    "type": "job_type", "employment_type": "job_type",
+    "location": "work_location",
+    "pay": "salary",
+    "apply_by": "deadline", "closing_date": "deadline",
+    "details": "description",
+    "client": "client_type",
+    "company": "company_name", "employer": "company_name",
+    "is_verified": "verified",
+    "link": "job_link", "url": "job_link", "view_details": "job_link",
+}
+
+# A job post is one message (4096 chars), so no single field may take most of it
+MAX_LENGTHS = {"description": 2500, "job_link": 500}
+MAX_LENGTH = 200
+
+# Largest single JSON value the reader buffers before giving up on the file
+MAX_JSON_ITEM = 256 * 1024
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be read (bad encoding, not CSV/JSON, broken JSON)"""
+
+
+def normalize_header(name) -> str:
+    key = _SEPARATORS.sub("_", str(name or "").strip().lower())
+    return ALIASES.get(key, key)
+
+
+def clean_link(link):
+    """``link`` made absolute (https:// added when there is no scheme), or None if it is not a usable http(s) URL"""
+    link = (link or "").strip()
+    if not link:
+        return None
+    if not link.startswith(("http://", "https://")):
+        link = "https://" + link
+    try:
+        parsed = urlparse(link)
+    except ValueError:
+        return None
+    if not parsed.netloc or " " in link:
+        return None
+    return parsed.geturl()
+
+
+def check_fields(row: dict):
+    """Check the wizard fields of ``row`` like the wizard would; returns (job, problems).
+
+    ``job`` holds the valid fields, cleaned up the way the wizard stores them
+    (verified as "✅"/"No", links with a scheme). ``problems`` maps each missing
+    or invalid field to what is wrong with it ("not a YYYY-MM-DD date"), in
+    wizard order.
+    """
+    values = {normalize_header(key): value for key, value in row.items() if key is not None}
+    job, problems = {}, {}
+    for field in WIZARD_FIELDS:
+        value = values.get(field)
+        value = "" if value is None else str(value).strip()
+        if not value:
+            if field in DEFAULTS:
+                value = DEFAULTS[field]
+            else:
+                problems[field] = "missing"
+                continue
+        if len(value) > MAX_LENGTHS.get(field, MAX_LENGTH):
+            problems[field] = f"longer than {MAX_LENGTHS.get(field, MAX_LENGTH)} characters"
+            continue
+        job[field] = value
+
+    if "deadline" in job:
+        try:
+            datetime.strptime(job["deadline"], "%Y-%m-%d")
+        except ValueError:
+            problems["deadline"] = "not a YYYY-MM-DD date"
+    if "verified" in job:
+        verified = job["verified"].lower()
+        if verified in ("yes", "✅", "true", "1"):
+            job["verified"] = "✅"
+        elif verified in ("no", "false", "0"):
+            job["verified"] = "No"
+        else:
+            problems["verified"] = "expected ✅/Yes or No"
+    if "job_link" in job:
+        link = clean_link(job["job_link"])
+        if link is None:
+            problems["job_link"] = "not a valid URL"
+        else:
+            job["job_link"] = link
+    for field in problems:
+        job.pop(field, None)
+    return job, {field: problems[field] for field in WIZARD_FIELDS if field in problems}
+
+
+def validate_job(row: dict):
+    """Check one imported row like the wizard would; returns (job, errors).
+
+    ``job`` is as for :func:`check_fields`; ``errors`` lists what is wrong with
+    the row ("deadline: not a YYYY-MM-DD date"), empty if nothing.
+    """
+    job, problems = check_fields(row)
+    return job, [f"{field}: {problem}" for field, problem in problems.items()]
+
+
+def iter_csv_rows(fp):
+    """(line number, row dict) for each record of a binary CSV file, read as it goes"""
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row in reader:
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            yield reader.line_num, row
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFormatError(f"Not a readable UTF-8 CSV file: {e}") from e
+    finally:
+        text.detach()
+
+
+def iter_json_rows(fp, chunk_size: int = 64 * 1024):
+    """(item number, value) for each element of a binary JSON file, read in chunks.
+
+    Accepts a top-level array (``[{...}, {...}]``) or JSON Lines / concatenated
+    objects. Only the current chunk and the element being decoded are in memory;
+    an element is decoded once the buffer holds all of it.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, eof = "", 0, False
+    in_array = None
+    number = 0
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        try:
+            buffer = buffer[pos:] + utf8.decode(chunk, final=not chunk)
+        except UnicodeDecodeError as e:
+            raise ImportFormatError(f"Not a readable UTF-8 JSON file: {e}") from e
+        pos = 0
+        eof = not chunk
+
+    while True:
+        # Skip whitespace (and, inside an array, the separating commas)
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ",")):
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            fill()
+        if pos >= len(buffer):
+            if in_array:
+                raise ImportFormatError("JSON array is not closed")
+            return
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+            continue
+        if in_array and buffer[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ImportFormatError(f"Invalid JSON in item {number + 1}: {e.msg}") from e
+            if len(buffer) - pos > MAX_JSON_ITEM:
+                raise ImportFormatError(f"JSON item {number + 1} is larger than {MAX_JSON_ITEM // 1024} KB")
+            fill()
+            continue
+        if end == len(buffer) and not eof and not isinstance(value, (dict, list, str)):
+            # A number at the end of the buffer may continue in the next chunk
+            fill()
+            continue
+        pos = end
+        number += 1
+        yield number, value
+
+
+def iter_rows(fp, file_name: str):
+    """Rows of an uploaded file, CSV or JSON by extension"""
+    if file_name.lower().endswith((".json", ".jsonl")):
+        for number, value in iter_json_rows(fp):
+            yield f"item {number}", value
+    else:
+        for line, row in iter_csv_rows(fp):
+            yield f"line {line}", row
+
+
+class ImportReport:
+    """Running counts of one import, rendered into its status message"""
+
+    MAX_PROBLEMS = 8
+
+    def __init__(self, file_name: str, digest: bool = False):
+        self.file_name = file_name
+        self.digest = digest
+        self.rows = 0
+        self.stored = 0
+        self.skipped = 0
+        self.posted = 0
+        self.post_failed = 0
+        self.problems = []
+        self.reading = True
+        self.error = None
+
+    def reject(self, where: str, errors):
+        self.skipped += 1
+        if len(self.problems) < self.MAX_PROBLEMS:
+            self.problems.append(f"{where}: {'; '.join(errors)}")
+
+    @property
+    def finished(self) -> bool:
+        return not self.reading and self.posted + self.post_failed >= self.stored
+
+    def render(self) -> str:
+        if self.error:
+            header = f"❌ Import of {self.file_name} stopped: {self.error}"
+        elif self.finished:
+            header = f"✅ Import of {self.file_name} finished"
+        else:
+            header = f"⏳ Importing {self.file_name}…"
+        lines = [
+            header,
+            "",
+            f"Rows read: {self.rows}{'' if not self.reading else ' (reading)'}",
+            f"Stored: {self.stored}",
+            f"Skipped: {self.skipped}",
+            (f"Queued for the channel digest: {self.posted} of {self.stored}" if self.digest
+             else f"Posted to channels: {self.posted} of {self.stored}")
+            + (f" ({self.post_failed} failed)" if self.post_failed else ""),
+        ]
+        if self.problems:
+            lines += ["", "Skipped rows:"] + [f"• {problem}" for problem in self.problems]
+            if self.skipped > len(self.problems):
+                lines.append(f"… and {self.skipped - len(self.problems)} more")
+        return "\n".join(lines)
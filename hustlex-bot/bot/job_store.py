@@ -0,0 +1,274 @@
+# bot/job_store.py
+# Posted jobs (web form and bot wizard) in SQLite with an FTS5 search index
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from bot.user_store import connect
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = (
+    "job_title", "job_type", "work_location", "salary", "deadline", "description",
+    "client_type", "company_name", "verified", "previous_jobs", "job_link",
+    "cv_file", "profile_image",
+)
+
+# Same table app.py has always created; the extra columns are added to old files on open
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_title TEXT, job_type TEXT, work_location TEXT,
+    salary TEXT, deadline TEXT, description TEXT,
+    client_type TEXT, company_name TEXT, verified TEXT,
+    previous_jobs TEXT, job_link TEXT,
+    cv_file TEXT, profile_image TEXT
+)
+"""
+EXTRA_COLUMNS = (("source", "TEXT"), ("posted_by", "INTEGER"), ("created_at", "REAL"))
+
+# External-content index: the text lives once, in jobs; triggers keep the index in step
+FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        job_title, description, company_name, work_location,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts (rowid, job_title, description, company_name, work_location)
+        VALUES (new.id, new.job_title, new.description, new.company_name, new.work_location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, description, company_name, work_location)
+        VALUES ('delete', old.id, old.job_title, old.description, old.company_name, old.work_location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE ON jobs BEGIN
+        INSERT INTO jobs_fts (jobs_fts, rowid, job_title, description, company_name, work_location)
+        VALUES ('delete', old.id, old.job_title, old.description, old.company_name, old.work_location);
+        INSERT INTO jobs_fts (rowid, job_title, description, company_name, work_location)
+        VALUES (new.id, new.job_title, new.description, new.company_name, new.work_location);
+    END
+    """,
+)
+
+RANK = "bm25(10.0, 1.0, 4.0, 3.0)"
+
+# Channel messages of each job, so posts can be edited later (expired at the deadline)
+POSTS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS job_posts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id INTEGER NOT NULL,
+        chat_id TEXT NOT NULL,
+        message_id INTEGER NOT NULL,
+        expires_at REAL,
+        expired_at REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS job_posts_job ON job_posts (job_id)",
+)
+POST_FIELDS = ("id", "job_id", "chat_id", "message_id", "expires_at")
+
+# Jobs waiting for the next channel digest (digest mode, see bot/job_digest.py)
+DIGEST_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS digest_queue (
+        job_id INTEGER PRIMARY KEY,
+        queued_at REAL NOT NULL
+    )
+    """,
+)
+
+INSERT = (
+    f"INSERT INTO jobs ({', '.join(JOB_FIELDS)}, source, posted_by, created_at) "
+    f"VALUES ({', '.join('?' * len(JOB_FIELDS))}, ?, ?, ?)"
+)
+
+# Rank the newest ``candidates`` matches inside the index, then read only the rows of
+# the requested page. bm25 costs about 2 us per scored row, so scoring every match of a
+# common word over 100k jobs would take tens of milliseconds.
+SEARCH = """
+SELECT jobs.id, jobs.job_title, jobs.job_type, jobs.work_location, jobs.salary, jobs.deadline,
+       jobs.company_name, jobs.job_link
+FROM (
+    SELECT rowid, rank FROM (
+        SELECT rowid, rank FROM jobs_fts WHERE jobs_fts MATCH ? ORDER BY rowid DESC LIMIT ?
+    ) ORDER BY rank LIMIT ? OFFSET ?
+) AS hits
+JOIN jobs ON jobs.id = hits.rowid
+ORDER BY hits.rank
+"""
+RESULT_FIELDS = ("id", "job_title", "job_type", "work_location", "salary", "deadline", "company_name", "job_link")
+
+_WORDS = re.compile(r"\w+")
+
+
+def match_expression(text: str) -> str:
+    """FTS5 query for free text: every word must match, each as a prefix ("dev" finds "developer").
+
+    Words are quoted, so FTS5 syntax in user input (AND, NEAR, "*", ...) is taken literally.
+    """
+    return " ".join(f'"{word}"*' for word in _WORDS.findall(text.casefold()))
+
+
+class JobStore:
+    """The one table of posted jobs, shared by ``app.py`` and the bot.
+
+    Every insert also indexes the job (triggers), so search results include it
+    right away. Usable from plain threads (Flask) and from the bot, which should
+    call :meth:`add` through ``asyncio.to_thread``; reads use their own connection
+    and are fast enough for the event loop.
+
+    :meth:`search` ranks (bm25, title weighted highest) among the newest
+    ``max_candidates`` jobs that match, which keeps a query over a very common
+    word in single-digit milliseconds and favours fresh postings.
+    """
+
+    def __init__(self, path: str, max_candidates: int = 1000):
+        self.path = path
+        self.max_candidates = max_candidates
+        self._writer = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def open(self) -> sqlite3.Connection:
+        """Create/upgrade the schema on first use; returns the read connection"""
+        with self._lock:
+            if self._reader is None:
+                conn = connect(self.path)
+                conn.execute(SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+                for name, kind in EXTRA_COLUMNS:
+                    if name not in columns:
+                        conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+                indexed = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+                ).fetchone()
+                for statement in FTS_SCHEMA + POSTS_SCHEMA + DIGEST_SCHEMA:
+                    conn.execute(statement)
+                if not indexed:
+                    # Jobs saved before the index existed
+                    conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+                    # bm25 column weights: title, description, company, location
+                    conn.execute(f"INSERT INTO jobs_fts (jobs_fts, rank) VALUES ('rank', '{RANK}')")
+                self._writer = conn
+                self._reader = connect(self.path)
+            return self._reader
+
+    def add(self, job: dict, source: str = None, posted_by: int = None) -> int:
+        """Store (and index) one job; returns its id"""
+        return self.add_many([job], source, posted_by)[0]
+
+    def add_many(self, jobs, source: str = None, posted_by: int = None) -> list:
+        """Store many jobs in one transaction; returns their ids"""
+        self.open()
+        conn = self._writer
+        now = time.time()
+        ids = []
+        with self._lock, conn:
+            conn.execute("BEGIN")
+            for job in jobs:
+                values = [job.get(field) for field in JOB_FIELDS]
+                cursor = conn.execute(INSERT, (*values, source, posted_by, now))
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def get(self, job_id: int):
+        conn = self.open()
+        row = conn.execute(
+            f"SELECT id, {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return dict(zip(("id",) + JOB_FIELDS, row)) if row else None
+
+    def add_posts(self, job_id: int, messages, expires_at: float = None) -> list:
+        """Record the channel messages ``[(chat_id, message_id)]`` of a job; returns their ids"""
+        self.open()
+        conn = self._writer
+        ids = []
+        with self._lock, conn:
+            conn.execute("BEGIN")
+            for chat_id, message_id in messages:
+                cursor = conn.execute(
+                    "INSERT INTO job_posts (job_id, chat_id, message_id, expires_at) VALUES (?, ?, ?, ?)",
+                    (job_id, str(chat_id), message_id, expires_at),
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def pending_posts(self, after_id: int = 0) -> list:
+        """Posts with a deadline that have not been expired yet, newer than post ``after_id``"""
+        rows = self.open().execute(
+            f"SELECT {', '.join(POST_FIELDS)} FROM job_posts "
+            "WHERE id > ? AND expires_at IS NOT NULL AND expired_at IS NULL ORDER BY id",
+            (after_id,),
+        ).fetchall()
+        return [dict(zip(POST_FIELDS, row)) for row in rows]
+
+    def mark_expired(self, post_ids):
+        self.open()
+        now = time.time()
+        with self._lock, self._writer:
+            self._writer.execute("BEGIN")
+            self._writer.executemany("UPDATE job_posts SET expired_at = ? WHERE id = ?",
+                                     [(now, post_id) for post_id in post_ids])
+
+    def queue_digest(self, job_ids):
+        """Hold jobs back for the next channel digest instead of posting them one by one"""
+        self.open()
+        now = time.time()
+        with self._lock, self._writer:
+            self._writer.execute("BEGIN")
+            self._writer.executemany("INSERT OR IGNORE INTO digest_queue (job_id, queued_at) VALUES (?, ?)",
+                                     [(job_id, now) for job_id in job_ids])
+
+    def digest_backlog(self):
+        """(number of queued jobs, queue time of the oldest one or None)"""
+        return tuple(self.open().execute("SELECT count(*), min(queued_at) FROM digest_queue JOIN jobs ON jobs.id = digest_queue.job_id").fetchone())
+
+    def digest_batch(self, limit: int) -> list:
+        """The ``limit`` longest-waiting queued jobs, oldest first"""
+        rows = self.open().execute(
+            f"SELECT jobs.id, {', '.join('jobs.' + field for field in JOB_FIELDS)} FROM digest_queue "
+            "JOIN jobs ON jobs.id = digest_queue.job_id ORDER BY digest_queue.queued_at, digest_queue.job_id LIMIT ?",
+            (limit,),
+        ).fetchall()
+        return [dict(zip(("id",) + JOB_FIELDS, row)) for row in rows]
+
+    def dequeue_digest(self, job_ids):
+        self.open()
+        with self._lock, self._writer:
+            self._writer.execute("BEGIN")
+            self._writer.executemany("DELETE FROM digest_queue WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+    def search(self, text: str, limit: int = 5, offset: int = 0):
+        """Best matches first; returns (results, has_more)"""
+        expression = match_expression(text)
+        if not expression:
+            return [], False
+        conn = self.open()
+        try:
+            rows = conn.execute(SEARCH, (expression, self.max_candidates, limit + 1, offset)).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Job search failed for {text!r}: {e}")
+            return [], False
+        results = [dict(zip(RESULT_FIELDS, row)) for row in rows[:limit]]
+        return results, len(rows) > limit
+
+    def count(self) -> int:
+        return self.open().execute("SELECT count(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._writer.close()
+                self._reader = self._writer = None
@@ -0,0 +1,97 @@
+# bot/job_template.py
+# One-message job submission: "Field: value" lines in any bot language, checked like the wizard
+import re
+import unicodedata
+
+from bot.i18n import CATALOG, t
+from bot.job_import import ALIASES, WIZARD_FIELDS, check_fields
+
+# Fewest recognised labels for a message to count as a filled-in template
+MIN_FIELDS = 2
+
+# "Verified" answers in the bot's languages, mapped to what check_fields accepts
+YES_WORDS = {"yes", "y", "✅", "true", "1", "si", "sí", "oui", "ja", "sim", "አዎ"}
+NO_WORDS = {"no", "n", "❌", "false", "0", "non", "nein", "nao", "não", "nicht", "አይ", "አይደለም"}
+
+_LABEL_LINE = re.compile(r"^[\W_]*?([^\W\d_][^:：]{0,40}?)[\s*_]*[:：](.*)$")
+
+
+def normalize_label(text: str) -> str:
+    """Label as compared: no accents, markup, emoji or punctuation; case-folded, single spaces"""
+    text = unicodedata.normalize("NFKD", text.replace("’", "'"))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"[^\W_]+", text.casefold()))
+
+
+def _labels():
+    labels = {}
+    for strings in CATALOG.values():
+        for field in WIZARD_FIELDS:
+            labels[normalize_label(strings[f"job_field.{field}"])] = field
+    for field in WIZARD_FIELDS:
+        labels.setdefault(normalize_label(field), field)
+    for alias, field in ALIASES.items():
+        labels.setdefault(normalize_label(alias), field)
+    return labels
+
+
+# Normalised label (any language, the field names themselves and import header aliases) -> field
+LABELS = _labels()
+
+
+def parse_job_message(text: str) -> dict:
+    """Raw values of the labelled fields in ``text`` ({field: value}).
+
+    A line starting with a known label and a colon ("Salary: 20,000 ETB",
+    "*Salaire :* ...", "• ደመወዝ: ...") starts a field; the lines after it, up to
+    the next label, continue its value, so descriptions can span several lines
+    (blank lines included). Text before the first label is ignored. A field
+    given twice keeps the last value.
+    """
+    values, field, lines = {}, None, []
+
+    def close():
+        if field is not None:
+            values[field] = "\n".join(lines).strip()
+
+    for line in text.splitlines():
+        match = _LABEL_LINE.match(line)
+        label = LABELS.get(normalize_label(match.group(1))) if match else None
+        if label is not None:
+            close()
+            field, lines = label, [match.group(2).strip(" *_")]
+        elif field is not None:
+            lines.append(line.rstrip())
+    close()
+    return values
+
+
+def looks_like_template(text: str) -> bool:
+    return len(parse_job_message(text or "")) >= MIN_FIELDS
+
+
+def _answer(field: str, value: str) -> str:
+    if field == "verified":
+        word = value.strip().casefold()
+        if word in YES_WORDS:
+            return "✅"
+        if word in NO_WORDS:
+            return "No"
+    return value
+
+
+def check_job_message(text: str):
+    """Parse and check a whole template in one pass; returns (job, problems) as check_fields does"""
+    values = {field: _answer(field, value) for field, value in parse_job_message(text).items()}
+    return check_fields(values)
+
+
+def check_job_field(field: str, value: str):
+    """Check one answer for ``field``; returns (cleaned value, problem or None)"""
+    job, problems = check_fields({field: _answer(field, value)})
+    return job.get(field), problems.get(field)
+
+
+def template_text(lang_code: str) -> str:
+    """Empty template with the labels in the user's language, one "Label: " line per field"""
+    return "\n".join(f"{t(lang_code, f'job_field.{field}')}: " for field in WIZARD_FIELDS)
@@ -0,0 +1,87 @@
+# bot/keyboards.py
+# Prebuilt inline keyboards, built and serialised once per (screen, language, variant)
+import logging
+
+from telegram import InlineKeyboardMarkup
+
+from bot.i18n import CATALOG, DEFAULT_LANGUAGE, table
+
+logger = logging.getLogger(__name__)
+
+
+class FrozenKeyboard(InlineKeyboardMarkup):
+    """InlineKeyboardMarkup that converts itself to the Bot API dict only once.
+
+    PTB calls ``to_dict()`` on every send/edit, walking each button (and its
+    ``WebAppInfo``). Registry keyboards are immutable and shared, so the result is
+    computed at construction and returned as-is; callers must not mutate it.
+    """
+
+    __slots__ = ("_payload", "_json")
+
+    def __init__(self, inline_keyboard, *, api_kwargs=None):
+        super().__init__(inline_keyboard, api_kwargs=api_kwargs)
+        with self._unfrozen():
+            self._payload = super().to_dict()
+            self._json = super().to_json()
+
+    def to_dict(self, recursive: bool = True):
+        if not recursive:
+            return super().to_dict(recursive=False)
+        return self._payload
+
+    def to_json(self) -> str:
+        return self._json
+
+
+class KeyboardRegistry:
+    """Named keyboard builders plus a cache of their frozen results.
+
+    A builder is ``(messages, variant) -> rows`` where ``messages`` is the catalog
+    table of the requested language and ``variant`` is any hashable describing the
+    user flags the screen depends on. Each combination is built on first use and
+    the same ``FrozenKeyboard`` is handed out afterwards.
+    """
+
+    def __init__(self):
+        self._builders = {}
+        self._cache = {}
+
+    def screen(self, name: str, localized: bool = True):
+        """Decorator registering a builder under ``name``.
+
+        Screens with ``localized=False`` have fixed labels and are cached once for
+        all languages.
+        """
+        def register(builder):
+            self._builders[name] = (builder, localized)
+            return builder
+        return register
+
+    def get(self, name: str, lang: str = DEFAULT_LANGUAGE, variant=None) -> FrozenKeyboard:
+        builder, localized = self._builders[name]
+        if not localized or lang not in CATALOG:
+            lang = DEFAULT_LANGUAGE
+        key = (name, lang, variant)
+        markup = self._cache.get(key)
+        if markup is None:
+            rows = builder(table(lang), variant)
+            markup = self._cache[key] = FrozenKeyboard(rows)
+        return markup
+
+    def prebuild(self, variants=None):
+        """Build every screen for every language up front.
+
+        ``variants`` maps a screen name to the variants to build; screens not listed
+        are built with ``None``.
+        """
+        variants = variants or {}
+        for name, (_, localized) in self._builders.items():
+            for variant in variants.get(name, (None,)):
+                for lang in (CATALOG if localized else (DEFAULT_LANGUAGE,)):
+                    self.get(name, lang, variant)
+        logger.info(f"Prebuilt {len(self._cache)} keyboards for {len(self._builders)} screens")
+
+    def __len__(self):
+        return len(self._cache)
+
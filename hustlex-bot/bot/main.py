@@ -1,17 +1,56 @@
 # bot/main.py
 # States for Telegram Job Posting
 JOB_TITLE, JOB_TYPE, WORK_LOCATION, SALARY, DEADLINE, DESCRIPTION, CLIENT_TYPE, JOB_LINK, COMPANY_NAME, VERIFIED, PREVIOUS_JOBS = range(11)
+# Asking for the fields a one-message job submission left out or got wrong
+JOB_TEMPLATE_FIELD = 11
 import os
 import re
+import json
+import hmac
+import hashlib
+import asyncio
+import sqlite3
+import sys
+import time
 import logging
+import itertools
+import tempfile
 from datetime import datetime
 from dotenv import load_dotenv
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update, WebAppInfo
-from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, MessageHandler, filters, ContextTypes, ConversationHandler
-from telegram.error import TelegramError
-from urllib.parse import urlparse
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup, Update, WebAppInfo, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, MessageHandler, ChatMemberHandler, InlineQueryHandler, filters, ContextTypes, ConversationHandler
+from telegram.error import TelegramError, BadRequest, InvalidToken, NetworkError, RetryAfter, TimedOut
+from urllib.parse import urlencode
 import aiohttp
 
+# Allow sibling modules to be imported as `bot.*` when this file is run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bot.webhook import run_webhook
+from bot.sharding import run_sharded, run_worker
+from bot.update_processor import PerUserUpdateProcessor
+from bot.identity import BotIdentity
+from bot.webapp_probe import ReachabilityProber
+from bot.channel_state import ChannelStateCache, is_transient
+from bot.http_client import HttpClientPool
+from bot.send_scheduler import SendScheduler, BULK, INTERACTIVE
+from bot.i18n import LANGUAGE_NAMES, table, t
+from bot.keyboards import KeyboardRegistry
+from bot.edit_cache import EditFingerprints, fingerprint, message_key
+from bot.user_store import UserStore
+from bot.persistence import SQLitePersistence
+from bot.channel_routing import RoutingTable, fan_out
+from bot.job_store import JobStore
+from bot.inline_search import QueryCache, Debouncer, normalize_query
+from bot.job_alerts import AlertStore, AlertDispatcher, parse_spec, describe_spec
+from bot.job_import import (ImportFormatError, ImportReport, WIZARD_FIELDS, check_fields, clean_link, iter_rows,
+                            validate_job)
+from bot.job_template import check_job_field, check_job_message, looks_like_template, template_text
+from bot.post_expiry import PostExpiry, deadline_timestamp
+from bot.job_digest import DigestPoster, render_digest
+from bot.cv_store import CVStore, CVTooLarge, CHUNK_SIZE
+from bot.cv_extract import ExtractionPipeline, cv_kind
+from bot.profile_sync import ProfileSync, SyncRejected
+
 # Set up logging
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -23,126 +62,394 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 TOKEN = os.environ.get("BOT_TOKEN")
 WEBAPP_URL = os.getenv("WEBAPP_URL", "https://hustlexeth.netlify.app/")
+WEBAPP_PROFILE_URL = f"{WEBAPP_URL}profile.html"
+WEBAPP_PROBE_INTERVAL = float(os.getenv("WEBAPP_PROBE_INTERVAL", "60"))
+WEBAPP_PROBE_TIMEOUT = float(os.getenv("WEBAPP_PROBE_TIMEOUT", "10"))
+CHANNEL_ID = os.getenv("CHANNEL_ID", "-1003194542999")
 DATABASE_URL = os.getenv("DATABASE_URL")  # Unused in current code, placeholder for future integration
+USER_STATE_DB = os.getenv("USER_STATE_DB", "user_state.db")
+JOBS_DB = os.getenv("JOBS_DB", "jobs.db")  # Shared with app.py
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "5"))
+
+# Inline mode (@HustleXet_bot <query>): results per page (Telegram allows 50), how long
+# Telegram and our own cache keep a page, and how long a user's typing must pause
+INLINE_PAGE_SIZE = int(os.getenv("INLINE_PAGE_SIZE", "20"))
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "60"))
+INLINE_DEBOUNCE = float(os.getenv("INLINE_DEBOUNCE", "0.3"))
+
+# Job alerts: how often new jobs are checked against subscriptions, and per-user cap
+ALERT_POLL_INTERVAL = float(os.getenv("ALERT_POLL_INTERVAL", "5"))
+MAX_ALERTS_PER_USER = int(os.getenv("MAX_ALERTS_PER_USER", "10"))
+
+# Channel posts are edited to "closed" at the end of the job's deadline day, in this UTC
+# offset (Addis Ababa); the scheduler also picks up app.py posts every POST_EXPIRY_REFRESH s
+JOB_DEADLINE_UTC_OFFSET = float(os.getenv("JOB_DEADLINE_UTC_OFFSET", "3"))
+POST_EXPIRY_REFRESH = float(os.getenv("POST_EXPIRY_REFRESH", "300"))
+
+# Digest mode: DIGEST_INTERVAL_MINUTES > 0 holds new jobs back and posts them as compact
+# digests, one per channel, every that many minutes or as soon as DIGEST_MAX_JOBS are waiting
+DIGEST_INTERVAL_MINUTES = float(os.getenv("DIGEST_INTERVAL_MINUTES", "0"))
+DIGEST_MAX_JOBS = int(os.getenv("DIGEST_MAX_JOBS", "20"))
+
+# Bulk import (/importjobs): who may import (comma-separated user ids; empty = nobody),
+# the largest file and row count accepted, rows stored per transaction,
+# imported jobs being posted at once and seconds between status message edits
+IMPORT_ALLOWED_USERS = {int(u) for u in os.getenv("IMPORT_ALLOWED_USERS", "").split(",") if u.strip()}
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(10 * 1024 * 1024)))
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "100"))
+IMPORT_POST_WINDOW = int(os.getenv("IMPORT_POST_WINDOW", "10"))
+IMPORT_STATUS_INTERVAL = float(os.getenv("IMPORT_STATUS_INTERVAL", "3"))
+
+# CV files, stored once per content under their SHA-256 (shared with api/main.py)
+CV_STORE_DIR = os.getenv("CV_STORE_DIR", "uploads/cv")
+# Text/skills extraction of uploaded CVs in worker processes (0 workers = off); uploads
+# past CV_EXTRACT_QUEUE waiting ones are not extracted, a CV gets CV_EXTRACT_TIMEOUT seconds
+CV_EXTRACT_WORKERS = int(os.getenv("CV_EXTRACT_WORKERS", str(min(2, os.cpu_count() or 1))))
+CV_EXTRACT_QUEUE = int(os.getenv("CV_EXTRACT_QUEUE", "100"))
+CV_EXTRACT_TIMEOUT = float(os.getenv("CV_EXTRACT_TIMEOUT", "20"))
+
+# Profile sync to the web API (api/main.py's POST /api/profile; empty URL = off): one request
+# PROFILE_SYNC_DELAY seconds after a user's last edit (at most PROFILE_SYNC_MAX_DELAY after
+# the first), retried PROFILE_SYNC_ATTEMPTS times with exponential backoff
+PROFILE_API_URL = os.getenv("PROFILE_API_URL", "")
+PROFILE_SYNC_DELAY = float(os.getenv("PROFILE_SYNC_DELAY", "2"))
+PROFILE_SYNC_MAX_DELAY = float(os.getenv("PROFILE_SYNC_MAX_DELAY", "10"))
+PROFILE_SYNC_ATTEMPTS = int(os.getenv("PROFILE_SYNC_ATTEMPTS", "5"))
+
+# Routing rules (JSON list, see bot/channel_routing.py) sending jobs to channels by
+# job type / location / client type; jobs no rule matches go to CHANNEL_ID
+CHANNEL_ROUTES = os.getenv("CHANNEL_ROUTES", "")
+CHANNEL_POST_ATTEMPTS = int(os.getenv("CHANNEL_POST_ATTEMPTS", "3"))
+
+# Conversation states and user_data (wizard drafts) are saved every PERSISTENCE_INTERVAL
+# seconds; only users active within PERSISTENCE_ACTIVE_DAYS are loaded at startup
+PERSISTENCE_INTERVAL = float(os.getenv("PERSISTENCE_INTERVAL", "10"))
+PERSISTENCE_ACTIVE_DAYS = float(os.getenv("PERSISTENCE_ACTIVE_DAYS", "7"))
+
+# Update ingress: "polling" (default) or "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public HTTPS URL Telegram posts updates to
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # Random per start when unset
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", os.getenv("PORT", "8443")))
+
+# Multi-process mode: BOT_WORKERS > 0 runs an ingress (polling or webhook, per BOT_MODE)
+# that routes each update by user id to one of BOT_WORKERS worker processes over localhost.
+# BOT_ROLE, WORKER_INDEX, WORKER_PORT and WORKER_SECRET are set by the ingress for its workers.
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "0"))
+BOT_ROLE = os.getenv("BOT_ROLE", "")
+WORKER_INDEX = int(os.getenv("WORKER_INDEX", "0"))
+WORKER_PORT = int(os.getenv("WORKER_PORT", "0"))
+WORKER_SECRET = os.getenv("WORKER_SECRET", "")
+WORKER_BASE_PORT = int(os.getenv("WORKER_BASE_PORT", "9100"))
+BOT_API_BASE_URL = os.getenv("BOT_API_BASE_URL")  # e.g. a local Bot API server
+
+# Upper bound on handlers running at once; each user's updates are still handled in order
+MAX_CONCURRENT_UPDATES = int(os.getenv("MAX_CONCURRENT_UPDATES", "32"))
+
+# Update types the handlers below actually consume; everything else is filtered out
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY, Update.MY_CHAT_MEMBER, Update.INLINE_QUERY]
+
+# Shared HTTP connection pool for all outbound requests (started in post_init)
+http_pool = HttpClientPool(
+    limit_per_host=int(os.getenv("HTTP_LIMIT_PER_HOST", "10")),
+    timeout=float(os.getenv("HTTP_TIMEOUT", "15")),
+)
 
-# Simple in-memory storage for CV data and user preferences (replace with database in production)
-user_cvs = {}
-user_languages = {}
-user_profiles = {}
+# Paced outbound sends (Telegram flood limits); channel posts are BULK, replies INTERACTIVE.
+# The global limit is per bot token, so sharded workers split it between them.
+send_scheduler = SendScheduler(
+    global_rate=float(os.getenv("SEND_GLOBAL_RATE", "30")) / max(1, BOT_WORKERS),
+    group_rate=float(os.getenv("SEND_CHANNEL_RATE_PER_MIN", "20")) / 60,
+)
 
-# Helper function to validate bot token
-async def validate_bot_token(token: str, context: ContextTypes.DEFAULT_TYPE) -> bool:
-    try:
-        bot_info = await context.bot.get_me()
-        logger.info(f"Bot token validated successfully: @{bot_info.username}")
-        return True
-    except TelegramError as e:
-        logger.error(f"Invalid bot token: {e}")
-        return False
+# Bot identity (get_me) is verified at startup and refreshed in the background
+BOT_IDENTITY_TTL = float(os.getenv("BOT_IDENTITY_TTL", "3600"))
+bot_identity = BotIdentity(ttl=BOT_IDENTITY_TTL)
 
-# Helper function to check bot permissions in the channel
-async def check_bot_permissions(context: ContextTypes.DEFAULT_TYPE, channel_id: str) -> bool:
-    try:
-        bot_member = await context.bot.get_chat_member(chat_id=channel_id, user_id=context.bot.id)
-        if bot_member.status not in ["administrator", "creator"]:
-            logger.warning(f"Bot is not an admin in channel {channel_id}")
-            return False
-        if not bot_member.can_send_messages:
-            logger.warning(f"Bot lacks 'Send Messages' permission in channel {channel_id}")
-            return False
-        logger.info(f"Bot has necessary permissions in channel {channel_id}")
-        return True
-    except TelegramError as e:
-        logger.error(f"Error checking bot permissions in channel {channel_id}: {e}")
-        return False
+# Channel validity and bot permissions, refreshed only when invalidated
+channel_states = ChannelStateCache()
 
-# Helper function to validate channel ID
-async def validate_channel_id(context: ContextTypes.DEFAULT_TYPE, channel_id: str) -> bool:
-    try:
-        chat_info = await context.bot.get_chat(chat_id=channel_id)
-        logger.info(f"Channel ID {channel_id} is valid: {chat_info.title}")
-        return True
-    except TelegramError as e:
-        logger.error(f"Invalid channel ID {channel_id}: {e}")
-        return False
+# Every posted job (bot wizard and app.py) with a full-text index for /search
+job_store = JobStore(JOBS_DB)
+
+# Rendered inline result pages by normalised query, and per-user keystroke debounce
+inline_cache = QueryCache(max_entries=int(os.getenv("INLINE_CACHE_SIZE", "2000")), ttl=INLINE_CACHE_TIME)
+inline_debouncer = Debouncer(INLINE_DEBOUNCE)
+
+# Alert subscriptions (stored next to the jobs) and the dispatcher matching new jobs
+# against them; alerts go out as BULK sends through send_scheduler
+alert_store = AlertStore(JOBS_DB)
+job_alerts = AlertDispatcher(
+    alert_store,
+    lambda bot, job, user_ids: send_job_alerts(bot, job, user_ids),
+    poll_interval=ALERT_POLL_INTERVAL,
+    shard=(WORKER_INDEX, BOT_WORKERS) if BOT_ROLE == "worker" else None,
+)
+
+# Deadlines of posted jobs; with sharded workers only the first one edits expired posts
+post_expiry = PostExpiry(
+    job_store,
+    lambda bot, posts: expire_job_posts(bot, posts),
+    refresh_interval=POST_EXPIRY_REFRESH,
+)
+
+# Uploaded CVs (content-addressed, deduplicated across users)
+cv_store = CVStore(CV_STORE_DIR)
+# Coalesced profile writes to the web API
+profile_sync = ProfileSync(
+    lambda bot, user_id, profile: post_profile(bot, user_id, profile),
+    delay=PROFILE_SYNC_DELAY,
+    max_delay=PROFILE_SYNC_MAX_DELAY,
+    max_attempts=PROFILE_SYNC_ATTEMPTS,
+)
+# Profile picture last uploaded to the API per user (it is only sent again once it changes)
+synced_profile_pics = {}
+
+cv_extraction = ExtractionPipeline(
+    cv_store.save_text,
+    workers=CV_EXTRACT_WORKERS,
+    max_pending=CV_EXTRACT_QUEUE,
+    timeout=CV_EXTRACT_TIMEOUT,
+)
+
+# Digest mode queue flusher (in the jobs database, shared with app.py); first worker only
+job_digest = DigestPoster(
+    job_store,
+    lambda bot, jobs, sent: send_job_digest(bot, jobs, sent),
+    interval=DIGEST_INTERVAL_MINUTES * 60,
+    max_jobs=DIGEST_MAX_JOBS,
+)
+
+# Compiled once; job_link asks it for the channels of each job
+channel_routes = RoutingTable.from_json(CHANNEL_ROUTES, default_channels=[CHANNEL_ID])
+
+# Last text/markup rendered into each message, so repeated taps don't re-edit it
+edit_fingerprints = EditFingerprints(max_entries=int(os.getenv("EDIT_CACHE_SIZE", "50000")))
+
+# Per-user state (CVs, language, profile, notification preferences) in SQLite with an
+# in-memory hot layer; writes are flushed behind every USER_STATE_FLUSH_INTERVAL seconds
+user_store = UserStore(
+    USER_STATE_DB,
+    flush_interval=float(os.getenv("USER_STATE_FLUSH_INTERVAL", "2")),
+    max_pending=int(os.getenv("USER_STATE_MAX_PENDING", "500")),
+)
+user_cvs = user_store.table("cvs")
+user_languages = user_store.table("languages")
+user_profiles = user_store.table("profiles")
+user_notifications = user_store.table("notifications")
+
+DEFAULT_NOTIFICATIONS = {
+    'job_alerts': True,
+    'application_updates': True,
+    'messages': True,
+    'marketing': False
+}
 
 # Helper function to validate WebApp URL
 async def validate_webapp_url(url: str) -> bool:
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    logger.info(f"WebApp URL {url} is reachable")
-                    return True
-                else:
-                    logger.error(f"WebApp URL {url} returned status {response.status}")
-                    return False
-        except Exception as e:
-            logger.error(f"Error accessing WebApp URL {url}: {e}")
-            return False
+    timeout = aiohttp.ClientTimeout(total=WEBAPP_PROBE_TIMEOUT)
+    try:
+        # Only the status matters; the body is never read
+        async with http_pool.session.get(url, timeout=timeout) as response:
+            if response.status == 200:
+                logger.info(f"WebApp URL {url} is reachable")
+                return True
+            else:
+                logger.error(f"WebApp URL {url} returned status {response.status}")
+                return False
+    except Exception as e:
+        logger.error(f"Error accessing WebApp URL {url}: {e}")
+        return False
+
+# WebApp reachability is probed in the background; menu_callback only reads the flags
+webapp_prober = ReachabilityProber(
+    [WEBAPP_URL, WEBAPP_PROFILE_URL],
+    validate_webapp_url,
+    interval=WEBAPP_PROBE_INTERVAL,
+)
 
 # Enhanced Markdown escaping for Telegram MarkdownV2
 def escape_markdown_v2(text: str) -> str:
     special_chars = r'([_\*\[\]\(\)~`>\#\+\-=\|\{\}\.\!])'
     return re.sub(special_chars, r'\\\1', str(text))
 
+# ---------------------------
+# Inline keyboards (built once per screen, language and variant)
+# ---------------------------
+keyboards = KeyboardRegistry()
+
+@keyboards.screen("start")
+def start_keyboard(messages, variant):
+    return [[InlineKeyboardButton(messages['start.menu'], callback_data="menu")]]
+
+@keyboards.screen("menu")
+def menu_keyboard(messages, profile_available):
+    keyboard = [
+        [InlineKeyboardButton(messages['menu.post_telegram'], callback_data="post_job_telegram")],
+        [InlineKeyboardButton(messages['menu.post_website'], web_app=WebAppInfo(url=f"{WEBAPP_URL}"))],
+    ]
+    # Hide the Profile page while it is down rather than failing the whole menu
+    if profile_available:
+        keyboard.append([InlineKeyboardButton(messages['menu.profile'], web_app=WebAppInfo(url=WEBAPP_PROFILE_URL))])
+    keyboard += [
+        [InlineKeyboardButton(messages['menu.applications'], callback_data="applications")],
+        [InlineKeyboardButton(messages['menu.about'], callback_data="about")],
+        [InlineKeyboardButton(messages['menu.settings'], callback_data="settings")],
+    ]
+    return keyboard
+
+@keyboards.screen("settings")
+def settings_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton(messages['settings.languages'], callback_data="settings_languages")],
+        [InlineKeyboardButton(messages['settings.account'], callback_data="settings_account")],
+        [InlineKeyboardButton(messages['settings.cv'], callback_data="settings_cv")],
+        [InlineKeyboardButton(messages['settings.terms'], callback_data="settings_terms")],
+        [InlineKeyboardButton(messages['settings.back'], callback_data="menu")]
+    ]
+
+@keyboards.screen("languages")
+def languages_keyboard(messages, variant):
+    keyboard = [[InlineKeyboardButton(name, callback_data=f"lang_{code}")] for code, name in LANGUAGE_NAMES.items()]
+    keyboard.append([InlineKeyboardButton(messages['languages.back'], callback_data="settings")])
+    return keyboard
+
+@keyboards.screen("language_updated")
+def language_updated_keyboard(messages, variant):
+    return [[InlineKeyboardButton(messages['language_updated.back'], callback_data="settings_languages")]]
+
+@keyboards.screen("account", localized=False)
+def account_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton("👤 View Profile", callback_data="account_edit_profile")],
+        [InlineKeyboardButton("🔔 Notifications", callback_data="account_notifications")],
+        [InlineKeyboardButton("🗑️ Delete Account", callback_data="account_delete")],
+        [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
+    ]
+
+@keyboards.screen("cv", localized=False)
+def cv_keyboard(messages, has_cv):
+    if has_cv:
+        return [
+            [InlineKeyboardButton("👁️ View Current CV", callback_data="cv_view")],
+            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
+            [InlineKeyboardButton("🗑️ Remove CV", callback_data="cv_remove")],
+            [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
+        ]
+    return [
+        [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
+        [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
+    ]
+
+@keyboards.screen("cv_upload", localized=False)
+def cv_upload_keyboard(messages, variant):
+    return [[InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]]
+
+@keyboards.screen("cv_view", localized=False)
+def cv_view_keyboard(messages, has_cv):
+    keyboard = [[InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")]]
+    if has_cv:
+        keyboard.append([InlineKeyboardButton("🗑️ Remove CV", callback_data="cv_remove")])
+    keyboard.append([InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")])
+    return keyboard
+
+@keyboards.screen("cv_missing", localized=False)
+def cv_missing_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton("📤 Upload CV", callback_data="cv_upload")],
+        [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
+    ]
+
+@keyboards.screen("cv_uploaded", localized=False)
+def cv_uploaded_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton("👁️ View CV", callback_data="cv_view")],
+        [InlineKeyboardButton("📄 My CV Settings", callback_data="settings_cv")]
+    ]
+
+@keyboards.screen("profile", localized=False)
+def profile_keyboard(messages, variant):
+    return [[InlineKeyboardButton("⬅️ Back to Account", callback_data="settings_account")]]
+
+@keyboards.screen("profile_back")
+def profile_back_keyboard(messages, variant):
+    return [[InlineKeyboardButton(messages['profile.back'], callback_data="account_edit_profile")]]
+
+@keyboards.screen("notifications", localized=False)
+def notifications_keyboard(messages, prefs):
+    job_alerts, application_updates, direct_messages, marketing = prefs
+    return [
+        [InlineKeyboardButton(f"🚨 Job Alerts: {'✅ ON' if job_alerts else '❌ OFF'}", 
+                             callback_data="toggle_job_alerts")],
+        [InlineKeyboardButton(f"📄 Application Updates: {'✅ ON' if application_updates else '❌ OFF'}", 
+                             callback_data="toggle_app_updates")],
+        [InlineKeyboardButton(f"💬 Messages: {'✅ ON' if direct_messages else '❌ OFF'}", 
+                             callback_data="toggle_messages")],
+        [InlineKeyboardButton(f"📢 Marketing: {'✅ ON' if marketing else '❌ OFF'}", 
+                             callback_data="toggle_marketing")],
+        [InlineKeyboardButton("⬅️ Back to Account", callback_data="settings_account")]
+    ]
+
+@keyboards.screen("account_delete", localized=False)
+def account_delete_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton("⚠️ Yes, Delete My Account", callback_data="confirm_delete_account")],
+        [InlineKeyboardButton("❌ Cancel", callback_data="settings_account")]
+    ]
+
+@keyboards.screen("account_deleted", localized=False)
+def account_deleted_keyboard(messages, variant):
+    return [[InlineKeyboardButton("🏠 Start Over", callback_data="menu")]]
+
+@keyboards.screen("terms", localized=False)
+def terms_keyboard(messages, variant):
+    return [
+        [InlineKeyboardButton("🔒 Privacy Policy", callback_data="terms_privacy")],
+        [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
+    ]
+
+@keyboards.screen("privacy", localized=False)
+def privacy_keyboard(messages, variant):
+    return [[InlineKeyboardButton("⬅️ Back to Terms", callback_data="settings_terms")]]
+
+# Variants worth building at startup; the rest are built on first use
+KEYBOARD_VARIANTS = {
+    "menu": (True, False),
+    "cv": (True, False),
+    "cv_view": (True, False),
+    "notifications": ((True, True, True, False),),
+}
+
 # ---------------------------
 # /start command
 # ---------------------------
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    if not await validate_bot_token(TOKEN, context):
-        if update.effective_chat:
-            await update.effective_chat.send_message("❌ Error: Invalid bot token. Please contact the bot administrator.")
-        logger.error("Cannot send message due to invalid bot token")
-        return
+    # Answered from memory; raises the recorded auth error so error_handler reports it
+    bot_identity.check()
     
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific welcome messages
-    welcome_messages = {
-        'en': {
-            'welcome': "Welcome to HustleX — tap Menu to open.",
-            'menu': "Menu"
-        },
-        'es': {
-            'welcome': "Bienvenido a HustleX — toca Menú para abrir.",
-            'menu': "Menú"
-        },
-        'fr': {
-            'welcome': "Bienvenue sur HustleX — appuyez sur Menu pour ouvrir.",
-            'menu': "Menu"
-        },
-        'de': {
-            'welcome': "Willkommen bei HustleX — tippen Sie auf Menü zum Öffnen.",
-            'menu': "Menü"
-        },
-        'it': {
-            'welcome': "Benvenuto su HustleX — tocca Menu per aprire.",
-            'menu': "Menu"
-        },
-        'pt': {
-            'welcome': "Bem-vindo ao HustleX — toque em Menu para abrir.",
-            'menu': "Menu"
-        },
-        'am': {
-            'welcome': "ወደ HustleX እንኳን ደህና መጡ — ለመክፈት ሜኑን ይንኩ።",
-            'menu': "ሜኑ"
-        }
-    }
-    
-    messages = welcome_messages.get(lang_code, welcome_messages['en'])
-    keyboard = [[InlineKeyboardButton(messages['menu'], callback_data="menu")]]
+    if context.args and context.args[0].startswith("job_"):
+        # Deep link from a digest button: t.me/<bot>?start=job_<id>
+        await show_job(update, context.args[0][len("job_"):])
+        return
+
+    messages = table(lang_code)
+    keyboard = keyboards.get("start", lang_code)
     
     if update.effective_message:
         await update.effective_message.reply_text(
-            messages['welcome'],
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            messages['start.welcome'],
+            reply_markup=keyboard
         )
     else:
         await update.effective_chat.send_message(
-            messages['welcome'],
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            messages['start.welcome'],
+            reply_markup=keyboard
         )
 
 # ---------------------------
@@ -150,17 +457,34 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ---------------------------
 async def safe_edit_message(query, text, reply_markup=None, parse_mode=None, context=None):
     """Safely edit a message, fallback to sending new message if edit fails"""
+    key = message_key(query)
+    fp = fingerprint(text, reply_markup, parse_mode)
+    # Same content as last time (e.g. a button tapped twice): nothing to do
+    if edit_fingerprints.is_current(key, fp):
+        return
     try:
         await query.edit_message_text(text=text, reply_markup=reply_markup, parse_mode=parse_mode)
-    except Exception:
-        # If editing fails, send a new message instead
-        if context:
-            await context.bot.send_message(
+    except BadRequest as e:
+        if "message is not modified" in str(e).lower():
+            edit_fingerprints.remember(key, fp)
+            return
+        # The message is gone or can't be edited; send a new one instead
+        edit_fingerprints.forget(key)
+        logger.info(f"Edit failed ({e}), sending a new message")
+        if context and query.message is not None:
+            sent = await context.bot.send_message(
                 chat_id=query.message.chat.id,
                 text=text,
                 reply_markup=reply_markup,
                 parse_mode=parse_mode
-        )
+            )
+            edit_fingerprints.remember((sent.chat.id, sent.message_id), fp)
+    except Exception:
+        # Network errors and timeouts may still have applied the edit; don't post a duplicate
+        edit_fingerprints.forget(key)
+        raise
+    else:
+        edit_fingerprints.remember(key, fp)
 
 # ---------------------------
 # Menu callback
@@ -172,103 +496,17 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific menu messages
-    menu_messages = {
-        'en': {
-            'title': "Choose a tab:",
-            'post_telegram': "Post Job in Telegram",
-            'post_website': "Post Job via Website",
-            'profile': "Profile",
-            'applications': "Applications",
-            'about': "About HustleX",
-            'settings': "Settings",
-            'error': "❌ Error: WebApp URL is unreachable. Please try again later or contact support."
-        },
-        'es': {
-            'title': "Elige una pestaña:",
-            'post_telegram': "Publicar Trabajo en Telegram",
-            'post_website': "Publicar Trabajo vía Sitio Web",
-            'profile': "Perfil",
-            'applications': "Aplicaciones",
-            'about': "Acerca de HustleX",
-            'settings': "Configuración",
-            'error': "❌ Error: La URL de la aplicación web no es accesible. Por favor, inténtalo de nuevo más tarde o contacta con soporte."
-        },
-        'fr': {
-            'title': "Choisissez un onglet:",
-            'post_telegram': "Publier un Emploi sur Telegram",
-            'post_website': "Publier un Emploi via le Site Web",
-            'profile': "Profil",
-            'applications': "Candidatures",
-            'about': "À propos de HustleX",
-            'settings': "Paramètres",
-            'error': "❌ Erreur: L'URL de l'application web est inaccessible. Veuillez réessayer plus tard ou contacter le support."
-        },
-        'de': {
-            'title': "Wählen Sie einen Tab:",
-            'post_telegram': "Stelle in Telegram veröffentlichen",
-            'post_website': "Stelle über Website veröffentlichen",
-            'profile': "Profil",
-            'applications': "Bewerbungen",
-            'about': "Über HustleX",
-            'settings': "Einstellungen",
-            'error': "❌ Fehler: WebApp-URL ist nicht erreichbar. Bitte versuchen Sie es später erneut oder kontaktieren Sie den Support."
-        },
-        'it': {
-            'title': "Scegli una scheda:",
-            'post_telegram': "Pubblica Lavoro su Telegram",
-            'post_website': "Pubblica Lavoro via Sito Web",
-            'profile': "Profilo",
-            'applications': "Candidature",
-            'about': "Informazioni su HustleX",
-            'settings': "Impostazioni",
-            'error': "❌ Errore: L'URL dell'applicazione web non è raggiungibile. Riprova più tardi o contatta il supporto."
-        },
-        'pt': {
-            'title': "Escolha uma aba:",
-            'post_telegram': "Publicar Emprego no Telegram",
-            'post_website': "Publicar Emprego via Site",
-            'profile': "Perfil",
-            'applications': "Candidaturas",
-            'about': "Sobre o HustleX",
-            'settings': "Configurações",
-            'error': "❌ Erro: A URL da aplicação web não está acessível. Tente novamente mais tarde ou entre em contato com o suporte."
-        },
-        'am': {
-            'title': "አንድ ትር ይምረጡ:",
-            'post_telegram': "ሥራን በቴሌግራም ያስቀምጡ",
-            'post_website': "ሥራን በድር ጣቢያ ያስቀምጡ",
-            'profile': "መገለጫ",
-            'applications': "ማመልከቻዎች",
-            'about': "ስለ HustleX",
-            'settings': "ቅንብሮች",
-            'error': "❌ ስህተት: የድር መተግበሪያ URL አይደርስም። እባክዎ ቆይተው ይሞክሩ ወይም ድጋፍን ያግኙ።"
-        }
-    }
+    messages = table(lang_code)
     
-    messages = menu_messages.get(lang_code, menu_messages['en'])
-    
-    # Validate WebApp URL before showing menu
-    if not await validate_webapp_url(WEBAPP_URL):
-        try:
-            await q.edit_message_text(messages['error'])
-        except Exception:
-            await context.bot.send_message(
-                chat_id=update.effective_chat.id,
-                text=messages['error']
-            )
+    # WebApp reachability comes from the background prober
+    if not webapp_prober.is_reachable(WEBAPP_URL):
+        await safe_edit_message(q, messages['menu.error'], context=context)
         return
     
-    keyboard = [
-        [InlineKeyboardButton(messages['post_telegram'], callback_data="post_job_telegram")],
-        [InlineKeyboardButton(messages['post_website'], web_app=WebAppInfo(url=f"{WEBAPP_URL}"))],
-        [InlineKeyboardButton(messages['profile'], web_app=WebAppInfo(url=f"{WEBAPP_URL}profile.html"))],
-        [InlineKeyboardButton(messages['applications'], callback_data="applications")],
-        [InlineKeyboardButton(messages['about'], callback_data="about")],
-        [InlineKeyboardButton(messages['settings'], callback_data="settings")],
-    ]
+    # The Profile button is only shown while its page is reachable
+    keyboard = keyboards.get("menu", lang_code, webapp_prober.is_reachable(WEBAPP_PROFILE_URL))
     
-    await safe_edit_message(q, messages['title'], reply_markup=InlineKeyboardMarkup(keyboard), context=context)
+    await safe_edit_message(q, messages['menu.title'], reply_markup=keyboard, context=context)
 
 # ---------------------------
 # Other tab callbacks
@@ -276,7 +514,7 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def applications_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
-    await q.edit_message_text("Applications: (placeholder)")
+    await safe_edit_message(q, "Applications: (placeholder)", context=context)
 
 async def about_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
@@ -296,7 +534,7 @@ async def about_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Join *HustleX* today and turn your skills into opportunities! 🔥 "
         "Because here, *every hustle counts* 💼💎"
     )
-    await q.edit_message_text(about_text, parse_mode="Markdown")
+    await safe_edit_message(q, about_text, parse_mode="Markdown", context=context)
 
 async def settings_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
@@ -305,87 +543,14 @@ async def settings_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific settings messages
-    settings_messages = {
-        'en': {
-            'title': "⚙️ *Settings*",
-            'instruction': "Choose a category to manage your preferences:",
-            'languages': "🌍 Languages",
-            'account': "👤 Account",
-            'cv': "📄 My CV",
-            'terms': "📋 Terms and Conditions",
-            'back': "⬅️ Back to Menu"
-        },
-        'es': {
-            'title': "⚙️ *Configuración*",
-            'instruction': "Elige una categoría para gestionar tus preferencias:",
-            'languages': "🌍 Idiomas",
-            'account': "👤 Cuenta",
-            'cv': "📄 Mi CV",
-            'terms': "📋 Términos y Condiciones",
-            'back': "⬅️ Volver al Menú"
-        },
-        'fr': {
-            'title': "⚙️ *Paramètres*",
-            'instruction': "Choisissez une catégorie pour gérer vos préférences:",
-            'languages': "🌍 Langues",
-            'account': "👤 Compte",
-            'cv': "📄 Mon CV",
-            'terms': "📋 Termes et Conditions",
-            'back': "⬅️ Retour au Menu"
-        },
-        'de': {
-            'title': "⚙️ *Einstellungen*",
-            'instruction': "Wählen Sie eine Kategorie zur Verwaltung Ihrer Einstellungen:",
-            'languages': "🌍 Sprachen",
-            'account': "👤 Konto",
-            'cv': "📄 Mein Lebenslauf",
-            'terms': "📋 Geschäftsbedingungen",
-            'back': "⬅️ Zurück zum Menü"
-        },
-        'it': {
-            'title': "⚙️ *Impostazioni*",
-            'instruction': "Scegli una categoria per gestire le tue preferenze:",
-            'languages': "🌍 Lingue",
-            'account': "👤 Account",
-            'cv': "📄 Il Mio CV",
-            'terms': "📋 Termini e Condizioni",
-            'back': "⬅️ Torna al Menu"
-        },
-        'pt': {
-            'title': "⚙️ *Configurações*",
-            'instruction': "Escolha uma categoria para gerenciar suas preferências:",
-            'languages': "🌍 Idiomas",
-            'account': "👤 Conta",
-            'cv': "📄 Meu CV",
-            'terms': "📋 Termos e Condições",
-            'back': "⬅️ Voltar ao Menu"
-        },
-        'am': {
-            'title': "⚙️ *ቅንብሮች*",
-            'instruction': "የሚመርጡትን ለማስተካከል አንድ ምድብ ይምረጡ:",
-            'languages': "🌍 ቋንቋዎች",
-            'account': "👤 መለያ",
-            'cv': "📄 የእኔ CV",
-            'terms': "📋 ውሎች እና ሁኔታዎች",
-            'back': "⬅️ ወደ ሜኑ ይመለሱ"
-        }
-    }
-    
-    messages = settings_messages.get(lang_code, settings_messages['en'])
+    messages = table(lang_code)
     
-    keyboard = [
-        [InlineKeyboardButton(messages['languages'], callback_data="settings_languages")],
-        [InlineKeyboardButton(messages['account'], callback_data="settings_account")],
-        [InlineKeyboardButton(messages['cv'], callback_data="settings_cv")],
-        [InlineKeyboardButton(messages['terms'], callback_data="settings_terms")],
-        [InlineKeyboardButton(messages['back'], callback_data="menu")]
-    ]
+    keyboard = keyboards.get("settings", lang_code)
     
     await safe_edit_message(
         q,
-        f"{messages['title']}\n\n{messages['instruction']}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        f"{messages['settings.title']}\n\n{messages['settings.instruction']}",
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -400,88 +565,16 @@ async def settings_languages_cb(update: Update, context: ContextTypes.DEFAULT_TY
     user_id = update.effective_user.id
     current_lang = user_languages.get(user_id, 'en')
     
-    lang_names = {
-        'en': '🇺🇸 English',
-        'es': '🇪🇸 Español', 
-        'fr': '🇫🇷 Français',
-        'de': '🇩🇪 Deutsch',
-        'it': '🇮🇹 Italiano',
-        'pt': '🇵🇹 Português',
-        'am': '🇪🇹 አማርኛ (Amharic)'
-    }
-    
-    current_lang_name = lang_names.get(current_lang, 'English')
+    current_lang_name = LANGUAGE_NAMES.get(current_lang, 'English')
+    msg = table(current_lang)
     
-    # Language-specific messages
-    messages = {
-        'en': {
-            'title': "🌍 *Language Settings*",
-            'instruction': "Select your preferred language:",
-            'current': f"📝 *Current:* {current_lang_name}",
-            'tip': "💡 *Tip:* Language changes will apply to all bot messages.",
-            'back': "⬅️ Back to Settings"
-        },
-        'es': {
-            'title': "🌍 *Configuración de Idioma*",
-            'instruction': "Selecciona tu idioma preferido:",
-            'current': f"📝 *Actual:* {current_lang_name}",
-            'tip': "💡 *Consejo:* Los cambios de idioma se aplicarán a todos los mensajes del bot.",
-            'back': "⬅️ Volver a Configuración"
-        },
-        'fr': {
-            'title': "🌍 *Paramètres de Langue*",
-            'instruction': "Sélectionnez votre langue préférée:",
-            'current': f"📝 *Actuel:* {current_lang_name}",
-            'tip': "💡 *Conseil:* Les changements de langue s'appliqueront à tous les messages du bot.",
-            'back': "⬅️ Retour aux Paramètres"
-        },
-        'de': {
-            'title': "🌍 *Spracheinstellungen*",
-            'instruction': "Wählen Sie Ihre bevorzugte Sprache:",
-            'current': f"📝 *Aktuell:* {current_lang_name}",
-            'tip': "💡 *Tipp:* Sprachänderungen gelten für alle Bot-Nachrichten.",
-            'back': "⬅️ Zurück zu Einstellungen"
-        },
-        'it': {
-            'title': "🌍 *Impostazioni Lingua*",
-            'instruction': "Seleziona la tua lingua preferita:",
-            'current': f"📝 *Attuale:* {current_lang_name}",
-            'tip': "💡 *Suggerimento:* Le modifiche della lingua si applicheranno a tutti i messaggi del bot.",
-            'back': "⬅️ Torna alle Impostazioni"
-        },
-        'pt': {
-            'title': "🌍 *Configurações de Idioma*",
-            'instruction': "Selecione seu idioma preferido:",
-            'current': f"📝 *Atual:* {current_lang_name}",
-            'tip': "💡 *Dica:* As mudanças de idioma se aplicarão a todas as mensagens do bot.",
-            'back': "⬅️ Voltar às Configurações"
-        },
-        'am': {
-            'title': "🌍 *የቋንቋ ቅንብሮች*",
-            'instruction': "የሚመርጡትን ቋንቋ ይምረጡ:",
-            'current': f"📝 *አሁን ያለ:* {current_lang_name}",
-            'tip': "💡 *ምክር:* የቋንቋ ለውጦች ለሁሉም የቦት መልዕክቶች ይተገበራሉ።",
-            'back': "⬅️ ወደ ቅንብሮች ይመለሱ"
-        }
-    }
-    
-    msg = messages.get(current_lang, messages['en'])
-    
-    keyboard = [
-        [InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")],
-        [InlineKeyboardButton("🇪🇸 Español", callback_data="lang_es")],
-        [InlineKeyboardButton("🇫🇷 Français", callback_data="lang_fr")],
-        [InlineKeyboardButton("🇩🇪 Deutsch", callback_data="lang_de")],
-        [InlineKeyboardButton("🇮🇹 Italiano", callback_data="lang_it")],
-        [InlineKeyboardButton("🇵🇹 Português", callback_data="lang_pt")],
-        [InlineKeyboardButton("🇪🇹 አማርኛ (Amharic)", callback_data="lang_am")],
-        [InlineKeyboardButton(msg['back'], callback_data="settings")]
-    ]
+    keyboard = keyboards.get("languages", current_lang)
     
     await safe_edit_message(
         q,
-        f"{msg['title']}\n\n{msg['instruction']}\n\n{msg['current']}\n{msg['tip']}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        f"{msg['languages.title']}\n\n{msg['languages.instruction']}\n\n"
+        f"{t(current_lang, 'languages.current', lang_name=current_lang_name)}\n{msg['languages.tip']}",
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -491,12 +584,7 @@ async def settings_account_cb(update: Update, context: ContextTypes.DEFAULT_TYPE
     await q.answer()
     
     user = update.effective_user
-    keyboard = [
-        [InlineKeyboardButton("👤 View Profile", callback_data="account_edit_profile")],
-        [InlineKeyboardButton("🔔 Notifications", callback_data="account_notifications")],
-        [InlineKeyboardButton("🗑️ Delete Account", callback_data="account_delete")],
-        [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
-    ]
+    keyboard = keyboards.get("account")
     
     await safe_edit_message(
         q,
@@ -506,7 +594,7 @@ async def settings_account_cb(update: Update, context: ContextTypes.DEFAULT_TYPE
         f"• Username: @{user.username or 'Not set'}\n"
         f"• User ID: {user.id}\n\n"
         f"⚙️ Manage your account settings below:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -520,18 +608,10 @@ async def settings_cv_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     if has_cv:
         cv_info = user_cvs[user_id]
-        keyboard = [
-            [InlineKeyboardButton("👁️ View Current CV", callback_data="cv_view")],
-            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("🗑️ Remove CV", callback_data="cv_remove")],
-            [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
-        ]
+        keyboard = keyboards.get("cv", variant=True)
         status_text = f"✅ CV uploaded: {cv_info.get('filename', 'Unknown')}"
     else:
-        keyboard = [
-            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
-        ]
+        keyboard = keyboards.get("cv", variant=False)
         status_text = "❌ No CV uploaded"
     
     await safe_edit_message(
@@ -542,7 +622,7 @@ async def settings_cv_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"📏 *Max file size:* 16 MB\n\n"
         f"💡 *Tip:* A well-formatted CV increases your chances of getting hired!\n\n"
         f"Choose an option below:",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -551,10 +631,7 @@ async def settings_terms_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
     
-    keyboard = [
-        [InlineKeyboardButton("🔒 Privacy Policy", callback_data="terms_privacy")],
-        [InlineKeyboardButton("⬅️ Back to Settings", callback_data="settings")]
-    ]
+    keyboard = keyboards.get("terms")
     
     terms_text = (
         "📋 *Terms and Conditions*\n\n"
@@ -576,7 +653,7 @@ async def settings_terms_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await safe_edit_message(
         q,
         terms_text,
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -595,67 +672,15 @@ async def language_selection(update: Update, context: ContextTypes.DEFAULT_TYPE)
     # Store the user's language preference
     user_languages[user_id] = lang_code
     
-    lang_names = {
-        'en': '🇺🇸 English',
-        'es': '🇪🇸 Español', 
-        'fr': '🇫🇷 Français',
-        'de': '🇩🇪 Deutsch',
-        'it': '🇮🇹 Italiano',
-        'pt': '🇵🇹 Português',
-        'am': '🇪🇹 አማርኛ (Amharic)'
-    }
-    
-    selected_lang = lang_names.get(lang_code, 'English')
-    
-    # Language-specific confirmation messages
-    confirmation_messages = {
-        'en': {
-            'title': "✅ *Language Updated!*",
-            'message': f"🌍 *Selected Language:* {selected_lang}\n\n📝 All bot messages will now be displayed in your selected language.",
-            'back': "⬅️ Back to Languages"
-        },
-        'es': {
-            'title': "✅ *¡Idioma Actualizado!*",
-            'message': f"🌍 *Idioma Seleccionado:* {selected_lang}\n\n📝 Todos los mensajes del bot ahora se mostrarán en tu idioma seleccionado.",
-            'back': "⬅️ Volver a Idiomas"
-        },
-        'fr': {
-            'title': "✅ *Langue Mise à Jour!*",
-            'message': f"🌍 *Langue Sélectionnée:* {selected_lang}\n\n📝 Tous les messages du bot s'afficheront maintenant dans votre langue sélectionnée.",
-            'back': "⬅️ Retour aux Langues"
-        },
-        'de': {
-            'title': "✅ *Sprache Aktualisiert!*",
-            'message': f"🌍 *Ausgewählte Sprache:* {selected_lang}\n\n📝 Alle Bot-Nachrichten werden jetzt in Ihrer ausgewählten Sprache angezeigt.",
-            'back': "⬅️ Zurück zu Sprachen"
-        },
-        'it': {
-            'title': "✅ *Lingua Aggiornata!*",
-            'message': f"🌍 *Lingua Selezionata:* {selected_lang}\n\n📝 Tutti i messaggi del bot ora verranno visualizzati nella tua lingua selezionata.",
-            'back': "⬅️ Torna alle Lingue"
-        },
-        'pt': {
-            'title': "✅ *Idioma Atualizado!*",
-            'message': f"🌍 *Idioma Selecionado:* {selected_lang}\n\n📝 Todas as mensagens do bot agora serão exibidas no seu idioma selecionado.",
-            'back': "⬅️ Voltar aos Idiomas"
-        },
-        'am': {
-            'title': "✅ *ቋንቋ ተዘምኗል!*",
-            'message': f"🌍 *የተመረጠ ቋንቋ:* {selected_lang}\n\n📝 ሁሉም የቦት መልዕክቶች አሁን በተመረጠዎ ቋንቋ ይታያሉ።",
-            'back': "⬅️ ወደ ቋንቋዎች ይመለሱ"
-        }
-    }
-    
-    messages = confirmation_messages.get(lang_code, confirmation_messages['en'])
+    selected_lang = LANGUAGE_NAMES.get(lang_code, 'English')
+    messages = table(lang_code)
     
-    keyboard = [
-        [InlineKeyboardButton(messages['back'], callback_data="settings_languages")]
-    ]
+    keyboard = keyboards.get("language_updated", lang_code)
     
     await safe_edit_message(
         q,
-        f"{messages['title']}\n\n{messages['message']}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        f"{messages['language_updated.title']}\n\n{t(lang_code, 'language_updated.message', lang_name=selected_lang)}",
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -664,9 +689,7 @@ async def cv_upload_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
     
-    keyboard = [
-        [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
-    ]
+    keyboard = keyboards.get("cv_upload")
     
     await safe_edit_message(
         q,
@@ -679,11 +702,38 @@ async def cv_upload_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• Maximum file size: 16 MB\n"
         "• File should be clearly readable\n\n"
         "💡 *Tip:* Make sure your CV is up-to-date with your latest experience!",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
 
+async def cv_skills_line(user_id) -> str:
+    """The "Skills found" line of the CV view (empty while the CV is still being read)"""
+    try:
+        extracted = await asyncio.to_thread(cv_store.text_for, f"tg:{user_id}")
+    except sqlite3.Error as e:
+        logger.error(f"Failed to read extracted CV text of user {user_id}: {e}")
+        return ""
+    if extracted is None:
+        return ""
+    if extracted["error"]:
+        return "🛠️ *Skills found:* could not read the file's text\n"
+    skills = ", ".join(extracted["skills"][:15]) or "none recognised"
+    return f"🛠️ *Skills found:* {skills}\n"
+
+async def queue_cv_extraction(stored: dict):
+    """Hand a stored CV to the extraction workers, unless that file was read already"""
+    kind = cv_kind(stored.get("filename"), stored.get("mime_type"))
+    if kind is None or CV_EXTRACT_WORKERS <= 0:
+        return
+    try:
+        if await asyncio.to_thread(cv_store.has_text, stored["sha256"]):
+            return
+    except sqlite3.Error as e:
+        logger.error(f"Failed to check extracted CV text: {e}")
+        return
+    cv_extraction.submit(stored["sha256"], cv_store.path_for(stored["sha256"]), kind)
+
 async def cv_view_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     q = update.callback_query
     await q.answer()
@@ -692,32 +742,27 @@ async def cv_view_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     if user_id in user_cvs and user_cvs[user_id] is not None:
         cv_info = user_cvs[user_id]
-        keyboard = [
-            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("🗑️ Remove CV", callback_data="cv_remove")],
-            [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
-        ]
+        keyboard = keyboards.get("cv_view", variant=True)
+        skills_line = await cv_skills_line(user_id)
         
         await safe_edit_message(
             q,
             f"👁️ *View CV*\n\n"
             f"📁 *File:* {cv_info.get('filename', 'Unknown')}\n"
             f"📏 *Size:* {cv_info.get('file_size', 'Unknown')} bytes\n"
-            f"📅 *Uploaded:* {cv_info.get('upload_date', 'Unknown')}\n\n"
+            f"📅 *Uploaded:* {cv_info.get('upload_date', 'Unknown')}\n"
+            f"{skills_line}\n"
             f"📝 *Your CV is ready for:*\n"
             f"• Sharing with potential employers\n"
             f"• Job applications through HustleX\n"
             f"• Profile showcasing\n\n"
             f"💼 *Want to update or remove your CV?*",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown",
             context=context
         )
     else:
-        keyboard = [
-            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
-        ]
+        keyboard = keyboards.get("cv_view", variant=False)
         
         await safe_edit_message(
             q,
@@ -729,7 +774,7 @@ async def cv_view_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "• Share it with potential employers\n"
             "• Update it anytime\n\n"
             "💼 *Ready to upload your CV?*",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown",
             context=context
         )
@@ -745,13 +790,11 @@ async def cv_remove_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Check if user has a CV
     if user_id in user_cvs and user_cvs[user_id] is not None:
-        # Remove the CV from storage
+        # Remove the CV from storage (the file goes once no other user has the same one)
         del user_cvs[user_id]
+        await asyncio.to_thread(cv_store.release, f"tg:{user_id}")
         
-        keyboard = [
-            [InlineKeyboardButton("📤 Upload New CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
-        ]
+        keyboard = keyboards.get("cv_view", variant=False)
         
         await safe_edit_message(
             q,
@@ -762,22 +805,19 @@ async def cv_remove_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "• Your profile remains active\n"
             "• Previous job applications are unaffected\n\n"
             "💼 *Ready to upload a new CV?*",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown",
             context=context
         )
     else:
-        keyboard = [
-            [InlineKeyboardButton("📤 Upload CV", callback_data="cv_upload")],
-            [InlineKeyboardButton("⬅️ Back to My CV", callback_data="settings_cv")]
-        ]
+        keyboard = keyboards.get("cv_missing")
         
         await safe_edit_message(
             q,
             "❌ *No CV Found*\n\n"
             "There's no CV to remove. You haven't uploaded one yet.\n\n"
             "💼 *Want to upload your CV?*",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown",
             context=context
         )
@@ -797,9 +837,7 @@ async def account_edit_profile_handler(update: Update, context: ContextTypes.DEF
     telegram_username = f"@{user.username}" if user.username else "Not set"
     has_photo = False
     
-    keyboard = [
-        [InlineKeyboardButton("⬅️ Back to Account", callback_data="settings_account")]
-    ]
+    keyboard = keyboards.get("profile")
     
     await safe_edit_message(
         q,
@@ -808,7 +846,7 @@ async def account_edit_profile_handler(update: Update, context: ContextTypes.DEF
         f"• Username: {telegram_username}\n"
         f"• User ID: {user.id}\n\n"
         f"ℹ️ Profile data is inherited from Telegram and not editable here.",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -822,57 +860,19 @@ async def edit_name_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific messages
-    title = {
-        'en': "📝 *Edit Name*",
-        'es': "📝 *Editar Nombre*",
-        'fr': "📝 *Modifier le Nom*",
-        'de': "📝 *Name Bearbeiten*",
-        'it': "📝 *Modifica Nome*",
-        'pt': "📝 *Editar Nome*",
-        'am': "📝 *ስም ማስተካከል*"
-    }.get(lang_code, "📝 *Edit Name*")
-    
-    prompt = {
-        'en': "Please send your new name as a message.",
-        'es': "Por favor, envía tu nuevo nombre como mensaje.",
-        'fr': "Veuillez envoyer votre nouveau nom en message.",
-        'de': "Bitte senden Sie Ihren neuen Namen als Nachricht.",
-        'it': "Invia il tuo nuovo nome come messaggio.",
-        'pt': "Por favor, envie seu novo nome como mensagem.",
-        'am': "እባክዎ አዲስ ስምዎን እንደ መልዕክት ይላኩ።"
-    }.get(lang_code, "Please send your new name as a message.")
-    
-    note = {
-        'en': "💡 *Note:* This will be used for your HustleX profile and job applications.",
-        'es': "💡 *Nota:* Esto se utilizará para tu perfil de HustleX y solicitudes de trabajo.",
-        'fr': "💡 *Remarque:* Ceci sera utilisé pour votre profil HustleX et vos candidatures.",
-        'de': "💡 *Hinweis:* Dies wird für Ihr HustleX-Profil und Bewerbungen verwendet.",
-        'it': "💡 *Nota:* Questo sarà utilizzato per il tuo profilo HustleX e le candidature di lavoro.",
-        'pt': "💡 *Nota:* Isso será usado para seu perfil HustleX e candidaturas a empregos.",
-        'am': "💡 *ማሳሰቢያ:* ይህ ለ HustleX መገለጫዎ እና ለሥራ ማመልከቻዎች ጥቅም ላይ ይውላል።"
-    }.get(lang_code, "💡 *Note:* This will be used for your HustleX profile and job applications.")
-    
-    back_text = {
-        'en': "⬅️ Back to Profile",
-        'es': "⬅️ Volver al Perfil",
-        'fr': "⬅️ Retour au Profil",
-        'de': "⬅️ Zurück zum Profil",
-        'it': "⬅️ Torna al Profilo",
-        'pt': "⬅️ Voltar ao Perfil",
-        'am': "⬅️ ወደ መገለጫ ይመለሱ"
-    }.get(lang_code, "⬅️ Back to Profile")
+    # Catalog strings for the user's language
+    title = t(lang_code, 'edit_name.title')
+    prompt = t(lang_code, 'edit_name.prompt')
+    note = t(lang_code, 'edit_name.note')
     
-    keyboard = [
-        [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-    ]
+    keyboard = keyboards.get("profile_back", lang_code)
     
     await safe_edit_message(
         q,
         f"{title}\n\n"
         f"{prompt}\n\n"
         f"{note}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -889,57 +889,19 @@ async def edit_contact_handler(update: Update, context: ContextTypes.DEFAULT_TYP
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific messages
-    title = {
-        'en': "📞 *Edit Contact Information*",
-        'es': "📞 *Editar Información de Contacto*",
-        'fr': "📞 *Modifier les Coordonnées*",
-        'de': "📞 *Kontaktinformationen Bearbeiten*",
-        'it': "📞 *Modifica Informazioni di Contatto*",
-        'pt': "📞 *Editar Informações de Contato*",
-        'am': "📞 *የመገኛ መረጃ ማስተካከል*"
-    }.get(lang_code, "📞 *Edit Contact Information*")
-    
-    prompt = {
-        'en': "Please send your contact information as a message.",
-        'es': "Por favor, envía tu información de contacto como mensaje.",
-        'fr': "Veuillez envoyer vos coordonnées en message.",
-        'de': "Bitte senden Sie Ihre Kontaktinformationen als Nachricht.",
-        'it': "Invia le tue informazioni di contatto come messaggio.",
-        'pt': "Por favor, envie suas informações de contato como mensagem.",
-        'am': "እባክዎ የመገኛ መረጃዎን እንደ መልዕክት ይላኩ።"
-    }.get(lang_code, "Please send your contact information as a message.")
-    
-    tip = {
-        'en': "💡 *Tip:* You can include email, phone number, or other preferred contact methods.",
-        'es': "💡 *Consejo:* Puedes incluir correo electrónico, número de teléfono u otros métodos de contacto preferidos.",
-        'fr': "💡 *Conseil:* Vous pouvez inclure email, numéro de téléphone ou autres méthodes de contact préférées.",
-        'de': "💡 *Tipp:* Sie können E-Mail, Telefonnummer oder andere bevorzugte Kontaktmethoden angeben.",
-        'it': "💡 *Suggerimento:* Puoi includere email, numero di telefono o altri metodi di contatto preferiti.",
-        'pt': "💡 *Dica:* Você pode incluir email, número de telefone ou outros métodos de contato preferidos.",
-        'am': "💡 *ምክር:* ኢሜይል፣ ስልክ ቁጥር ወይም ሌሎች የሚመርጧቸውን የመገናኛ ዘዴዎች ማካተት ይችላሉ።"
-    }.get(lang_code, "💡 *Tip:* You can include email, phone number, or other preferred contact methods.")
-    
-    back_text = {
-        'en': "⬅️ Back to Profile",
-        'es': "⬅️ Volver al Perfil",
-        'fr': "⬅️ Retour au Profil",
-        'de': "⬅️ Zurück zum Profil",
-        'it': "⬅️ Torna al Profilo",
-        'pt': "⬅️ Voltar ao Perfil",
-        'am': "⬅️ ወደ መገለጫ ይመለሱ"
-    }.get(lang_code, "⬅️ Back to Profile")
+    # Catalog strings for the user's language
+    title = t(lang_code, 'edit_contact.title')
+    prompt = t(lang_code, 'edit_contact.prompt')
+    tip = t(lang_code, 'edit_contact.tip')
     
-    keyboard = [
-        [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-    ]
+    keyboard = keyboards.get("profile_back", lang_code)
     
     await safe_edit_message(
         q,
         f"{title}\n\n"
         f"{prompt}\n\n"
         f"{tip}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -956,57 +918,19 @@ async def edit_age_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific messages
-    title = {
-        'en': "🎂 *Edit Age*",
-        'es': "🎂 *Editar Edad*",
-        'fr': "🎂 *Modifier l'Âge*",
-        'de': "🎂 *Alter Bearbeiten*",
-        'it': "🎂 *Modifica Età*",
-        'pt': "🎂 *Editar Idade*",
-        'am': "🎂 *እድሜ ማስተካከል*"
-    }.get(lang_code, "🎂 *Edit Age*")
-    
-    prompt = {
-        'en': "Please send your age as a number.",
-        'es': "Por favor, envía tu edad como un número.",
-        'fr': "Veuillez envoyer votre âge sous forme de nombre.",
-        'de': "Bitte senden Sie Ihr Alter als Zahl.",
-        'it': "Invia la tua età come numero.",
-        'pt': "Por favor, envie sua idade como um número.",
-        'am': "እባክዎ እድሜዎን እንደ ቁጥር ይላኩ።"
-    }.get(lang_code, "Please send your age as a number.")
-    
-    note = {
-        'en': "💡 *Note:* This information will be used for job matching and statistics.",
-        'es': "💡 *Nota:* Esta información se utilizará para la coincidencia de trabajos y estadísticas.",
-        'fr': "💡 *Remarque:* Ces informations seront utilisées pour la correspondance d'emploi et les statistiques.",
-        'de': "💡 *Hinweis:* Diese Information wird für Job-Matching und Statistiken verwendet.",
-        'it': "💡 *Nota:* Queste informazioni saranno utilizzate per l'abbinamento di lavoro e le statistiche.",
-        'pt': "💡 *Nota:* Esta informação será usada para correspondência de emprego e estatísticas.",
-        'am': "💡 *ማሳሰቢያ:* ይህ መረጃ ለሥራ ማዛመድ እና ለስታቲስቲክስ ጥቅም ላይ ይውላል።"
-    }.get(lang_code, "💡 *Note:* This information will be used for job matching and statistics.")
-    
-    back_text = {
-        'en': "⬅️ Back to Profile",
-        'es': "⬅️ Volver al Perfil",
-        'fr': "⬅️ Retour au Profil",
-        'de': "⬅️ Zurück zum Profil",
-        'it': "⬅️ Torna al Profilo",
-        'pt': "⬅️ Voltar ao Perfil",
-        'am': "⬅️ ወደ መገለጫ ይመለሱ"
-    }.get(lang_code, "⬅️ Back to Profile")
+    # Catalog strings for the user's language
+    title = t(lang_code, 'edit_age.title')
+    prompt = t(lang_code, 'edit_age.prompt')
+    note = t(lang_code, 'edit_age.note')
     
-    keyboard = [
-        [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-    ]
+    keyboard = keyboards.get("profile_back", lang_code)
     
     await safe_edit_message(
         q,
         f"{title}\n\n"
         f"{prompt}\n\n"
         f"{note}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1023,57 +947,19 @@ async def edit_photo_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user_id = update.effective_user.id
     lang_code = user_languages.get(user_id, 'en')
     
-    # Language-specific messages
-    title = {
-        'en': "📸 *Update Profile Photo*",
-        'es': "📸 *Actualizar Foto de Perfil*",
-        'fr': "📸 *Mettre à Jour la Photo de Profil*",
-        'de': "📸 *Profilbild Aktualisieren*",
-        'it': "📸 *Aggiorna Foto Profilo*",
-        'pt': "📸 *Atualizar Foto de Perfil*",
-        'am': "📸 *የመገለጫ ፎቶ ማዘመን*"
-    }.get(lang_code, "📸 *Update Profile Photo*")
-    
-    prompt = {
-        'en': "Please send a new photo for your profile.",
-        'es': "Por favor, envía una nueva foto para tu perfil.",
-        'fr': "Veuillez envoyer une nouvelle photo pour votre profil.",
-        'de': "Bitte senden Sie ein neues Foto für Ihr Profil.",
-        'it': "Invia una nuova foto per il tuo profilo.",
-        'pt': "Por favor, envie uma nova foto para o seu perfil.",
-        'am': "እባክዎ ለመገለጫዎ አዲስ ፎቶ ይላኩ።"
-    }.get(lang_code, "Please send a new photo for your profile.")
-    
-    tip = {
-        'en': "💡 *Tip:* A professional profile photo increases your chances of getting hired!",
-        'es': "💡 *Consejo:* ¡Una foto de perfil profesional aumenta tus posibilidades de ser contratado!",
-        'fr': "💡 *Conseil:* Une photo de profil professionnelle augmente vos chances d'être embauché !",
-        'de': "💡 *Tipp:* Ein professionelles Profilbild erhöht Ihre Chancen, eingestellt zu werden!",
-        'it': "💡 *Suggerimento:* Una foto profilo professionale aumenta le tue possibilità di essere assunto!",
-        'pt': "💡 *Dica:* Uma foto de perfil profissional aumenta suas chances de ser contratado!",
-        'am': "💡 *ምክር:* ሙያዊ የመገለጫ ፎቶ የመቀጠር እድልዎን ይጨምራል!"
-    }.get(lang_code, "💡 *Tip:* A professional profile photo increases your chances of getting hired!")
-    
-    back_text = {
-        'en': "⬅️ Back to Profile",
-        'es': "⬅️ Volver al Perfil",
-        'fr': "⬅️ Retour au Profil",
-        'de': "⬅️ Zurück zum Profil",
-        'it': "⬅️ Torna al Profilo",
-        'pt': "⬅️ Voltar ao Perfil",
-        'am': "⬅️ ወደ መገለጫ ይመለሱ"
-    }.get(lang_code, "⬅️ Back to Profile")
+    # Catalog strings for the user's language
+    title = t(lang_code, 'edit_photo.title')
+    prompt = t(lang_code, 'edit_photo.prompt')
+    tip = t(lang_code, 'edit_photo.tip')
     
-    keyboard = [
-        [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-    ]
+    keyboard = keyboards.get("profile_back", lang_code)
     
     await safe_edit_message(
         q,
         f"{title}\n\n"
         f"{prompt}\n\n"
         f"{tip}",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1089,121 +975,57 @@ async def text_input_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
     # Get user's language preference
     lang_code = user_languages.get(user_id, 'en')
     
-    # Initialize user profile if not exists
-    if user_id not in user_profiles:
-        user_profiles[user_id] = {}
-    
-    # Language-specific back button text
-    back_text = {
-        'en': "⬅️ Back to Profile",
-        'es': "⬅️ Volver al Perfil",
-        'fr': "⬅️ Retour au Profil",
-        'de': "⬅️ Zurück zum Profil",
-        'it': "⬅️ Torna al Profilo",
-        'pt': "⬅️ Voltar ao Perfil",
-        'am': "⬅️ ወደ መገለጫ ይመለሱ"
-    }.get(lang_code, "⬅️ Back to Profile")
+    # Work on a copy of the profile; assigning it back marks it for the store
+    profile = dict(user_profiles.get(user_id, {}))
     
-    keyboard = [
-        [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-    ]
+    keyboard = keyboards.get("profile_back", lang_code)
     
     # Check what kind of input we're waiting for
     if context.user_data.get('awaiting_input') == 'name':
         # Store the new name
-        user_profiles[user_id]['custom_name'] = message_text
+        profile['custom_name'] = message_text
+        user_profiles[user_id] = profile
         
         # Clear the awaiting input flag
         context.user_data.pop('awaiting_input', None)
         
-        # Language-specific messages
-        title = {
-            'en': "✅ *Name Updated Successfully!*",
-            'es': "✅ *¡Nombre Actualizado Exitosamente!*",
-            'fr': "✅ *Nom Mis à Jour avec Succès!*",
-            'de': "✅ *Name Erfolgreich Aktualisiert!*",
-            'it': "✅ *Nome Aggiornato con Successo!*",
-            'pt': "✅ *Nome Atualizado com Sucesso!*",
-            'am': "✅ *ስም በተሳካ ሁኔታ ተዘምኗል!*"
-        }.get(lang_code, "✅ *Name Updated Successfully!*")
-        
-        updated_to = {
-            'en': f"Your profile name has been changed to: *{message_text}*",
-            'es': f"Tu nombre de perfil ha sido cambiado a: *{message_text}*",
-            'fr': f"Votre nom de profil a été changé à: *{message_text}*",
-            'de': f"Ihr Profilname wurde geändert zu: *{message_text}*",
-            'it': f"Il tuo nome del profilo è stato cambiato a: *{message_text}*",
-            'pt': f"Seu nome de perfil foi alterado para: *{message_text}*",
-            'am': f"የመገለጫ ስምዎ ወደ: *{message_text}* ተቀይሯል"
-        }.get(lang_code, f"Your profile name has been changed to: *{message_text}*")
-        
-        note = {
-            'en': "This name will be used for all your HustleX activities.",
-            'es': "Este nombre se utilizará para todas tus actividades en HustleX.",
-            'fr': "Ce nom sera utilisé pour toutes vos activités HustleX.",
-            'de': "Dieser Name wird für alle Ihre HustleX-Aktivitäten verwendet.",
-            'it': "Questo nome sarà utilizzato per tutte le tue attività su HustleX.",
-            'pt': "Este nome será usado para todas as suas atividades no HustleX.",
-            'am': "ይህ ስም ለሁሉም የHustleX እንቅስቃሴዎችዎ ጥቅም ላይ ይውላል።"
-        }.get(lang_code, "This name will be used for all your HustleX activities.")
+        # Catalog strings for the user's language
+        title = t(lang_code, 'name_updated.title')
+        updated_to = t(lang_code, 'name_updated.updated_to', value=message_text)
+        note = t(lang_code, 'name_updated.note')
         
         # Save profile to API
-        await save_profile_to_api(user_id, user_profiles[user_id])
+        await save_profile_to_api(user_id, profile)
         
         await update.message.reply_text(
             f"{title}\n\n"
             f"{updated_to}\n\n"
             f"{note}",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown"
         )
     
     elif context.user_data.get('awaiting_input') == 'contact':
         # Store the new contact info
-        text_input_handler.user_profiles[user_id]['contact_info'] = message_text
+        profile['contact_info'] = message_text
+        user_profiles[user_id] = profile
         
         # Clear the awaiting input flag
         context.user_data.pop('awaiting_input', None)
         
-        # Language-specific messages
-        title = {
-            'en': "✅ *Contact Information Updated Successfully!*",
-            'es': "✅ *¡Información de Contacto Actualizada Exitosamente!*",
-            'fr': "✅ *Coordonnées Mises à Jour avec Succès!*",
-            'de': "✅ *Kontaktinformationen Erfolgreich Aktualisiert!*",
-            'it': "✅ *Informazioni di Contatto Aggiornate con Successo!*",
-            'pt': "✅ *Informações de Contato Atualizadas com Sucesso!*",
-            'am': "✅ *የመገኛ መረጃ በተሳካ ሁኔታ ተዘምኗል!*"
-        }.get(lang_code, "✅ *Contact Information Updated Successfully!*")
-        
-        updated_to = {
-            'en': f"Your contact information has been updated to: *{message_text}*",
-            'es': f"Tu información de contacto ha sido actualizada a: *{message_text}*",
-            'fr': f"Vos coordonnées ont été mises à jour à: *{message_text}*",
-            'de': f"Ihre Kontaktinformationen wurden aktualisiert auf: *{message_text}*",
-            'it': f"Le tue informazioni di contatto sono state aggiornate a: *{message_text}*",
-            'pt': f"Suas informações de contato foram atualizadas para: *{message_text}*",
-            'am': f"የመገኛ መረጃዎ ወደ: *{message_text}* ተዘምኗል"
-        }.get(lang_code, f"Your contact information has been updated to: *{message_text}*")
-        
-        note = {
-            'en': "This will be used for employers to reach you.",
-            'es': "Esto será utilizado por los empleadores para contactarte.",
-            'fr': "Cela sera utilisé par les employeurs pour vous contacter.",
-            'de': "Dies wird von Arbeitgebern verwendet, um Sie zu kontaktieren.",
-            'it': "Questo sarà utilizzato dai datori di lavoro per contattarti.",
-            'pt': "Isso será usado pelos empregadores para entrar em contato com você.",
-            'am': "ይህ አሰሪዎች እርስዎን ለማግኘት ጥቅም ላይ ይውላል።"
-        }.get(lang_code, "This will be used for employers to reach you.")
+        # Catalog strings for the user's language
+        title = t(lang_code, 'contact_updated.title')
+        updated_to = t(lang_code, 'contact_updated.updated_to', value=message_text)
+        note = t(lang_code, 'contact_updated.note')
         
         # Save profile to API
-        await save_profile_to_api(user_id, user_profiles[user_id])
+        await save_profile_to_api(user_id, profile)
         
         await update.message.reply_text(
             f"{title}\n\n"
             f"{updated_to}\n\n"
             f"{note}",
-            reply_markup=InlineKeyboardMarkup(keyboard),
+            reply_markup=keyboard,
             parse_mode="Markdown"
         )
     
@@ -1213,25 +1035,8 @@ async def text_input_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
             age = int(message_text)
             if age < 16 or age > 100:
                 # Invalid age error messages
-                error_title = {
-                    'en': "❌ *Invalid Age*",
-                    'es': "❌ *Edad Inválida*",
-                    'fr': "❌ *Âge Invalide*",
-                    'de': "❌ *Ungültiges Alter*",
-                    'it': "❌ *Età Non Valida*",
-                    'pt': "❌ *Idade Inválida*",
-                    'am': "❌ *ልክ ያልሆነ እድሜ*"
-                }.get(lang_code, "❌ *Invalid Age*")
-                
-                error_msg = {
-                    'en': "Please enter a valid age between 16 and 100.",
-                    'es': "Por favor, introduce una edad válida entre 16 y 100.",
-                    'fr': "Veuillez entrer un âge valide entre 16 et 100.",
-                    'de': "Bitte geben Sie ein gültiges Alter zwischen 16 und 100 ein.",
-                    'it': "Inserisci un'età valida tra 16 e 100.",
-                    'pt': "Por favor, insira uma idade válida entre 16 e 100.",
-                    'am': "እባክዎ ከ16 እና 100 መካከል ያለ ትክክለኛ እድሜ ያስገቡ።"
-                }.get(lang_code, "Please enter a valid age between 16 and 100.")
+                error_title = t(lang_code, 'age_invalid.title')
+                error_msg = t(lang_code, 'age_invalid.message')
                 
                 await update.message.reply_text(
                     f"{error_title}\n\n"
@@ -1241,73 +1046,31 @@ async def text_input_handler(update: Update, context: ContextTypes.DEFAULT_TYPE)
                 return
                 
             # Store the new age
-            user_profiles[user_id]['age'] = age
+            profile['age'] = age
+            user_profiles[user_id] = profile
             
             # Clear the awaiting input flag
             context.user_data.pop('awaiting_input', None)
             
-            # Language-specific messages
-            title = {
-                'en': "✅ *Age Updated Successfully!*",
-                'es': "✅ *¡Edad Actualizada Exitosamente!*",
-                'fr': "✅ *Âge Mis à Jour avec Succès!*",
-                'de': "✅ *Alter Erfolgreich Aktualisiert!*",
-                'it': "✅ *Età Aggiornata con Successo!*",
-                'pt': "✅ *Idade Atualizada com Sucesso!*",
-                'am': "✅ *እድሜ በተሳካ ሁኔታ ተዘምኗል!*"
-            }.get(lang_code, "✅ *Age Updated Successfully!*")
-            
-            updated_to = {
-                'en': f"Your age has been updated to: *{age}*",
-                'es': f"Tu edad ha sido actualizada a: *{age}*",
-                'fr': f"Votre âge a été mis à jour à: *{age}*",
-                'de': f"Ihr Alter wurde aktualisiert auf: *{age}*",
-                'it': f"La tua età è stata aggiornata a: *{age}*",
-                'pt': f"Sua idade foi atualizada para: *{age}*",
-                'am': f"እድሜዎ ወደ: *{age}* ተዘምኗል"
-            }.get(lang_code, f"Your age has been updated to: *{age}*")
-            
-            note = {
-                'en': "This information will be used for job matching.",
-                'es': "Esta información se utilizará para la coincidencia de trabajos.",
-                'fr': "Cette information sera utilisée pour la correspondance d'emploi.",
-                'de': "Diese Information wird für Job-Matching verwendet.",
-                'it': "Questa informazione sarà utilizzata per l'abbinamento di lavoro.",
-                'pt': "Esta informação será usada para correspondência de emprego.",
-                'am': "ይህ መረጃ ለሥራ ማዛመድ ጥቅም ላይ ይውላል።"
-            }.get(lang_code, "This information will be used for job matching.")
+            # Catalog strings for the user's language
+            title = t(lang_code, 'age_updated.title')
+            updated_to = t(lang_code, 'age_updated.updated_to', age=age)
+            note = t(lang_code, 'age_updated.note')
             
             # Save profile to API
-            await save_profile_to_api(user_id, user_profiles[user_id])
+            await save_profile_to_api(user_id, profile)
             
             await update.message.reply_text(
                 f"{title}\n\n"
                 f"{updated_to}\n\n"
                 f"{note}",
-                reply_markup=InlineKeyboardMarkup(keyboard),
+                reply_markup=keyboard,
                 parse_mode="Markdown"
             )
         except ValueError:
             # Invalid input error messages
-            error_title = {
-                'en': "❌ *Invalid Input*",
-                'es': "❌ *Entrada Inválida*",
-                'fr': "❌ *Entrée Invalide*",
-                'de': "❌ *Ungültige Eingabe*",
-                'it': "❌ *Input Non Valido*",
-                'pt': "❌ *Entrada Inválida*",
-                'am': "❌ *ልክ ያልሆነ ግብዓት*"
-            }.get(lang_code, "❌ *Invalid Input*")
-            
-            error_msg = {
-                'en': "Please enter your age as a number.",
-                'es': "Por favor, introduce tu edad como un número.",
-                'fr': "Veuillez entrer votre âge sous forme de nombre.",
-                'de': "Bitte geben Sie Ihr Alter als Zahl ein.",
-                'it': "Inserisci la tua età come numero.",
-                'pt': "Por favor, insira sua idade como um número.",
-                'am': "እባክዎ እድሜዎን እንደ ቁጥር ያስገቡ።"
-            }.get(lang_code, "Please enter your age as a number.")
+            error_title = t(lang_code, 'age_not_number.title')
+            error_msg = t(lang_code, 'age_not_number.message')
             
             await update.message.reply_text(
                 f"{error_title}\n\n"
@@ -1321,28 +1084,11 @@ async def account_notifications_handler(update: Update, context: ContextTypes.DE
     await q.answer()
     
     user_id = update.effective_user.id
-    # Simple notification preferences storage (in production, use database)
-    if not hasattr(account_notifications_handler, 'user_notifications'):
-        account_notifications_handler.user_notifications = {}
-    
-    user_prefs = account_notifications_handler.user_notifications.get(user_id, {
-        'job_alerts': True,
-        'application_updates': True,
-        'messages': True,
-        'marketing': False
-    })
+    user_prefs = user_notifications.get(user_id, DEFAULT_NOTIFICATIONS)
     
-    keyboard = [
-        [InlineKeyboardButton(f"🚨 Job Alerts: {'✅ ON' if user_prefs['job_alerts'] else '❌ OFF'}", 
-                             callback_data="toggle_job_alerts")],
-        [InlineKeyboardButton(f"📄 Application Updates: {'✅ ON' if user_prefs['application_updates'] else '❌ OFF'}", 
-                             callback_data="toggle_app_updates")],
-        [InlineKeyboardButton(f"💬 Messages: {'✅ ON' if user_prefs['messages'] else '❌ OFF'}", 
-                             callback_data="toggle_messages")],
-        [InlineKeyboardButton(f"📢 Marketing: {'✅ ON' if user_prefs['marketing'] else '❌ OFF'}", 
-                             callback_data="toggle_marketing")],
-        [InlineKeyboardButton("⬅️ Back to Account", callback_data="settings_account")]
-    ]
+    keyboard = keyboards.get("notifications", variant=(
+        user_prefs['job_alerts'], user_prefs['application_updates'], user_prefs['messages'], user_prefs['marketing']
+    ))
     
     await safe_edit_message(
         q,
@@ -1353,7 +1099,7 @@ async def account_notifications_handler(update: Update, context: ContextTypes.DE
         f"💬 *Messages:* Direct messages from employers\n"
         f"📢 *Marketing:* Updates about HustleX features\n\n"
         f"💡 *Tip:* You can toggle each notification type on/off below.",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1362,10 +1108,7 @@ async def account_delete_handler(update: Update, context: ContextTypes.DEFAULT_T
     q = update.callback_query
     await q.answer()
     
-    keyboard = [
-        [InlineKeyboardButton("⚠️ Yes, Delete My Account", callback_data="confirm_delete_account")],
-        [InlineKeyboardButton("❌ Cancel", callback_data="settings_account")]
-    ]
+    keyboard = keyboards.get("account_delete")
     
     await safe_edit_message(
         q,
@@ -1378,7 +1121,7 @@ async def account_delete_handler(update: Update, context: ContextTypes.DEFAULT_T
         f"• All saved preferences\n\n"
         f"📞 *Alternative:* You can temporarily disable notifications instead.\n\n"
         f"❓ *Are you sure you want to permanently delete your account?*",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1387,9 +1130,7 @@ async def privacy_policy_handler(update: Update, context: ContextTypes.DEFAULT_T
     q = update.callback_query
     await q.answer()
     
-    keyboard = [
-        [InlineKeyboardButton("⬅️ Back to Terms", callback_data="settings_terms")]
-    ]
+    keyboard = keyboards.get("privacy")
     
     privacy_text = (
         "🔒 *Privacy Policy*\n\n"
@@ -1419,7 +1160,7 @@ async def privacy_policy_handler(update: Update, context: ContextTypes.DEFAULT_T
     await safe_edit_message(
         q,
         privacy_text,
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1434,20 +1175,8 @@ async def toggle_notification_handler(update: Update, context: ContextTypes.DEFA
     user_id = update.effective_user.id
     toggle_type = q.data.split('_', 1)[1]  # get part after 'toggle_'
     
-    # Initialize user notifications if not exists
-    if not hasattr(account_notifications_handler, 'user_notifications'):
-        account_notifications_handler.user_notifications = {}
-    
-    if user_id not in account_notifications_handler.user_notifications:
-        account_notifications_handler.user_notifications[user_id] = {
-            'job_alerts': True,
-            'application_updates': True,
-            'messages': True,
-            'marketing': False
-        }
-    
-    # Toggle the specific notification type
-    current_prefs = account_notifications_handler.user_notifications[user_id]
+    # Toggle on a copy; assigning it back marks it for the store
+    current_prefs = dict(user_notifications.get(user_id, DEFAULT_NOTIFICATIONS))
     if toggle_type == 'job_alerts':
         current_prefs['job_alerts'] = not current_prefs['job_alerts']
         setting_name = "Job Alerts"
@@ -1460,6 +1189,7 @@ async def toggle_notification_handler(update: Update, context: ContextTypes.DEFA
     elif toggle_type == 'marketing':
         current_prefs['marketing'] = not current_prefs['marketing']
         setting_name = "Marketing"
+    user_notifications[user_id] = current_prefs
     
     # Show updated notification settings
     await account_notifications_handler(update, context)
@@ -1471,16 +1201,14 @@ async def confirm_delete_account_handler(update: Update, context: ContextTypes.D
     user_id = update.effective_user.id
     
     # Remove user data
-    if user_id in user_cvs:
-        del user_cvs[user_id]
+    user_cvs.pop(user_id, None)
+    await asyncio.to_thread(cv_store.release, f"tg:{user_id}")
+    user_notifications.pop(user_id, None)
+    for sub_id, _ in alert_store.for_user(user_id):
+        job_alerts.unsubscribe(sub_id)
+    await asyncio.to_thread(alert_store.remove, user_id)
     
-    if hasattr(account_notifications_handler, 'user_notifications'):
-        if user_id in account_notifications_handler.user_notifications:
-            del account_notifications_handler.user_notifications[user_id]
-    
-    keyboard = [
-        [InlineKeyboardButton("🏠 Start Over", callback_data="menu")]
-    ]
+    keyboard = keyboards.get("account_deleted")
     
     await safe_edit_message(
         q,
@@ -1493,7 +1221,7 @@ async def confirm_delete_account_handler(update: Update, context: ContextTypes.D
         f"• All saved data\n\n"
         f"👋 Thank you for using HustleX. You can create a new account anytime by using /start.\n\n"
         f"💬 If you have feedback, contact @HustleXSupport",
-        reply_markup=InlineKeyboardMarkup(keyboard),
+        reply_markup=keyboard,
         parse_mode="Markdown",
         context=context
     )
@@ -1501,43 +1229,66 @@ async def confirm_delete_account_handler(update: Update, context: ContextTypes.D
 # ---------------------------
 # Profile API Integration
 # ---------------------------
+def signed_init_data(user_id, token: str) -> str:
+    """initData for the API on the user's behalf, signed with the bot token like api/main.py checks it"""
+    params = {"auth_date": str(int(time.time())), "user_id": str(user_id)}
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+    secret_key = hashlib.sha256(token.encode()).digest()
+    params["hash"] = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(params)
+
+async def post_profile(bot, user_id, profile_data):
+    """POST the user's current profile to the API as one multipart request over the shared pool"""
+    fields = {
+        "name": profile_data.get('custom_name', ''),
+        "age": profile_data.get('age', 0),
+        "sex": profile_data.get('sex', 'Not specified'),
+        "contact_info": profile_data.get('contact_info', ''),
+        "init_data": signed_init_data(user_id, bot.token),
+    }
+    form = aiohttp.MultipartWriter("form-data")
+    for name, value in fields.items():
+        form.append(str(value)).set_content_disposition("form-data", name=name)
+
+    # The picture goes along only when it changed since the last successful sync
+    profile_pic_file_id = profile_data.get('profile_pic_file_id')
+    if profile_pic_file_id and synced_profile_pics.get(user_id) != profile_pic_file_id:
+        picture = b"".join([chunk async for chunk in telegram_file_chunks(bot, profile_pic_file_id)])
+        form.append(picture, {"Content-Type": "image/jpeg"}).set_content_disposition(
+            "form-data", name="profile_pic", filename=f"{user_id}.jpg")
+
+    async with http_pool.session.post(PROFILE_API_URL, data=form) as response:
+        if 400 <= response.status < 500 and response.status not in (408, 429):
+            raise SyncRejected(f"HTTP {response.status}: {(await response.text())[:200]}")
+        response.raise_for_status()
+    if profile_pic_file_id:
+        synced_profile_pics[user_id] = profile_pic_file_id
+
 async def save_profile_to_api(user_id, profile_data):
-    """Save user profile data to the API"""
-    try:
-        # Prepare the data for API request
-        form_data = {
-            "name": profile_data.get('custom_name', ''),
-            "age": profile_data.get('age', 0),
-            "sex": profile_data.get('sex', 'Not specified'),
-            "contact_info": profile_data.get('contact_info', ''),
-            "init_data": f"user_id={user_id}"  # Simple init_data for demo purposes
-        }
-        
-        # If we have a profile picture, we would need to download it and send as a file
-        profile_pic_file_id = profile_data.get('profile_pic_file_id')
-        
-        # In a real implementation, you would:
-        # 1. Download the file using context.bot.get_file(file_id)
-        # 2. Send the file as part of a multipart/form-data request
-        # 3. Handle the API response
-        
-        # For now, we'll just log that we would send this data
-        logger.info(f"Would send profile data to API for user {user_id}: {form_data}")
-        
-        # In production, you would make an actual API call here
-        # Example with aiohttp:
-        # async with aiohttp.ClientSession() as session:
-        #     async with session.post('http://api-url/api/profile', data=form_data) as response:
-        #         return await response.json()
-        
-        return True
-    except Exception as e:
-        logger.error(f"Error saving profile to API: {e}")
+    """Queue the user's profile for the API; edits made in quick succession go out as one request"""
+    if not PROFILE_API_URL:
+        logger.debug(f"PROFILE_API_URL not set, profile of user {user_id} not synced")
         return False
+    return profile_sync.schedule(user_id, profile_data)
 
 # ---------------------------
 # File uploads handler (CV / profile picture)
 # ---------------------------
+async def telegram_file_chunks(bot, file_id, chunk_size: int = CHUNK_SIZE):
+    """Contents of a Telegram file, downloaded piece by piece through the shared pool"""
+    tg_file = await bot.get_file(file_id)
+    if os.path.isfile(tg_file.file_path):
+        # Local Bot API server: the file is already on this machine
+        with open(tg_file.file_path, "rb") as source:
+            while chunk := source.read(chunk_size):
+                yield chunk
+        return
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=30)
+    async with http_pool.session.get(tg_file.file_path, timeout=timeout) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_chunked(chunk_size):
+            yield chunk
+
 async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     m = update.message
     user_id = update.effective_user.id
@@ -1545,7 +1296,11 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Check if we're waiting for a profile photo
     awaiting_photo = context.user_data.get('awaiting_input') == 'photo'
     
-    if m.document:
+    if m.document and (context.user_data.get('awaiting_input') == 'import'
+                       or (m.caption or "").startswith("/importjobs")):
+        await import_jobs_file(update, context)
+
+    elif m.document:
         # Check if it's a CV file (PDF or DOCX)
         file_name = m.document.file_name or "document"
         file_size = m.document.file_size
@@ -1553,19 +1308,35 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Validate file type
         if file_name.lower().endswith(('.pdf', '.docx')) or mime_type in ['application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
+            # Stream the file into the CV store (checked against the limit as it arrives)
+            limit_mb = cv_store.max_bytes // (1024 * 1024)
+            try:
+                if file_size and file_size > cv_store.max_bytes:
+                    raise CVTooLarge(f"CV is larger than {limit_mb} MB")
+                stored = await cv_store.put(f"tg:{user_id}", telegram_file_chunks(context.bot, m.document.file_id),
+                                            filename=file_name, mime_type=mime_type)
+            except CVTooLarge:
+                await m.reply_text(f"❌ *CV Too Large*\n\nPlease upload a file of at most {limit_mb} MB.",
+                                   parse_mode="Markdown")
+                return
+            except (TelegramError, aiohttp.ClientError, OSError, sqlite3.Error) as e:
+                logger.error(f"Failed to store CV of user {user_id}: {e}")
+                await m.reply_text("❌ Your CV could not be saved. Please try again in a moment.")
+                return
+            file_size = stored['size']
+            await queue_cv_extraction(stored)
+
             # Store CV information
             user_cvs[user_id] = {
                 'file_id': m.document.file_id,
                 'filename': file_name,
                 'file_size': file_size,
                 'mime_type': mime_type,
+                'sha256': stored['sha256'],
                 'upload_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            keyboard = [
-                [InlineKeyboardButton("👁️ View CV", callback_data="cv_view")],
-                [InlineKeyboardButton("📄 My CV Settings", callback_data="settings_cv")]
-            ]
+            keyboard = keyboards.get("cv_uploaded")
             
             await m.reply_text(
                 f"✅ *CV Upload Successful!*\n\n"
@@ -1574,7 +1345,7 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"📝 *Type:* {'PDF' if file_name.lower().endswith('.pdf') else 'Word Document'}\n\n"
                 f"🎉 Your CV is now ready for job applications!",
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=keyboard
             )
         else:
             await m.reply_text(
@@ -1588,12 +1359,10 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif m.photo:
         file_id = m.photo[-1].file_id
         
-        # Initialize user profile if not exists
-        if user_id not in user_profiles:
-            user_profiles[user_id] = {}
-        
-        # Store the profile picture file_id
-        user_profiles[user_id]['profile_pic_file_id'] = file_id
+        # Store the profile picture file_id (on a copy, assigned back for the store)
+        profile = dict(user_profiles.get(user_id, {}))
+        profile['profile_pic_file_id'] = file_id
+        user_profiles[user_id] = profile
         
         # Clear the awaiting input flag if we were waiting for a photo
         if awaiting_photo:
@@ -1602,60 +1371,22 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # Get user's language preference
             lang_code = user_languages.get(user_id, 'en')
             
-            # Language-specific messages
-            title = {
-                'en': "✅ *Profile Photo Updated Successfully!*",
-                'es': "✅ *¡Foto de Perfil Actualizada Exitosamente!*",
-                'fr': "✅ *Photo de Profil Mise à Jour avec Succès!*",
-                'de': "✅ *Profilbild Erfolgreich Aktualisiert!*",
-                'it': "✅ *Foto Profilo Aggiornata con Successo!*",
-                'pt': "✅ *Foto de Perfil Atualizada com Sucesso!*",
-                'am': "✅ *የመገለጫ ፎቶ በተሳካ ሁኔታ ተዘምኗል!*"
-            }.get(lang_code, "✅ *Profile Photo Updated Successfully!*")
-            
-            message = {
-                'en': "Your new profile photo has been saved.",
-                'es': "Tu nueva foto de perfil ha sido guardada.",
-                'fr': "Votre nouvelle photo de profil a été enregistrée.",
-                'de': "Ihr neues Profilbild wurde gespeichert.",
-                'it': "La tua nuova foto profilo è stata salvata.",
-                'pt': "Sua nova foto de perfil foi salva.",
-                'am': "አዲሱ የመገለጫ ፎቶዎ ተቀምጧል።"
-            }.get(lang_code, "Your new profile photo has been saved.")
-            
-            tip = {
-                'en': "💡 *Tip:* A professional profile photo increases your chances of getting hired!",
-                'es': "💡 *Consejo:* ¡Una foto de perfil profesional aumenta tus posibilidades de ser contratado!",
-                'fr': "💡 *Conseil:* Une photo de profil professionnelle augmente vos chances d'être embauché !",
-                'de': "💡 *Tipp:* Ein professionelles Profilbild erhöht Ihre Chancen, eingestellt zu werden!",
-                'it': "💡 *Suggerimento:* Una foto profilo professionale aumenta le tue possibilità di essere assunto!",
-                'pt': "💡 *Dica:* Uma foto de perfil profissional aumenta suas chances de ser contratado!",
-                'am': "💡 *ምክር:* ሙያዊ የመገለጫ ፎቶ የመቀጠር እድልዎን ይጨምራል!"
-            }.get(lang_code, "💡 *Tip:* A professional profile photo increases your chances of getting hired!")
-            
-            back_text = {
-                'en': "⬅️ Back to Profile",
-                'es': "⬅️ Volver al Perfil",
-                'fr': "⬅️ Retour au Profil",
-                'de': "⬅️ Zurück zum Profil",
-                'it': "⬅️ Torna al Profilo",
-                'pt': "⬅️ Voltar ao Perfil",
-                'am': "⬅️ ወደ መገለጫ ይመለሱ"
-            }.get(lang_code, "⬅️ Back to Profile")
+            # Catalog strings for the user's language
+            title = t(lang_code, 'photo_updated.title')
+            message = t(lang_code, 'photo_updated.message')
+            tip = t(lang_code, 'photo_updated.tip')
             
-            keyboard = [
-                [InlineKeyboardButton(back_text, callback_data="account_edit_profile")]
-            ]
+            keyboard = keyboards.get("profile_back", lang_code)
             
             # Save profile to API
-            await save_profile_to_api(user_id, user_profiles[user_id])
+            await save_profile_to_api(user_id, profile)
             
             await m.reply_text(
                 f"{title}\n\n"
                 f"{message}\n\n"
                 f"{tip}",
                 parse_mode="Markdown",
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=keyboard
             )
         else:
             await m.reply_text(
@@ -1667,52 +1398,151 @@ async def file_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ---------------------------
 # Telegram Job Posting Handlers
 # ---------------------------
+# What the wizard asks for each field
+JOB_PROMPTS = {
+    "job_title": "📝 Enter Job Title:",
+    "job_type": "Enter Job Type (Full-time, Part-time, Freelance):",
+    "work_location": "Enter Work Location:",
+    "salary": "Enter Salary:",
+    "deadline": "Enter Deadline (YYYY-MM-DD):",
+    "description": "Enter Job Description:",
+    "client_type": "Enter Client Type (Private / Other):",
+    "company_name": "Enter Company Name:",
+    "verified": "Is the company verified? (✅ / No)",
+    "previous_jobs": "List any previous jobs posted by this company (or type 'None'):",
+    "job_link": "Enter the link for 'View Details':",
+}
+
+# Reply keyboard opening the job form as a WebApp; only a keyboard button lets the form
+# hand the job back to the bot (Telegram.WebApp.sendData -> a web_app_data message)
+post_job_webapp_keyboards = {}
+
+def post_job_webapp_keyboard(lang_code: str) -> ReplyKeyboardMarkup:
+    markup = post_job_webapp_keyboards.get(lang_code)
+    if markup is None:
+        button = KeyboardButton(t(lang_code, 'menu.post_website'), web_app=WebAppInfo(url=WEBAPP_URL))
+        markup = post_job_webapp_keyboards[lang_code] = ReplyKeyboardMarkup(
+            [[button]], resize_keyboard=True, one_time_keyboard=True)
+    return markup
+
 async def post_job_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    lang_code = user_languages.get(update.effective_user.id, 'en')
     if update.callback_query:
         await update.callback_query.answer()
-        await update.callback_query.message.reply_text("📝 Enter Job Title:")
+        message = update.callback_query.message
     else:
-        await update.message.reply_text("📝 Enter Job Title:")
+        message = update.message
+        # "/postjob" with the filled-in template in the same message
+        text = message.text or ""
+        if looks_like_template(text):
+            return await apply_job_template(update, context, text)
+    # The form is offered in private chats, and only while the prober finds its page
+    webapp = update.effective_chat.type == "private" and webapp_prober.is_reachable(WEBAPP_URL)
+    await message.reply_text(
+        f"{JOB_PROMPTS['job_title']}\n\n"
+        f"💡 Or send the whole job in one message, one field per line:\n\n"
+        f"{template_text(lang_code)}"
+        + ("\n\n🌐 Or fill in the form with the button below." if webapp else ""),
+        reply_markup=post_job_webapp_keyboard(lang_code) if webapp else None,
+    )
     return JOB_TITLE
 
+async def apply_job_template(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+    """Take every field of a one-message job at once, then ask only for what is missing or invalid"""
+    job, problems = check_job_message(text)
+    return await collect_job_fields(update, context, job, problems)
+
+async def web_app_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """A job sent by the WebApp form (web_app_data, JSON object of wizard fields), posted in one step"""
+    try:
+        payload = json.loads(update.message.web_app_data.data)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        await update.message.reply_text("❌ The form data could not be read. Please try again or use /postjob.")
+        return ConversationHandler.END
+    job, problems = check_fields(payload)
+    return await collect_job_fields(update, context, job, problems)
+
+async def collect_job_fields(update: Update, context: ContextTypes.DEFAULT_TYPE, job: dict, problems: dict):
+    """Keep the valid fields of a job given all at once; post it, or ask for the fields still needed"""
+    lang_code = user_languages.get(update.effective_user.id, 'en')
+    for field in WIZARD_FIELDS:
+        context.user_data.pop(field, None)
+    context.user_data.update(job)
+    if not problems:
+        context.user_data.pop("job_pending", None)
+        return await publish_job(update, context)
+
+    context.user_data["job_pending"] = list(problems)
+    lines = [f"📋 Got {len(job)} of {len(WIZARD_FIELDS)} fields. Still needed:"]
+    lines += [f"• {t(lang_code, f'job_field.{field}')}: {problem}" for field, problem in problems.items()]
+    first = next(iter(problems))
+    await update.message.reply_text("\n".join(lines) + f"\n\n{JOB_PROMPTS[first]}")
+    return JOB_TEMPLATE_FIELD
+
+async def job_template_field(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer for the first field a one-message job still needs"""
+    lang_code = user_languages.get(update.effective_user.id, 'en')
+    pending = context.user_data.get("job_pending") or []
+    if not pending:
+        return await publish_job(update, context)
+    field = pending[0]
+    value, problem = check_job_field(field, update.message.text)
+    if problem:
+        await update.message.reply_text(
+            f"❌ {t(lang_code, f'job_field.{field}')}: {problem}\n\n{JOB_PROMPTS[field]}"
+        )
+        return JOB_TEMPLATE_FIELD
+    context.user_data[field] = value
+    pending = pending[1:]
+    if pending:
+        context.user_data["job_pending"] = pending
+        await update.message.reply_text(JOB_PROMPTS[pending[0]])
+        return JOB_TEMPLATE_FIELD
+    context.user_data.pop("job_pending", None)
+    return await publish_job(update, context)
+
 async def job_title(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if looks_like_template(update.message.text):
+        return await apply_job_template(update, context, update.message.text)
     context.user_data["job_title"] = update.message.text
-    await update.message.reply_text("Enter Job Type (Full-time, Part-time, Freelance):")
+    await update.message.reply_text(JOB_PROMPTS["job_type"])
     return JOB_TYPE
 
 async def job_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["job_type"] = update.message.text
-    await update.message.reply_text("Enter Work Location:")
+    await update.message.reply_text(JOB_PROMPTS["work_location"])
     return WORK_LOCATION
 
 async def work_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["work_location"] = update.message.text
-    await update.message.reply_text("Enter Salary:")
+    await update.message.reply_text(JOB_PROMPTS["salary"])
     return SALARY
 
 async def salary(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["salary"] = update.message.text
-    await update.message.reply_text("Enter Deadline (YYYY-MM-DD):")
+    await update.message.reply_text(JOB_PROMPTS["deadline"])
     return DEADLINE
 
 async def deadline(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["deadline"] = update.message.text
-    await update.message.reply_text("Enter Job Description:")
+    await update.message.reply_text(JOB_PROMPTS["description"])
     return DESCRIPTION
 
 async def description(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["description"] = update.message.text
-    await update.message.reply_text("Enter Client Type (Private / Other):")
+    await update.message.reply_text(JOB_PROMPTS["client_type"])
     return CLIENT_TYPE
 
 async def client_type(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["client_type"] = update.message.text
-    await update.message.reply_text("Enter Company Name:")
+    await update.message.reply_text(JOB_PROMPTS["company_name"])
     return COMPANY_NAME
 
 async def company_name(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["company_name"] = update.message.text
-    await update.message.reply_text("Is the company verified? (✅ / No)")
+    await update.message.reply_text(JOB_PROMPTS["verified"])
     return VERIFIED
 
 async def verified(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1726,59 +1556,28 @@ async def verified(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data["verified"] = "✅"
     else:
         context.user_data["verified"] = "No"
-    await update.message.reply_text("List any previous jobs posted by this company (or type 'None'):")
+    await update.message.reply_text(JOB_PROMPTS["previous_jobs"])
     return PREVIOUS_JOBS
 
 async def previous_jobs(update: Update, context: ContextTypes.DEFAULT_TYPE):
     context.user_data["previous_jobs"] = update.message.text
-    await update.message.reply_text("Enter the link for 'View Details':")
+    await update.message.reply_text(JOB_PROMPTS["job_link"])
     return JOB_LINK
 
-async def job_link(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    context.user_data["job_link"] = update.message.text
-    job_data = context.user_data
+def safe_url(url: str) -> str:
+    """The job's "View Details" link, made absolute; a placeholder if it cannot be used"""
+    return clean_link(url) or "https://example.com"
 
-    # Validate URL
-    def safe_url(url: str) -> str:
-        if not url:
-            return "https://example.com"
-        url = url.strip()
-        if not (url.startswith("http://") or url.startswith("https://")):
-            url = "https://" + url
-        try:
-            parsed = urlparse(url)
-            if not parsed.scheme or not parsed.netloc:
-                return "https://example.com"
-            return parsed.geturl()
-        except Exception as e:
-            logger.error(f"Invalid URL {url}: {e}")
-            return "https://example.com"
+def render_job_post(job_data, closed=False):
+    """Channel post (MarkdownV2) and "View Details" URL of a job with the wizard's fields.
 
+    ``closed`` renders the post as it is edited to once the deadline has passed.
+    """
     view_details_url = safe_url(job_data.get("job_link"))
-    keyboard = [[InlineKeyboardButton("View Details", url=view_details_url)]]
-
-    # Check channel ID and bot permissions
-    CHANNEL_ID = "-1003194542999"  # TODO: Replace with the correct channel ID
-    if not await validate_channel_id(context, CHANNEL_ID):
-        error_msg = (
-            "❌ Error: Invalid channel ID. Please verify the CHANNEL_ID in the bot configuration.\n"
-            "To find the correct ID, add the bot to the channel, send a message, and forward it to @userinfobot or @RawDataBot."
-        )
-        await update.message.reply_text(error_msg)
-        logger.error(f"Job posting failed due to invalid CHANNEL_ID: {CHANNEL_ID}")
-        return ConversationHandler.END
-
-    if not await check_bot_permissions(context, CHANNEL_ID):
-        error_msg = (
-            "❌ Error: The bot does not have permission to post in the channel.\n"
-            "Please make the bot an admin with 'Send Messages' permission."
-        )
-        await update.message.reply_text(error_msg)
-        logger.error(f"Job posting failed due to insufficient permissions in channel: {CHANNEL_ID}")
-        return ConversationHandler.END
 
     # Build job post with enhanced escaping
     job_text = (
+        ("⛔ *Closed: the deadline has passed\\.*\n\n" if closed else "") +
         f"📢 *New Job Posted\\!* \n\n"
         f"*Job Title:* {escape_markdown_v2(job_data['job_title'])}\n"
         f"*Job Type:* {escape_markdown_v2(job_data['job_type'])}\n"
@@ -1795,37 +1594,665 @@ async def job_link(update: Update, context: ContextTypes.DEFAULT_TYPE):
         f"@HustleXet\n"
         f"@HustleXet\\_bot"
     )
+    return job_text, view_details_url
+
+async def job_link(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.user_data["job_link"] = update.message.text
+    return await publish_job(update, context)
+
+async def publish_job(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Store the job collected in user_data and post it (or queue it for the digest)"""
+    job_data = context.user_data
+    job_text, view_details_url = render_job_post(job_data)
 
+    job_id = None
     try:
-        await context.bot.send_message(
-            chat_id=CHANNEL_ID,
+        job_id = await asyncio.to_thread(job_store.add, dict(job_data), "bot", update.effective_user.id)
+        job_alerts.poke()
+    except sqlite3.Error as e:
+        logger.error(f"Failed to save job to the job store: {e}")
+
+    if DIGEST_INTERVAL_MINUTES > 0 and job_id is not None:
+        try:
+            await asyncio.to_thread(job_store.queue_digest, [job_id])
+            job_digest.poke()
+            await update.message.reply_text("✅ Job saved! It will be posted in the next channel digest.")
+            return ConversationHandler.END
+        except sqlite3.Error as e:
+            logger.error(f"Failed to queue job #{job_id} for the digest, posting it now: {e}")
+
+    channels = channel_routes.channels_for(job_data)
+    await post_job_to_channels(update, context, channels, job_text, view_details_url,
+                               job_id=job_id, deadline=job_data.get("deadline"))
+    return ConversationHandler.END
+
+def post_error_hint(error) -> str:
+    """Human-readable reason for a failed channel post"""
+    if isinstance(error, str):
+        return error
+    text = str(error)
+    if "chat not found" in text.lower():
+        return f"{text} (the channel ID is incorrect or the bot is not a member of the channel)"
+    if "not found" in text.lower():
+        return f"{text} (invalid channel ID or bot token)"
+    if "Bad Request: can't parse" in text:
+        return f"{text} (invalid characters in job details)"
+    if isinstance(error, RetryAfter) or "Too Many Requests" in text:
+        return f"{text} (Telegram rate limit exceeded, please try again later)"
+    if isinstance(error, TimedOut):
+        return f"{text} (the post may have gone out anyway: check the channel before retrying)"
+    return text
+
+async def post_job(bot, channels, job_text, view_details_url, job_id=None, deadline=None) -> dict:
+    """Post one job to all its channels at once; returns {channel: error} of those it missed.
+
+    The channel messages of a stored job (``job_id``) are recorded, and expire at
+    its ``deadline`` (see post_expiry).
+    """
+    reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("View Details", url=view_details_url)]])
+
+    # Check channel IDs and bot permissions (cached; see channel_states)
+    states = await asyncio.gather(*(channel_states.ensure(bot, channel_id) for channel_id in channels))
+    errors = {}
+    for channel_id, state in zip(channels, states):
+        if state.error is not None:
+            # Not checked (network): a retry checks again
+            errors[channel_id] = state.error
+            logger.error(f"Job posting skipped unchecked channel {channel_id}: {state.error}")
+        elif not state.valid:
+            errors[channel_id] = "invalid channel ID, or the bot is not a member of the channel"
+            logger.error(f"Job posting skipped invalid channel: {channel_id}")
+        elif not state.can_post:
+            errors[channel_id] = "the bot needs to be an admin with 'Send Messages' permission"
+            logger.error(f"Job posting skipped channel without post permission: {channel_id}")
+        if channel_id in errors:
+            # The next post or "Retry failed channels" checks the channel again
+            channel_states.invalidate(channel_id)
+
+    async def post(channel_id):
+        # Paced by the send scheduler; completes once the post is actually delivered
+        return await send_scheduler.send_message(
+            bot,
+            channel_id,
+            priority=BULK,
             text=job_text,
             parse_mode="MarkdownV2",
-            reply_markup=InlineKeyboardMarkup(keyboard)
+            reply_markup=reply_markup
         )
-        await update.message.reply_text("✅ Job posted successfully!")
-        logger.info(f"Job posted successfully to channel {CHANNEL_ID}")
-        # TODO: Save job_data to database using DATABASE_URL if needed
-    except TelegramError as e:
-        error_msg = f"❌ Failed to post job: {str(e)}"
-        logger.error(f"Failed to post job to channel {CHANNEL_ID}: {e}")
-        if "chat not found" in str(e).lower():
-            error_msg += "\nThe channel ID is incorrect or the bot is not a member of the channel."
-        elif "not found" in str(e).lower():
-            error_msg += "\nThe Telegram API returned a 404 error. This could be due to an invalid channel ID or bot token."
-        elif "Bad Request: can't parse" in str(e):
-            error_msg += "\nInvalid characters in job details. Ensure all fields are properly formatted."
-        elif "Too Many Requests" in str(e):
-            error_msg += "\nTelegram rate limit exceeded. Please try again later."
-        await update.message.reply_text(error_msg)
-        return ConversationHandler.END
 
-    return ConversationHandler.END
+    results = await fan_out([c for c in channels if c not in errors], post, attempts=CHANNEL_POST_ATTEMPTS)
+    for channel_id, result in results.items():
+        if result.ok:
+            logger.info(f"Job posted successfully to channel {channel_id}")
+            continue
+        logger.error(f"Failed to post job to channel {channel_id}: {result.error}")
+        errors[channel_id] = result.error
+        if not isinstance(result.error, (NetworkError, RetryAfter)):
+            # The cached channel state may be stale (bot removed, rights changed)
+            channel_states.invalidate(channel_id)
+
+    messages = [(channel_id, result.message.message_id) for channel_id, result in results.items() if result.ok]
+    if job_id is not None and messages:
+        expires_at = deadline_timestamp(deadline, JOB_DEADLINE_UTC_OFFSET)
+        try:
+            await asyncio.to_thread(job_store.add_posts, job_id, messages, expires_at)
+            if expires_at is not None:
+                post_expiry.poke()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record channel posts of job #{job_id}: {e}")
+    return errors
+
+async def expire_job_posts(bot, posts) -> set:
+    """Edit channel posts whose deadline has passed to their closed form; returns the post ids handled"""
+    jobs = {}
+
+    async def close(post):
+        job = jobs.get(post["job_id"])
+        if job is None:
+            job = jobs[post["job_id"]] = await asyncio.to_thread(job_store.get, post["job_id"])
+        if job is None:
+            return
+        job_text, _ = render_job_post({field: value or "" for field, value in job.items()}, closed=True)
+        # Sent without reply_markup, which also removes the "View Details" button
+        await send_scheduler.submit(
+            post["chat_id"],
+            lambda: bot.edit_message_text(job_text, chat_id=post["chat_id"], message_id=post["message_id"],
+                                          parse_mode="MarkdownV2"),
+            BULK,
+        )
+
+    done = set()
+    results = await asyncio.gather(*(close(post) for post in posts), return_exceptions=True)
+    for post, result in zip(posts, results):
+        if isinstance(result, (NetworkError, RetryAfter, sqlite3.Error)) and not isinstance(result, BadRequest):
+            logger.warning(f"Could not expire post {post['message_id']} in {post['chat_id']} yet: {result}")
+            continue
+        if isinstance(result, Exception):
+            # Deleted message, bot removed from the channel...: nothing left to close
+            logger.info(f"Expired post {post['message_id']} in {post['chat_id']} not edited: {result}")
+        done.add(post["id"])
+    return done
+
+def job_deep_link(job) -> str:
+    """Link that opens the job in the bot (``/start job_<id>``); its own link before get_me succeeded"""
+    if bot_identity.user is None:
+        return safe_url(job.get("job_link"))
+    return f"https://t.me/{bot_identity.user.username}?start=job_{job['id']}"
+
+async def send_job_digest(bot, jobs, sent):
+    """Post one digest of ``jobs`` to each channel they are routed to.
+
+    ``sent`` (job id -> channels) lists the channels that are done with a job
+    from an earlier, partly failed flush; they are skipped, and it is updated as
+    each message goes out. A channel the bot cannot post to (invalid, no rights,
+    or a send that fails with an answer such as Forbidden) is done too: waiting
+    would not fix it, and its jobs would block the queue for every other channel.
+    Only transient failures keep a job queued. Returns the ids of the jobs done
+    in all of their channels.
+    """
+    routes = {job["id"]: set(channel_routes.channels_for(job)) for job in jobs}
+    by_channel = {}
+    for job in jobs:
+        for channel_id in routes[job["id"]] - sent.get(job["id"], set()):
+            by_channel.setdefault(channel_id, []).append(job)
+
+    def done(channel_id, channel_jobs):
+        for job in channel_jobs:
+            sent.setdefault(job["id"], set()).add(channel_id)
+
+    async def send(channel_id, channel_jobs):
+        state = await channel_states.ensure(bot, channel_id)
+        if state.error is None and not (state.valid and state.can_post):
+            logger.error(f"Job digest of {len(channel_jobs)} jobs dropped for channel {channel_id}: "
+                         f"the bot cannot post there")
+            done(channel_id, channel_jobs)
+            return
+        start = 0
+        for text, buttons in render_digest(channel_jobs, job_deep_link):
+            keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(label, url=url)] for label, url in buttons])
+            try:
+                await send_scheduler.send_message(bot, channel_id, priority=BULK, text=text, reply_markup=keyboard,
+                                                  disable_web_page_preview=True)
+            except TimedOut as e:
+                # Probably posted: counted as sent, since a retry could post it twice
+                logger.warning(f"Job digest to channel {channel_id} timed out, not sending it again: {e}")
+            except TelegramError as e:
+                logger.error(f"Failed to post a job digest to channel {channel_id}: {post_error_hint(e)}")
+                if not (is_transient(e) or isinstance(e, RetryAfter)):
+                    # Sending again fails the same way: give up on this channel's part
+                    channel_states.invalidate(channel_id)
+                    done(channel_id, channel_jobs[start:])
+                return
+            # One button per job: these are the jobs this message carried
+            done(channel_id, channel_jobs[start:start + len(buttons)])
+            start += len(buttons)
+        logger.info(f"Posted a digest of {len(channel_jobs)} jobs to channel {channel_id}")
+
+    await asyncio.gather(*(send(channel_id, channel_jobs) for channel_id, channel_jobs in by_channel.items()))
+    return [job["id"] for job in jobs if routes[job["id"]] <= sent.get(job["id"], set())]
+
+async def show_job(update: Update, job_id: str):
+    """Full post of one job, for digest deep links"""
+    job = await asyncio.to_thread(job_store.get, int(job_id)) if job_id.isdigit() else None
+    if job is None:
+        await update.effective_message.reply_text("❌ This job is no longer available.")
+        return
+    job = {field: value or "" for field, value in job.items()}
+    expires_at = deadline_timestamp(job["deadline"], JOB_DEADLINE_UTC_OFFSET)
+    job_text, view_details_url = render_job_post(job, closed=expires_at is not None and expires_at < time.time())
+    await update.effective_message.reply_text(
+        job_text,
+        parse_mode="MarkdownV2",
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("View Details", url=view_details_url)]]),
+    )
+
+async def post_job_to_channels(update: Update, context: ContextTypes.DEFAULT_TYPE, channels, job_text, view_details_url,
+                               job_id=None, deadline=None):
+    """Post one job to all its channels at once and report the outcome per channel.
+
+    Channels that still failed after the automatic retries are kept in user_data so
+    the "Retry failed channels" button re-posts to those channels only. A timed-out
+    post is never retried automatically; the report asks to check the channel first.
+    """
+    errors = await post_job(context.bot, channels, job_text, view_details_url, job_id=job_id, deadline=deadline)
+    if not errors:
+        context.user_data.pop("failed_post", None)
+        await send_scheduler.send_message(
+            context.bot,
+            update.effective_chat.id,
+            priority=INTERACTIVE,
+            text="✅ Job posted successfully!",
+            reply_to_message_id=update.effective_message.message_id
+        )
+        return
+
+    def channel_name(channel_id):
+        state = channel_states.get(channel_id)
+        return state.title if state and state.title else channel_id
+
+    lines = [f"⚠️ Job posted to {len(channels) - len(errors)} of {len(channels)} channels:"]
+    lines += [f"✅ {channel_name(c)}" for c in channels if c not in errors]
+    lines += [f"❌ {channel_name(c)}: {post_error_hint(errors[c])}" for c in channels if c in errors]
+    if len(channels) == 1:
+        lines = [f"❌ Failed to post job: {post_error_hint(errors[channels[0]])}"]
+    context.user_data["failed_post"] = {"text": job_text, "url": view_details_url, "channels": list(errors),
+                                        "job_id": job_id, "deadline": deadline}
+    retry_keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔁 Retry failed channels", callback_data="retry_failed_post")]])
+    await update.effective_message.reply_text("\n".join(lines), reply_markup=retry_keyboard)
+
+async def retry_failed_post_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Re-post the last job to the channels it failed on (never to the ones that have it)"""
+    query = update.callback_query
+    failed = context.user_data.get("failed_post")
+    if not failed:
+        await query.answer("Nothing left to retry", show_alert=True)
+        return
+    await query.answer()
+    await post_job_to_channels(update, context, tuple(failed["channels"]), failed["text"], failed["url"],
+                               job_id=failed.get("job_id"), deadline=failed.get("deadline"))
 
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await update.message.reply_text("❌ Job posting cancelled.")
     return ConversationHandler.END
 
+# ---------------------------
+# Bulk job import (/importjobs)
+# ---------------------------
+IMPORT_USAGE = (
+    "📥 *Import jobs*\n\n"
+    "Send a CSV or JSON file with one job per row, using the same fields as /postjob:\n"
+    "`job_title, job_type, work_location, salary, deadline, description, client_type, "
+    "company_name, verified, previous_jobs, job_link`\n\n"
+    "Deadlines are YYYY-MM-DD; `verified` and `previous_jobs` may be left empty. "
+    "JSON files hold an array of objects (or one object per line).\n\n"
+    "Valid rows are saved and posted to the channels at the usual pace, and a status "
+    "message shows how far the import has got."
+)
+
+# Imports running in this process, by user; one at a time per user
+active_imports = {}
+
+def may_import(user_id) -> bool:
+    return user_id in IMPORT_ALLOWED_USERS
+
+async def import_jobs_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+    if not may_import(user_id):
+        await update.message.reply_text("⛔ Bulk import is limited to approved employers.")
+        return
+    context.user_data['awaiting_input'] = 'import'
+    await update.message.reply_text(IMPORT_USAGE, parse_mode="Markdown")
+
+async def download_document(bot, document, target):
+    """Stream a document from Telegram into the binary file ``target``, chunk by chunk"""
+    size = 0
+    async for chunk in telegram_file_chunks(bot, document.file_id):
+        size += len(chunk)
+        if size > IMPORT_MAX_BYTES:
+            raise ImportFormatError(f"file is larger than {IMPORT_MAX_BYTES // (1024 * 1024)} MB")
+        target.write(chunk)
+    target.seek(0)
+
+async def import_jobs_file(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Start importing an uploaded CSV/JSON file in the background"""
+    m = update.message
+    user_id = update.effective_user.id
+    context.user_data.pop('awaiting_input', None)
+    file_name = m.document.file_name or "jobs.csv"
+    if not may_import(user_id):
+        await m.reply_text("⛔ Bulk import is limited to approved employers.")
+        return
+    if not file_name.lower().endswith((".csv", ".json", ".jsonl")):
+        await m.reply_text("❌ Please send the jobs as a .csv or .json file.")
+        return
+    if m.document.file_size and m.document.file_size > IMPORT_MAX_BYTES:
+        await m.reply_text(f"❌ The file is too large (limit {IMPORT_MAX_BYTES // (1024 * 1024)} MB).")
+        return
+    if user_id in active_imports:
+        await m.reply_text("⏳ Your previous import is still running; please wait until it finishes.")
+        return
+
+    report = ImportReport(file_name, digest=DIGEST_INTERVAL_MINUTES > 0)
+    status = await m.reply_text(report.render())
+    active_imports[user_id] = report
+    # Runs past this handler so the user's other updates are not held up meanwhile
+    context.application.create_task(run_import(context.bot, user_id, m.document, status, report))
+
+async def run_import(bot, user_id, document, status, report):
+    """Download, parse, store and post one file, editing ``status`` as it goes.
+
+    Rows are read from a temporary file and stored IMPORT_BATCH_SIZE at a time, so
+    only one batch is in memory however long the file is. Stored jobs are posted
+    by a separate task through send_scheduler, at most IMPORT_POST_WINDOW at once
+    (in digest mode they are queued for the digest instead).
+    """
+    last_edit = 0.0
+    last_text = status.text
+
+    async def show(force=False):
+        nonlocal last_edit, last_text
+        text = report.render()
+        if text == last_text or (not force and time.monotonic() - last_edit < IMPORT_STATUS_INTERVAL):
+            return
+        last_edit, last_text = time.monotonic(), text
+        try:
+            await send_scheduler.submit(
+                status.chat_id,
+                lambda: bot.edit_message_text(text, chat_id=status.chat_id, message_id=status.message_id),
+                INTERACTIVE,
+            )
+        except TelegramError as e:
+            logger.warning(f"Could not update import status for user {user_id}: {e}")
+
+    to_post = asyncio.Queue()
+    window = asyncio.Semaphore(IMPORT_POST_WINDOW)
+
+    async def post_stored(job_id):
+        try:
+            job = await asyncio.to_thread(job_store.get, job_id)
+            job_text, view_details_url = render_job_post(job)
+            errors = await post_job(bot, channel_routes.channels_for(job), job_text, view_details_url,
+                                    job_id=job_id, deadline=job["deadline"])
+        except Exception as e:
+            logger.error(f"Posting imported job #{job_id} failed: {e}")
+            errors = {None: e}
+        finally:
+            window.release()
+        if errors:
+            report.post_failed += 1
+        else:
+            report.posted += 1
+        await show(force=report.finished)
+
+    async def poster():
+        posts = set()
+        while (job_id := await to_post.get()) is not None:
+            await window.acquire()
+            task = asyncio.create_task(post_stored(job_id))
+            posts.add(task)
+            task.add_done_callback(posts.discard)
+        if posts:
+            await asyncio.gather(*posts)
+
+    posting = asyncio.create_task(poster())
+    try:
+        with tempfile.TemporaryFile() as spool:
+            await download_document(bot, document, spool)
+            rows = iter_rows(spool, report.file_name)
+            while True:
+                batch = await asyncio.to_thread(lambda: list(itertools.islice(rows, IMPORT_BATCH_SIZE)))
+                if not batch:
+                    break
+                jobs = []
+                for where, row in batch:
+                    report.rows += 1
+                    if report.rows > IMPORT_MAX_ROWS:
+                        raise ImportFormatError(f"more than {IMPORT_MAX_ROWS} rows")
+                    job, errors = validate_job(row) if isinstance(row, dict) else (None, ["not an object"])
+                    if errors:
+                        report.reject(where, errors)
+                    else:
+                        jobs.append(job)
+                if jobs:
+                    ids = await asyncio.to_thread(job_store.add_many, jobs, "import", user_id)
+                    report.stored += len(ids)
+                    job_alerts.poke()
+                    if report.digest:
+                        await asyncio.to_thread(job_store.queue_digest, ids)
+                        report.posted += len(ids)
+                        job_digest.poke()
+                    else:
+                        for job_id in ids:
+                            to_post.put_nowait(job_id)
+                await show()
+    except (ImportFormatError, OSError, aiohttp.ClientError, TelegramError, sqlite3.Error) as e:
+        logger.error(f"Job import from user {user_id} stopped: {e}")
+        report.error = str(e)
+    finally:
+        report.reading = False
+        to_post.put_nowait(None)
+        await show(force=True)
+        try:
+            await posting
+        finally:
+            active_imports.pop(user_id, None)
+            await show(force=True)
+            logger.info(f"Job import from user {user_id} done: {report.stored} stored, "
+                        f"{report.skipped} skipped, {report.posted} posted, {report.post_failed} failed")
+
+# ---------------------------
+# Job search
+# ---------------------------
+def job_summary(job):
+    """Title and detail lines of a stored job, as shown in /search, inline results and alerts"""
+    lines = []
+    details = [v for v in (job["company_name"], job["work_location"], job["job_type"]) if v]
+    if details:
+        lines.append(" · ".join(details))
+    if job["salary"]:
+        lines.append(f"Salary: {job['salary']}")
+    if job["deadline"]:
+        lines.append(f"Deadline: {job['deadline']}")
+    return job["job_title"] or "Untitled", lines
+
+def view_details_markup(job):
+    """The "View Details" button for a stored job; None when its link is not a usable URL"""
+    url = clean_link(job["job_link"])
+    return InlineKeyboardMarkup([[InlineKeyboardButton("View Details", url=url)]]) if url else None
+
+async def render_search_page(query_text: str, page: int):
+    """Text and pager keyboard for one page of /search results"""
+    results, has_more = await asyncio.to_thread(job_store.search, query_text, limit=SEARCH_PAGE_SIZE,
+                                                offset=page * SEARCH_PAGE_SIZE)
+    if not results:
+        text = f"🔍 No jobs found for \"{query_text}\"." if page == 0 else "🔍 No more results."
+    else:
+        lines = [f"🔍 Jobs matching \"{query_text}\" (page {page + 1}):", ""]
+        for number, job in enumerate(results, start=page * SEARCH_PAGE_SIZE + 1):
+            title, summary = job_summary(job)
+            lines.append(f"{number}. {title}")
+            lines.extend(f"   {line}" for line in summary)
+            url = clean_link(job["job_link"])
+            if url:
+                lines.append(f"   {url}")
+        text = "\n".join(lines)
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton("◀️ Previous", callback_data=f"search_page:{page - 1}"))
+    if has_more:
+        buttons.append(InlineKeyboardButton("Next ▶️", callback_data=f"search_page:{page + 1}"))
+    return text, InlineKeyboardMarkup([buttons]) if buttons else None
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query_text = " ".join(context.args).strip()
+    if not query_text:
+        await update.message.reply_text("Usage: /search <keywords>\nExample: /search python remote")
+        return
+    # The pager buttons only carry the page number (callback_data is limited to 64 bytes)
+    context.user_data["search_query"] = query_text
+    text, reply_markup = await render_search_page(query_text, 0)
+    await update.message.reply_text(text, reply_markup=reply_markup, disable_web_page_preview=True)
+
+async def search_page_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    query_text = context.user_data.get("search_query")
+    if not query_text:
+        await query.answer("This search has expired, please run /search again", show_alert=True)
+        return
+    await query.answer()
+    page = max(0, int(query.data.split(":", 1)[1]))
+    text, reply_markup = await render_search_page(query_text, page)
+    await safe_edit_message(query, text, reply_markup=reply_markup, context=context)
+
+# ---------------------------
+# CV search (/cvsearch, approved employers)
+# ---------------------------
+CV_SEARCH_LIMIT = 10
+
+def find_cvs(query_text: str) -> list:
+    """(user id, skills) of the CVs mentioning every word of ``query_text``; runs in a thread"""
+    matches = []
+    for owner in cv_store.search(query_text, CV_SEARCH_LIMIT):
+        extracted = cv_store.text_for(owner)
+        matches.append((int(owner.split(":", 1)[1]), extracted["skills"] if extracted else []))
+    return matches
+
+async def cv_search_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Job seekers whose uploaded CV matches the keywords, with their name and contact"""
+    if not may_import(update.effective_user.id):
+        await update.message.reply_text("⛔ CV search is limited to approved employers.")
+        return
+    query_text = " ".join(context.args).strip()
+    if not query_text:
+        await update.message.reply_text("Usage: /cvsearch <skills>\nExample: /cvsearch accountant quickbooks")
+        return
+    try:
+        matches = await asyncio.to_thread(find_cvs, query_text)
+    except sqlite3.Error as e:
+        logger.error(f"CV search failed for {query_text!r}: {e}")
+        await update.message.reply_text("❌ CV search is unavailable right now. Please try again later.")
+        return
+    if not matches:
+        await update.message.reply_text(f"No CVs mention all of: {query_text}")
+        return
+    lines = [f"📄 CVs matching \"{query_text}\":"]
+    for n, (seeker, skills) in enumerate(matches, 1):
+        profile = user_profiles.get(seeker, {})
+        lines.append(f"\n{n}. {profile.get('custom_name') or f'User {seeker}'} (tg://user?id={seeker})")
+        if skills:
+            lines.append(f"   🛠️ {', '.join(skills[:10])}")
+        if profile.get('contact_info'):
+            lines.append(f"   📞 {profile['contact_info']}")
+    await update.message.reply_text("\n".join(lines), disable_web_page_preview=True)
+
+def inline_job_result(job) -> InlineQueryResultArticle:
+    """Shareable article for one job: summary text plus the View Details button"""
+    title, summary = job_summary(job)
+    lines = [f"📢 {title}", *summary, "\nFound with @HustleXet_bot"]
+    return InlineQueryResultArticle(
+        id=str(job["id"]),
+        title=title,
+        description=" · ".join(summary),
+        input_message_content=InputTextMessageContent("\n".join(lines), disable_web_page_preview=True),
+        reply_markup=view_details_markup(job),
+    )
+
+async def inline_search_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """@HustleXet_bot <query>: job search from any chat, paged with next_offset"""
+    inline_query = update.inline_query
+    query_text = normalize_query(inline_query.query)
+    if not query_text:
+        await inline_query.answer([], cache_time=INLINE_CACHE_TIME)
+        return
+    try:
+        offset = max(0, int(inline_query.offset or 0))
+    except ValueError:
+        offset = 0
+    # Typing sends a query per keystroke; only the one the user paused on is searched.
+    # Scrolling for the next page (offset set) is never debounced.
+    if not offset and not await inline_debouncer.settle(inline_query.from_user.id, inline_query.id):
+        return
+
+    key = (query_text, offset)
+    page = inline_cache.get(key)
+    if page is None:
+        jobs, has_more = await asyncio.to_thread(job_store.search, query_text, limit=INLINE_PAGE_SIZE,
+                                                 offset=offset)
+        page = ([inline_job_result(job) for job in jobs], str(offset + INLINE_PAGE_SIZE) if has_more else "")
+        inline_cache.put(key, page)
+    results, next_offset = page
+    try:
+        await inline_query.answer(results, cache_time=INLINE_CACHE_TIME, next_offset=next_offset)
+    except BadRequest as e:
+        # The query expired while we waited (answers must come within ~10 seconds)
+        logger.debug(f"Inline query {inline_query.id} not answered: {e}")
+
+# ---------------------------
+# Job alerts
+# ---------------------------
+ALERT_USAGE = (
+    "Usage: /alert <keywords> | location: <place> | type: <job type>\n"
+    "Every part is optional, but at least one is needed. Examples:\n"
+    "/alert python developer\n"
+    "/alert designer | location: Addis Ababa\n"
+    "/alert type: Freelance | location: Remote"
+)
+
+_alert_deliveries = set()
+
+async def send_job_alerts(bot, job, user_ids):
+    """Queue an alert DM for every matched user who has job alerts switched on"""
+    recipients = [uid for uid in user_ids
+                  if user_notifications.get(uid, DEFAULT_NOTIFICATIONS).get('job_alerts', True)]
+    if not recipients:
+        return
+    title, summary = job_summary(job)
+    text = "\n".join(["🚨 New job matching your alert", "", f"📢 {title}", *summary,
+                      "\nManage your alerts with /alerts"])
+    reply_markup = view_details_markup(job)
+
+    async def deliver():
+        results = await asyncio.gather(*(
+            send_scheduler.send_message(bot, uid, priority=BULK, text=text, reply_markup=reply_markup,
+                                        disable_web_page_preview=True)
+            for uid in recipients
+        ), return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        logger.info(f"Job #{job['id']} alerts: {len(results) - len(failed)} sent, {len(failed)} failed")
+
+    # Paced by the scheduler; the dispatcher moves on to the next job right away
+    task = asyncio.create_task(deliver())
+    _alert_deliveries.add(task)
+    task.add_done_callback(_alert_deliveries.discard)
+
+def render_alerts(user_id):
+    alerts = alert_store.for_user(user_id)
+    if not alerts:
+        return "🔔 You have no job alerts yet.\n\n" + ALERT_USAGE, None
+    lines = ["🔔 Your job alerts:", ""]
+    buttons = []
+    for number, (sub_id, spec) in enumerate(alerts, start=1):
+        lines.append(f"{number}. {describe_spec(spec)}")
+        buttons.append([InlineKeyboardButton(f"❌ Remove {number}", callback_data=f"alert_del:{sub_id}")])
+    if not user_notifications.get(user_id, DEFAULT_NOTIFICATIONS).get('job_alerts', True):
+        lines += ["", "⚠️ Job alerts are switched off in Settings → Account → Notifications."]
+    return "\n".join(lines), InlineKeyboardMarkup(buttons)
+
+async def alert_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    user_id = update.effective_user.id
+    spec = parse_spec(" ".join(context.args))
+    if spec is None:
+        await update.message.reply_text(ALERT_USAGE)
+        return
+    if len(alert_store.for_user(user_id)) >= MAX_ALERTS_PER_USER:
+        await update.message.reply_text(
+            f"You already have {MAX_ALERTS_PER_USER} alerts. Remove one with /alerts first.")
+        return
+    sub_id = await asyncio.to_thread(alert_store.add, user_id, spec)
+    job_alerts.subscribe(user_id, sub_id, spec)
+    text = f"🔔 Alert saved: {describe_spec(spec)}\nYou'll get a message when a matching job is posted."
+    if not user_notifications.get(user_id, DEFAULT_NOTIFICATIONS).get('job_alerts', True):
+        text += "\n\n⚠️ Job alerts are switched off in Settings → Account → Notifications."
+    await update.message.reply_text(text)
+
+async def alerts_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    text, reply_markup = render_alerts(update.effective_user.id)
+    await update.message.reply_text(text, reply_markup=reply_markup)
+
+async def alert_delete_cb(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    user_id = update.effective_user.id
+    sub_id = int(query.data.split(":", 1)[1])
+    if await asyncio.to_thread(alert_store.remove, user_id, sub_id):
+        job_alerts.unsubscribe(sub_id)
+    await query.answer("Alert removed")
+    text, reply_markup = render_alerts(user_id)
+    await safe_edit_message(query, text, reply_markup=reply_markup, context=context)
+
+async def my_chat_member_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Keep the channel state cache in sync when the bot's membership changes"""
+    channel_states.apply_member_update(update.my_chat_member)
+
 # ---------------------------
 # Main Function
 # ---------------------------
@@ -1833,8 +2260,15 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
     """Log errors and handle them gracefully"""
     logger.error("Exception while handling an update:", exc_info=context.error)
     
-    # Handle specific error types
-    if "Message to edit not found" in str(context.error):
+    # Handle specific error types; bot_identity.check() re-raises a revoked token (InvalidToken or Forbidden)
+    if isinstance(context.error, InvalidToken) or context.error is bot_identity.error:
+        logger.error("Cannot serve updates due to invalid bot token")
+        if update and hasattr(update, 'effective_chat') and update.effective_chat:
+            try:
+                await update.effective_chat.send_message("❌ Error: Invalid bot token. Please contact the bot administrator.")
+            except Exception:
+                pass
+    elif "Message to edit not found" in str(context.error):
         # This error is already handled by safe_edit_message, just log it
         logger.info("Message edit failed - message not found")
     elif update and hasattr(update, 'effective_chat') and update.effective_chat:
@@ -1847,19 +2281,96 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
         except Exception:
             pass  # If we can't even send a message, just log it
 
-def main():
-    app = ApplicationBuilder().token(TOKEN).build()
+async def post_init(application) -> None:
+    """Start background services once the bot has been initialised"""
+    keyboards.prebuild(KEYBOARD_VARIANTS)
+    await user_store.start()
+    job_store.open()
+    await job_alerts.start(application.bot)
+    await http_pool.start()
+    await send_scheduler.start()
+    if PROFILE_API_URL:
+        await profile_sync.start(application.bot)
+    if CV_EXTRACT_WORKERS > 0:
+        await cv_extraction.start()
+        if BOT_ROLE != "worker" or WORKER_INDEX == 0:
+            # CVs still waiting when the bot last stopped, or uploaded through the web API
+            for stored in await asyncio.to_thread(cv_store.unextracted, CV_EXTRACT_QUEUE):
+                await queue_cv_extraction(stored)
+    if BOT_ROLE != "worker" or WORKER_INDEX == 0:
+        await post_expiry.start(application.bot, application.job_queue)
+        if DIGEST_INTERVAL_MINUTES > 0:
+            await job_digest.start(application.bot)
+    await bot_identity.start(application.bot)
+    await webapp_prober.start()
+    await asyncio.gather(*(channel_states.refresh(application.bot, channel_id)
+                           for channel_id in channel_routes.all_channels()))
+
+async def post_stop(application) -> None:
+    """Drain queued sends while the bot can still talk to Telegram"""
+    await job_alerts.stop()
+    await post_expiry.stop()
+    await job_digest.stop()
+    await profile_sync.stop()
+    await send_scheduler.stop()
+
+async def post_shutdown(application) -> None:
+    """Stop background services"""
+    logger.info(f"Skipped {edit_fingerprints.skipped} no-op message edits")
+    logger.info(f"Inline search: {inline_cache.hits} cache hits, {inline_cache.misses} misses, "
+                f"{inline_debouncer.dropped} superseded keystrokes")
+    await bot_identity.stop()
+    await webapp_prober.stop()
+    await http_pool.close()
+    await user_store.stop()
+    job_store.close()
+    alert_store.close()
+    if CV_EXTRACT_WORKERS > 0:
+        await cv_extraction.stop()
+    logger.info(f"CV store: {cv_store.stats()}, {cv_store.deduplicated} uploads deduplicated this run")
+    cv_store.close()
+
+def build_application(token: str = TOKEN, base_url: str = None):
+    """Build the Application with all handlers registered"""
+    builder = (
+        ApplicationBuilder()
+        .token(token)
+        .concurrent_updates(PerUserUpdateProcessor(MAX_CONCURRENT_UPDATES))
+        .persistence(SQLitePersistence(
+            USER_STATE_DB,
+            update_interval=PERSISTENCE_INTERVAL,
+            active_window=PERSISTENCE_ACTIVE_DAYS * 86400,
+            shard=(WORKER_INDEX, BOT_WORKERS) if BOT_ROLE == "worker" else None,
+        ))
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+    )
+    if base_url:
+        # Used to point the bot at a local fake Bot API in tests
+        builder = builder.base_url(base_url)
+        if base_url.endswith("/bot"):
+            # File downloads are served next to the methods (".../bot" -> ".../file/bot")
+            builder = builder.base_file_url(f"{base_url[:-len('/bot')]}/file/bot")
+    app = builder.build()
     
     # Add error handler
     app.add_error_handler(error_handler)
 
     # Command handlers
     app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("search", search_command))
+    app.add_handler(InlineQueryHandler(inline_search_handler))
+    app.add_handler(CommandHandler("alert", alert_command))
+    app.add_handler(CommandHandler("alerts", alerts_command))
+    app.add_handler(CommandHandler("importjobs", import_jobs_command))
+    app.add_handler(CommandHandler("cvsearch", cv_search_command))
 
     # Job Posting ConversationHandler
     job_post_conv = ConversationHandler(
         entry_points=[CallbackQueryHandler(post_job_start, pattern="^post_job_telegram$"),
-                      CommandHandler("postjob", post_job_start)],
+                      CommandHandler("postjob", post_job_start),
+                      MessageHandler(filters.StatusUpdate.WEB_APP_DATA, web_app_job)],
         states={
             JOB_TITLE: [MessageHandler(filters.TEXT & ~filters.COMMAND, job_title)],
             JOB_TYPE: [MessageHandler(filters.TEXT & ~filters.COMMAND, job_type)],
@@ -1872,9 +2383,14 @@ def main():
             VERIFIED: [MessageHandler(filters.TEXT & ~filters.COMMAND, verified)],
             PREVIOUS_JOBS: [MessageHandler(filters.TEXT & ~filters.COMMAND, previous_jobs)],
             JOB_LINK: [MessageHandler(filters.TEXT & ~filters.COMMAND, job_link)],
+            JOB_TEMPLATE_FIELD: [MessageHandler(filters.TEXT & ~filters.COMMAND, job_template_field)],
         },
         fallbacks=[CommandHandler("cancel", cancel)],
-        per_chat=True
+        # /postjob (possibly with a whole job in the message) starts over from any step
+        allow_reentry=True,
+        per_chat=True,
+        name="job_post",
+        persistent=True
     )
     app.add_handler(job_post_conv)
 
@@ -1882,6 +2398,9 @@ def main():
     app.add_handler(CallbackQueryHandler(menu_callback, pattern="^menu$"))
     app.add_handler(CallbackQueryHandler(applications_cb, pattern="^applications$"))
     app.add_handler(CallbackQueryHandler(about_cb, pattern="^about$"))
+    app.add_handler(CallbackQueryHandler(retry_failed_post_cb, pattern="^retry_failed_post$"))
+    app.add_handler(CallbackQueryHandler(search_page_cb, pattern=r"^search_page:\d+$"))
+    app.add_handler(CallbackQueryHandler(alert_delete_cb, pattern=r"^alert_del:\d+$"))
     app.add_handler(CallbackQueryHandler(settings_cb, pattern="^settings$"))
     
     # Settings tab handlers
@@ -1908,11 +2427,56 @@ def main():
     app.add_handler(CallbackQueryHandler(toggle_notification_handler, pattern="^toggle_"))
     app.add_handler(CallbackQueryHandler(confirm_delete_account_handler, pattern="^confirm_delete_account$"))
 
+    # Channel membership changes (keeps channel_states fresh)
+    app.add_handler(ChatMemberHandler(my_chat_member_handler, ChatMemberHandler.MY_CHAT_MEMBER))
+
     # File/message handlers
     app.add_handler(MessageHandler(filters.Document.ALL | filters.PHOTO, file_handler))
 
+    return app
+
+def main():
+    if BOT_ROLE == "worker":
+        run_worker(build_application(base_url=BOT_API_BASE_URL), WORKER_PORT, WORKER_SECRET, ALLOWED_UPDATES)
+        return
+    if BOT_WORKERS > 0:
+        if BOT_MODE == "webhook" and not WEBHOOK_URL:
+            logger.error("BOT_MODE=webhook requires WEBHOOK_URL to be set")
+            return
+        run_sharded(
+            TOKEN,
+            BOT_WORKERS,
+            [sys.executable, os.path.abspath(__file__)],
+            ALLOWED_UPDATES,
+            mode=BOT_MODE,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}" if WEBHOOK_URL else None,
+            secret_token=WEBHOOK_SECRET,
+            path=WEBHOOK_PATH,
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            worker_base_port=WORKER_BASE_PORT,
+            base_url=BOT_API_BASE_URL,
+        )
+        return
+
+    app = build_application(base_url=BOT_API_BASE_URL)
+
     # Run bot
-    app.run_polling()
+    if BOT_MODE == "webhook":
+        if not WEBHOOK_URL:
+            logger.error("BOT_MODE=webhook requires WEBHOOK_URL to be set")
+            return
+        run_webhook(
+            app,
+            url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            allowed_updates=ALLOWED_UPDATES,
+            secret_token=WEBHOOK_SECRET,
+            path=WEBHOOK_PATH,
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+        )
+    else:
+        app.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == "__main__":
     main()
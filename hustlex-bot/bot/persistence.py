@@ -0,0 +1,250 @@
+# bot/persistence.py
+# PTB persistence over SQLite: user_data and conversation states, dirty keys only
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from bot.user_store import connect
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS ptb_user_data (
+        user_id INTEGER PRIMARY KEY,
+        data TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ptb_user_data_updated ON ptb_user_data (updated_at)",
+    """
+    CREATE TABLE IF NOT EXISTS ptb_conversations (
+        name TEXT NOT NULL,
+        conv_key TEXT NOT NULL,
+        state TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (name, conv_key)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+class SQLitePersistence(BasePersistence):
+    """Keeps ``user_data`` and persistent ConversationHandler states in SQLite.
+
+    The Application hands over only the users and conversation keys touched since
+    its last run (every ``update_interval`` seconds); entries whose JSON did not
+    change are dropped here, and the rest are written in one transaction.
+
+    Startup only loads rows touched within ``active_window`` seconds. Anybody else
+    is read on their first update via :meth:`refresh_user_data`, so start time
+    grows with recent activity rather than with the total number of users.
+    Conversation rows are deleted when the conversation ends.
+
+    With ``shard=(index, count)`` (a sharded worker) only the users routed to this
+    worker, ``user_id % count == index``, are loaded.
+    """
+
+    def __init__(self, path: str, update_interval: float = 10, active_window: float = 7 * 86400,
+                 shard: tuple = None):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self.active_window = active_window
+        self.shard = shard
+        self._reader = None
+        self._writer = None
+        self._known_users = set()   # user ids whose row has been loaded (or found missing)
+        self._written = {}          # (kind, key) -> hash of the last JSON written
+        self._user_rows = {}        # user_id -> JSON, or None to delete
+        self._conv_rows = {}        # (name, conv_key) -> JSON, or None to delete
+        self._flush_task = None
+        self.rows_written = 0
+        self.unchanged_skipped = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection for reads on the event loop; writes use their own (see _write)"""
+        if self._reader is None:
+            self._writer = connect(self.path)
+            for statement in SCHEMA:
+                self._writer.execute(statement)
+            self._reader = connect(self.path)
+        return self._reader
+
+    # ---------------------------
+    # Loading
+    # ---------------------------
+    async def get_user_data(self):
+        since = time.time() - self.active_window
+        query, params = "SELECT user_id, data FROM ptb_user_data WHERE updated_at >= ?", (since,)
+        if self.shard:
+            query += " AND user_id % ? = ?"
+            params += (self.shard[1], self.shard[0])
+        rows = self._db().execute(query, params).fetchall()
+        user_data = {}
+        for user_id, data in rows:
+            user_data[user_id] = json.loads(data)
+            self._known_users.add(user_id)
+            self._written[("user", user_id)] = hash(data)
+        logger.info(f"Loaded user_data for {len(user_data)} recently active users")
+        return user_data
+
+    async def refresh_user_data(self, user_id, user_data):
+        if user_id in self._known_users:
+            return
+        self._known_users.add(user_id)
+        row = self._db().execute("SELECT data FROM ptb_user_data WHERE user_id = ?", (user_id,)).fetchone()
+        if row:
+            self._written[("user", user_id)] = hash(row[0])
+            # Keep anything a handler already put there
+            for key, value in json.loads(row[0]).items():
+                user_data.setdefault(key, value)
+
+    async def get_conversations(self, name):
+        since = time.time() - self.active_window
+        rows = self._db().execute(
+            "SELECT conv_key, state FROM ptb_conversations WHERE name = ? AND updated_at >= ?", (name, since)
+        ).fetchall()
+        conversations = {}
+        for conv_key, state in rows:
+            key = tuple(json.loads(conv_key))
+            # Keys end with the user id (per_user conversations)
+            if self.shard and key[-1] % self.shard[1] != self.shard[0]:
+                continue
+            conversations[key] = json.loads(state)
+            self._written[(name, conv_key)] = hash(state)
+        logger.info(f"Restored {len(conversations)} open '{name}' conversations")
+        return conversations
+
+    async def get_chat_data(self):
+        return {}
+
+    async def get_bot_data(self):
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    # ---------------------------
+    # Updates (buffered, written once per Application persistence run)
+    # ---------------------------
+    def _changed(self, marker, encoded) -> bool:
+        digest = None if encoded is None else hash(encoded)
+        if marker in self._written and self._written[marker] == digest:
+            self.unchanged_skipped += 1
+            return False
+        return True
+
+    async def update_user_data(self, user_id, data):
+        self._known_users.add(user_id)
+        try:
+            encoded = json.dumps(data, sort_keys=True) if data else None
+        except (TypeError, ValueError) as e:
+            logger.warning(f"user_data of {user_id} is not JSON serialisable, not persisted: {e}")
+            return
+        if self._changed(("user", user_id), encoded):
+            self._user_rows[user_id] = encoded
+            self._schedule_flush()
+
+    async def drop_user_data(self, user_id):
+        self._user_rows[user_id] = None
+        self._schedule_flush()
+
+    async def update_conversation(self, name, key, new_state):
+        conv_key = json.dumps(list(key))
+        encoded = None if new_state is None else json.dumps(new_state)
+        if self._changed((name, conv_key), encoded):
+            self._conv_rows[(name, conv_key)] = encoded
+            self._schedule_flush()
+
+    async def update_chat_data(self, chat_id, data):
+        pass
+
+    async def update_bot_data(self, data):
+        pass
+
+    async def update_callback_data(self, data):
+        pass
+
+    async def drop_chat_data(self, chat_id):
+        pass
+
+    async def refresh_chat_data(self, chat_id, chat_data):
+        pass
+
+    async def refresh_bot_data(self, bot_data):
+        pass
+
+    # ---------------------------
+    # Writing
+    # ---------------------------
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        # Let the rest of this persistence run hand over its entries first
+        await asyncio.sleep(0)
+        await self._write_pending()
+
+    def _write(self, user_rows, conv_rows):
+        now = time.time()
+        conn = self._writer
+        with conn:
+            conn.execute("BEGIN")
+            for user_id, encoded in user_rows.items():
+                if encoded is None:
+                    conn.execute("DELETE FROM ptb_user_data WHERE user_id = ?", (user_id,))
+                else:
+                    conn.execute(
+                        "INSERT INTO ptb_user_data (user_id, data, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT (user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                        (user_id, encoded, now),
+                    )
+            for (name, conv_key), encoded in conv_rows.items():
+                if encoded is None:
+                    conn.execute("DELETE FROM ptb_conversations WHERE name = ? AND conv_key = ?", (name, conv_key))
+                else:
+                    conn.execute(
+                        "INSERT INTO ptb_conversations (name, conv_key, state, updated_at) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (name, conv_key) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                        (name, conv_key, encoded, now),
+                    )
+
+    async def _write_pending(self):
+        self._db()
+        while self._user_rows or self._conv_rows:
+            user_rows, self._user_rows = self._user_rows, {}
+            conv_rows, self._conv_rows = self._conv_rows, {}
+            try:
+                await asyncio.to_thread(self._write, user_rows, conv_rows)
+            except sqlite3.Error as e:
+                logger.error(f"Persistence write failed, will retry on the next run: {e}")
+                # Newer entries for the same keys win
+                self._user_rows = {**user_rows, **self._user_rows}
+                self._conv_rows = {**conv_rows, **self._conv_rows}
+                return
+            for user_id, encoded in user_rows.items():
+                self._written[("user", user_id)] = None if encoded is None else hash(encoded)
+            for marker, encoded in conv_rows.items():
+                self._written[marker] = None if encoded is None else hash(encoded)
+            self.rows_written += len(user_rows) + len(conv_rows)
+
+    async def flush(self):
+        """Called on shutdown: write what is left and close the database"""
+        if self._flush_task is not None:
+            await self._flush_task
+            self._flush_task = None
+        await self._write_pending()
+        if self._reader is not None:
+            self._reader.close()
+            self._writer.close()
+            self._reader = self._writer = None
+        logger.info(f"Persistence flushed: {self.rows_written} rows written, "
+                    f"{self.unchanged_skipped} unchanged entries skipped")
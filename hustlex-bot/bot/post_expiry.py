@@ -0,0 +1,142 @@
+# bot/post_expiry.py
+# Deadline scheduler: a heap of channel posts by expiry time, swept by a single timer
+import asyncio
+import heapq
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def deadline_timestamp(deadline, utc_offset_hours: float = 3):
+    """End of the deadline day (YYYY-MM-DD) in the given UTC offset, as a Unix timestamp.
+
+    None if the deadline is not a date: the wizard accepts free text, and such
+    posts are simply never expired.
+    """
+    try:
+        day = datetime.strptime(str(deadline or "").strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
+    tz = timezone(timedelta(hours=utc_offset_hours))
+    return (day + timedelta(days=1)).replace(tzinfo=tz).timestamp()
+
+
+class PostExpiry:
+    """Calls ``expire(bot, posts)`` for channel posts once their job's deadline has passed.
+
+    Pending posts sit in a heap keyed by expiry time, and one timer is armed for
+    the earliest of them (or for ``refresh_interval``, whichever comes first).
+    A sweep pops the due posts, each pop costing O(log n), so no job is looked at
+    before its time. The sweep also reads posts added to the store since the last
+    one; this includes app.py posts, written by another process. On start the
+    heap is rebuilt from the store, so a restart loses nothing. Posts that were
+    due while the bot was down expire on the first sweep.
+
+    ``expire`` returns the ids of the posts it dealt with. Any others (e.g. after
+    a network error) are tried again ``retry_delay`` seconds later.
+
+    The timer runs on the Application's JobQueue when there is one. Without the
+    ``job-queue`` extra it falls back to the event loop's call_later.
+    """
+
+    def __init__(self, store, expire, refresh_interval: float = 300, retry_delay: float = 60):
+        self.store = store
+        self.expire = expire
+        self.refresh_interval = refresh_interval
+        self.retry_delay = retry_delay
+        self.bot = None
+        self._job_queue = None
+        self._heap = []         # (expires_at, post_id, post)
+        self._last_post_id = 0
+        self._timer = None
+        self._armed_at = None
+        self._sweeping = False
+        self._again = False
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _load(self):
+        for post in self.store.pending_posts(self._last_post_id):
+            heapq.heappush(self._heap, (post["expires_at"], post["id"], post))
+            self._last_post_id = post["id"]
+
+    def _arm(self, when: float):
+        """Fire the timer at ``when`` (Unix time) unless it already fires sooner"""
+        if self._armed_at is not None and self._armed_at <= when:
+            return
+        self._disarm()
+        delay = max(0.0, when - time.time())
+        self._armed_at = when
+        if self._job_queue is not None:
+            self._timer = self._job_queue.run_once(self._on_timer, delay, name="post_expiry")
+        else:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(delay, lambda: loop.create_task(self._sweep()))
+
+    def _disarm(self):
+        if self._timer is not None:
+            if hasattr(self._timer, "schedule_removal"):
+                # A stopped JobQueue (post_stop runs after it) has dropped its jobs already
+                if self._job_queue.scheduler.running:
+                    self._timer.schedule_removal()
+            else:
+                self._timer.cancel()
+        self._timer = self._armed_at = None
+
+    def poke(self):
+        """Sweep now, e.g. right after this process recorded new posts"""
+        if self.bot is not None:
+            self._arm(time.time())
+
+    async def _on_timer(self, context):
+        await self._sweep()
+
+    async def _sweep(self):
+        self._timer = self._armed_at = None
+        if self._sweeping:
+            # Let the running sweep go round once more when it is done
+            self._again = True
+            return
+        self._sweeping = True
+        self._again = False
+        try:
+            self._load()
+            now = time.time()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+            if due:
+                done = await self.expire(self.bot, due)
+                if done:
+                    await asyncio.to_thread(self.store.mark_expired, list(done))
+                    self.expired += len(done)
+                for post in due:
+                    if post["id"] not in done:
+                        heapq.heappush(self._heap, (now + self.retry_delay, post["id"], post))
+        except sqlite3.Error as e:
+            logger.error(f"Post expiry sweep failed: {e}")
+        finally:
+            self._sweeping = False
+            if self.bot is not None:
+                next_at = time.time() + (0 if self._again else self.refresh_interval)
+                if self._heap:
+                    next_at = min(next_at, self._heap[0][0])
+                self._arm(next_at)
+
+    async def start(self, bot, job_queue=None):
+        self.bot = bot
+        self._job_queue = job_queue
+        self._load()
+        logger.info(f"Post expiry: {len(self._heap)} channel posts waiting for their deadline"
+                    f"{'' if job_queue is not None else ' (no JobQueue, using the event loop timer)'}")
+        self._arm(self._heap[0][0] if self._heap else time.time() + self.refresh_interval)
+
+    async def stop(self):
+        self._disarm()
+        self.bot = None
+        logger.info(f"Post expiry stopped: {self.expired} channel posts expired")
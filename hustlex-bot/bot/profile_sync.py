@@ -0,0 +1,139 @@
+# bot/profile_sync.py
+# Profile sync to the web API: per-user debounce, latest state only, retries with backoff
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+
+class SyncRejected(Exception):
+    """The API refused the profile (4xx); sending the same request again would not help"""
+
+
+class ProfileSync:
+    """Coalesces profile edits into one ``send(bot, user_id, profile)`` call per burst.
+
+    :meth:`schedule` records a snapshot of the user's profile. The send happens
+    ``delay`` seconds after the user's last edit, and at most ``max_delay`` seconds
+    after the first one, so a user who keeps editing is still synced. Only the
+    latest snapshot is sent. Every edit it replaces is counted in ``coalesced``:
+    these are the writes the debounce saved.
+
+    Each user has at most one send in flight, so snapshots arrive in order. A
+    failed send is retried up to ``max_attempts`` times, with exponential backoff
+    and jitter. If the user edits again in the meantime, the retry carries the
+    newer snapshot. ``send`` raises :class:`SyncRejected` for errors that a
+    retry cannot fix.
+
+    :meth:`stop` sends whatever is still waiting (one attempt each, within
+    ``drain_timeout`` seconds) instead of dropping it.
+    """
+
+    def __init__(self, send, delay: float = 2.0, max_delay: float = 10.0, max_attempts: int = 5,
+                 backoff: float = 1.0, max_backoff: float = 60.0, drain_timeout: float = 10.0):
+        self.send = send
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.drain_timeout = drain_timeout
+        self.bot = None
+        self._pending = {}      # user_id -> latest unsent snapshot
+        self._due = {}          # user_id -> loop time to send it at
+        self._first = {}        # user_id -> loop time of the first edit of the burst
+        self._tasks = {}        # user_id -> task sending that user's snapshots
+        self._closing = None
+        self.requested = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failed = 0
+
+    def schedule(self, user_id, profile: dict) -> bool:
+        """Queue ``profile`` (copied) for sending; False if the sync is not running"""
+        if self.bot is None or self._closing.is_set():
+            return False
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self.requested += 1
+        if user_id in self._pending:
+            self.coalesced += 1
+        self._pending[user_id] = dict(profile)
+        first = self._first.setdefault(user_id, now)
+        self._due[user_id] = min(now + self.delay, first + self.max_delay)
+        if user_id not in self._tasks:
+            self._tasks[user_id] = loop.create_task(self._run(user_id))
+        return True
+
+    async def _sleep(self, seconds: float):
+        """Sleep, cut short when the sync is stopping"""
+        if seconds > 0 and not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _take(self, user_id):
+        self._due.pop(user_id, None)
+        self._first.pop(user_id, None)
+        return self._pending.pop(user_id, None)
+
+    async def _run(self, user_id):
+        loop = asyncio.get_running_loop()
+        try:
+            while user_id in self._pending:
+                await self._sleep(self._due[user_id] - loop.time())
+                if user_id in self._pending and loop.time() < self._due[user_id] and not self._closing.is_set():
+                    continue  # edited again while we slept
+                await self._deliver(user_id, self._take(user_id))
+        finally:
+            self._tasks.pop(user_id, None)
+
+    async def _deliver(self, user_id, profile: dict):
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self.send(self.bot, user_id, profile)
+                self.sent += 1
+                return
+            except SyncRejected as e:
+                self.failed += 1
+                logger.warning(f"Profile of user {user_id} rejected by the API: {e}")
+                return
+            except Exception as e:
+                if attempt >= self.max_attempts or self._closing.is_set():
+                    self.failed += 1
+                    logger.error(f"Profile sync for user {user_id} failed after {attempt} attempts: {e}")
+                    return
+                wait = min(self.max_backoff, self.backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                logger.info(f"Profile sync for user {user_id} failed ({e}), retrying in {wait:.1f}s")
+                self.retries += 1
+                await self._sleep(wait)
+            if user_id in self._pending:
+                # Edited while we were backing off: the retry carries the newer state
+                profile = self._take(user_id)
+                self.coalesced += 1
+
+    def stats(self) -> dict:
+        return {"requested": self.requested, "sent": self.sent, "coalesced": self.coalesced,
+                "retries": self.retries, "failed": self.failed, "pending": len(self._pending)}
+
+    async def start(self, bot):
+        self.bot = bot
+        self._closing = asyncio.Event()
+
+    async def stop(self):
+        if self.bot is None:
+            return
+        self._closing.set()
+        tasks = list(self._tasks.values())
+        if tasks:
+            done, late = await asyncio.wait(tasks, timeout=self.drain_timeout)
+            for task in late:
+                task.cancel()
+            await asyncio.gather(*late, return_exceptions=True)
+        self.bot = None
+        logger.info(f"Profile sync stopped: {self.stats()}")
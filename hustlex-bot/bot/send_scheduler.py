@@ -0,0 +1,277 @@
+# bot/send_scheduler.py
+# Rate-limited outbound send scheduler (global + per-chat token buckets)
+import asyncio
+import collections
+import heapq
+import itertools
+import logging
+import time
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Priorities: lower runs first
+INTERACTIVE = 0
+BULK = 1
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` tokens per second, at most ``capacity`` banked"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, until: float):
+        """Pause the bucket (used for RetryAfter)"""
+        self.blocked_until = max(self.blocked_until, until)
+        self.tokens = 0
+
+    def is_idle(self, now: float) -> bool:
+        if now < self.blocked_until:
+            return False
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Item:
+    __slots__ = ("priority", "seq", "chat_id", "send", "future", "attempts")
+
+    def __init__(self, priority, seq, chat_id, send, future):
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.send = send
+        self.future = future
+        self.attempts = 0
+
+
+class SendScheduler:
+    """Paces outgoing Bot API sends to stay inside Telegram's flood limits.
+
+    Every send passes a global bucket (``global_rate`` msgs/s) and a bucket for its
+    chat: ``private_rate`` for users, ``group_rate`` for groups and channels
+    (negative chat ids or ``@username``). Sends to one chat are delivered in the
+    order they were submitted, one at a time; priority only decides which chat goes
+    next, and a chat with an INTERACTIVE item queued goes ahead of BULK-only chats
+    (its earlier BULK items go with it). ``RetryAfter`` pauses the chat and the item
+    is retried from the front of its chat queue. The global bucket is paused too
+    only when the limit is bot-wide, which Telegram does not say outright: it is
+    assumed once ``flood_chats`` different chats hit a flood wait within
+    ``flood_window`` seconds. Callers await a future that resolves
+    with the sent ``Message``.
+    """
+
+    def __init__(self, global_rate: float = 30, private_rate: float = 1, group_rate: float = 20 / 60,
+                 group_burst: int = 3, max_retries: int = 5, flood_chats: int = 3, flood_window: float = 1.0):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.flood_chats = flood_chats
+        self.flood_window = flood_window
+        self._floods = collections.deque()  # (monotonic time, chat_id) of recent RetryAfter
+        self._seq = itertools.count()
+        self._queues = {}       # chat_id -> deque of _Item, in submit order
+        self._buckets = {}      # chat_id -> TokenBucket
+        self._ready = []        # heap of (priority, seq, chat_id)
+        self._waiting = []      # heap of (ready_at, chat_id)
+        self._inflight = set()
+        self._deliveries = set()    # running _deliver tasks
+        self._wakeup = None     # created in start() on the running loop
+        self._task = None
+        self.sent = 0
+        self.retried = 0
+
+    def _bucket(self, chat_id) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            # Groups and channels have negative ids (or are addressed by @username)
+            if chat_id.startswith("-") or not chat_id.isdigit():
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.private_rate, 1)
+            self._buckets[chat_id] = bucket
+        return bucket
+
+    def _schedule_chat(self, chat_id, now: float):
+        queue = self._queues.get(chat_id)
+        if not queue or chat_id in self._inflight:
+            return
+        delay = self._bucket(chat_id).delay(now)
+        if delay <= 0:
+            priority = min(item.priority for item in queue)
+            heapq.heappush(self._ready, (priority, queue[0].seq, chat_id))
+        else:
+            heapq.heappush(self._waiting, (now + delay, chat_id))
+
+    def submit(self, chat_id, send, priority: int = BULK) -> asyncio.Future:
+        """Queue ``send`` (a zero-argument coroutine function) for ``chat_id``"""
+        chat_id = str(chat_id)
+        future = asyncio.get_running_loop().create_future()
+        item = _Item(priority, next(self._seq), chat_id, send, future)
+        self._queues.setdefault(chat_id, collections.deque()).append(item)
+        self._schedule_chat(chat_id, time.monotonic())
+        if self._wakeup:
+            self._wakeup.set()
+        return future
+
+    async def send_message(self, bot, chat_id, priority: int = BULK, **kwargs):
+        """Paced ``bot.send_message``; returns the delivered Message"""
+        return await self.submit(chat_id, lambda: bot.send_message(chat_id=chat_id, **kwargs), priority)
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self._queues.values()) + len(self._inflight)
+
+    async def _sleep(self, timeout):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            while self._waiting and self._waiting[0][0] <= now:
+                _, chat_id = heapq.heappop(self._waiting)
+                self._schedule_chat(chat_id, now)
+
+            if not self._ready:
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                await self._sleep(timeout)
+                continue
+
+            global_delay = self.global_bucket.delay(now)
+            if global_delay > 0:
+                await self._sleep(global_delay)
+                continue
+
+            _, _, chat_id = heapq.heappop(self._ready)
+            queue = self._queues.get(chat_id)
+            # Entries can be stale (chat already dispatched or re-queued with a new head)
+            if not queue or chat_id in self._inflight:
+                continue
+            bucket = self._bucket(chat_id)
+            if bucket.delay(now) > 0:
+                self._schedule_chat(chat_id, now)
+                continue
+
+            item = queue.popleft()
+            if not queue:
+                del self._queues[chat_id]
+            if item.future.cancelled():
+                self._schedule_chat(chat_id, now)
+                continue
+            self.global_bucket.take(now)
+            bucket.take(now)
+            self._inflight.add(chat_id)
+            task = asyncio.create_task(self._deliver(item))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    def _bot_wide_flood(self, chat_id, now: float) -> bool:
+        """Record a RetryAfter for ``chat_id``; True when recent ones span enough chats to be bot-wide"""
+        self._floods.append((now, chat_id))
+        while self._floods[0][0] < now - self.flood_window:
+            self._floods.popleft()
+        return len({chat for _, chat in self._floods}) >= self.flood_chats
+
+    async def _deliver(self, item: _Item):
+        try:
+            result = await item.send()
+        except RetryAfter as e:
+            item.attempts += 1
+            now = time.monotonic()
+            until = now + e.retry_after
+            self._bucket(item.chat_id).block(until)
+            if self._bot_wide_flood(item.chat_id, now):
+                logger.warning(f"Flood limit hit in {self.flood_chats} chats at once, pausing all sends "
+                               f"for {e.retry_after}s")
+                self.global_bucket.block(until)
+            if item.attempts > self.max_retries:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            else:
+                self.retried += 1
+                logger.warning(f"Flood limit hit for chat {item.chat_id}, retrying in {e.retry_after}s")
+                self._queues.setdefault(item.chat_id, collections.deque()).appendleft(item)
+        except asyncio.CancelledError:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("Send scheduler stopped"))
+            raise
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+        else:
+            self.sent += 1
+            if not item.future.done():
+                item.future.set_result(result)
+        finally:
+            self._inflight.discard(item.chat_id)
+            now = time.monotonic()
+            if item.chat_id in self._queues:
+                self._schedule_chat(item.chat_id, now)
+            elif len(self._buckets) > 10000:
+                # Forget chats whose bucket has fully refilled
+                for chat_id in [c for c, b in self._buckets.items() if c not in self._queues and b.is_idle(now)]:
+                    del self._buckets[chat_id]
+            if self._wakeup:
+                self._wakeup.set()
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 10):
+        """Give queued sends a chance to go out, then fail whatever is left"""
+        deadline = time.monotonic() + drain_timeout
+        while self.pending() and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Sends already handed to Telegram get the rest of the drain time, then are cancelled
+        if self._deliveries:
+            await asyncio.wait(self._deliveries, timeout=max(deadline - time.monotonic(), 0.1))
+        for task in list(self._deliveries):
+            task.cancel()
+        await asyncio.gather(*self._deliveries, return_exceptions=True)
+        for queue in self._queues.values():
+            for item in queue:
+                if not item.future.done():
+                    item.future.set_exception(RuntimeError("Send scheduler stopped"))
+        self._queues.clear()
+        self._ready.clear()
+        self._waiting.clear()
+        self._wakeup = None
+        logger.info(f"Send scheduler stopped: {self.sent} sent, {self.retried} retried after flood waits")
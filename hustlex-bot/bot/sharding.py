@@ -0,0 +1,378 @@
+# bot/sharding.py
+# Multi-process mode: one ingress routes updates to N bot workers by user id
+import asyncio
+import collections
+import json
+import logging
+import os
+import secrets
+import time
+
+import aiohttp
+from aiohttp import web
+from telegram import Bot
+from telegram.error import TelegramError
+
+from bot.webhook import SECRET_HEADER, WebhookServer, install_stop_signals, serve_application
+
+logger = logging.getLogger(__name__)
+
+WORKER_PATH = "/updates"
+
+
+def route_key(data: dict) -> int:
+    """User id of a raw update (chat id when there is no sender, 0 if neither)"""
+    for kind, payload in data.items():
+        if kind == "update_id" or not isinstance(payload, dict):
+            continue
+        sender = payload.get("from")
+        if sender:
+            return sender["id"]
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return 0
+
+
+def shard_for(user_id: int, shards: int) -> int:
+    """Stable shard of a user. Plain modulo, so SQL can select a shard's rows the same way"""
+    return user_id % shards
+
+
+# ---------------------------
+# Worker side
+# ---------------------------
+class BatchServer(WebhookServer):
+    """Worker endpoint: accepts a JSON array of updates from the ingress, in order.
+
+    Updates are acknowledged one by one: if handing one over fails, the answer is
+    a 500 whose JSON body says how many leading updates were accepted, and the
+    ingress resends only the rest. The ids of the last ``remember`` accepted
+    updates are kept too, so a batch resent because its answer got lost is not
+    handled twice. That memory does not survive a restart, and need not: the
+    updates a crashed worker had accepted but not yet handled are lost with it.
+    """
+
+    def __init__(self, *args, remember: int = 10000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._accepted = set()
+        self._order = collections.deque()
+        self.remember = remember
+        self.duplicates = 0
+
+    def _accept(self, update_id):
+        self._accepted.add(update_id)
+        self._order.append(update_id)
+        if len(self._order) > self.remember:
+            self._accepted.discard(self._order.popleft())
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not self.authorized(request):
+            return web.Response(status=403)
+        try:
+            batch = json.loads(await request.read())
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(batch, list):
+            return web.Response(status=400)
+        for accepted, data in enumerate(batch):
+            update_id = data.get("update_id")
+            if update_id in self._accepted:
+                self.duplicates += 1
+                continue
+            try:
+                await self.on_update(data)
+            except Exception as e:
+                logger.error(f"Could not accept update {update_id}: {e}")
+                return web.json_response({"accepted": accepted}, status=500)
+            if update_id is not None:
+                self._accept(update_id)
+        return web.json_response({"accepted": len(batch)})
+
+
+def run_worker(application, port: int, secret: str, allowed_updates):
+    """Blocking entry point of one worker process (BOT_ROLE=worker)"""
+    async def runner():
+        stop_event = asyncio.Event()
+        install_stop_signals(stop_event)
+        await serve_application(application, None, allowed_updates, secret_token=secret,
+                                path=WORKER_PATH, listen="127.0.0.1", port=port,
+                                stop_event=stop_event, server_factory=BatchServer)
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        logger.info("Worker stopped")
+
+
+# ---------------------------
+# Ingress side
+# ---------------------------
+class ShardLink:
+    """Ordered delivery of updates to one worker over localhost HTTP.
+
+    A single sender drains the queue in batches of up to ``max_batch`` and resends
+    what the worker has not accepted (with backoff), so updates of one shard
+    arrive in order even across a worker restart. The worker acknowledges each
+    update, so only the refused part of a batch is sent again.
+
+    Updates are only given up on when the worker answers and still refuses them:
+    after ``max_attempts`` such answers in a row, the first update not accepted
+    is logged and dropped, so one bad update cannot hold up the shard. While the worker does
+    not answer at all (crashed, starting, or waiting for its supervisor to restart
+    it) nothing is dropped. A full queue blocks the caller.
+    """
+
+    def __init__(self, index: int, url: str, secret: str, max_batch: int = 100, max_queue: int = 10000,
+                 max_attempts: int = 30):
+        self.index = index
+        self.url = url
+        self.secret = secret
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.queue = None
+        self._task = None
+        self.delivered = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped = 0
+
+    async def put(self, data: dict):
+        await self.queue.put(data)
+
+    async def _send(self, session, batch):
+        """How many leading updates of ``batch`` the worker accepted; None if it did not answer"""
+        try:
+            async with session.post(self.url, json=batch, headers={SECRET_HEADER: self.secret}) as response:
+                if response.status == 200:
+                    return len(batch)
+                logger.warning(f"Worker {self.index} answered {response.status}")
+                if response.status == 500:
+                    try:
+                        return int((await response.json()).get("accepted", 0))
+                    except (ValueError, TypeError, AttributeError, aiohttp.ContentTypeError):
+                        pass
+                return 0
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Worker {self.index} unreachable: {e}")
+        return None
+
+    def _done(self, count: int):
+        for _ in range(count):
+            self.queue.task_done()
+
+    async def _run(self, session):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self.batches += 1
+            delay = 0.05
+            attempts = 0
+            while batch:
+                accepted = await self._send(session, batch)
+                if accepted:
+                    self.delivered += accepted
+                    self._done(accepted)
+                    batch = batch[accepted:]
+                    delay, attempts = 0.05, 0
+                    continue
+                if accepted is not None:
+                    attempts += 1       # answered, and refused
+                if attempts >= self.max_attempts:
+                    self.dropped += 1
+                    logger.error(f"Worker {self.index} refused update {batch[0].get('update_id')} "
+                                 f"{attempts} times, dropping it")
+                    self._done(1)
+                    batch = batch[1:]
+                    delay, attempts = 0.05, 0
+                    continue
+                self.retries += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+    def start(self, session):
+        self.queue = asyncio.Queue(self.max_queue)
+        self._task = asyncio.create_task(self._run(session))
+
+    async def stop(self, drain_timeout: float = 10):
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Worker {self.index}: {self.queue.qsize()} updates not delivered before shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+class ShardRouter:
+    """Routes raw updates to ``ShardLink``s by :func:`shard_for` of :func:`route_key`"""
+
+    def __init__(self, worker_urls, secret: str, max_batch: int = 100, max_queue: int = 10000):
+        self.links = [ShardLink(i, url, secret, max_batch, max_queue) for i, url in enumerate(worker_urls)]
+        self._session = None
+
+    async def route(self, data: dict):
+        await self.links[shard_for(route_key(data), len(self.links))].put(data)
+
+    async def start(self):
+        # One connection per worker is enough: each link sends one batch at a time
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=2)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+        for link in self.links:
+            link.start(self._session)
+
+    async def stop(self, drain_timeout: float = 10):
+        await asyncio.gather(*(link.stop(drain_timeout) for link in self.links))
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> list:
+        return [{"shard": link.index, "delivered": link.delivered, "batches": link.batches,
+                 "retries": link.retries, "dropped": link.dropped, "queued": link.queue.qsize() if link.queue else 0}
+                for link in self.links]
+
+
+class WorkerProcess:
+    """Keeps one worker subprocess running; it is restarted (with backoff) whenever it exits"""
+
+    def __init__(self, index: int, command, env: dict, restart_delay: float = 1, max_restart_delay: float = 60):
+        self.index = index
+        self.command = list(command)
+        self.env = env
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.process = None
+        self.restarts = 0
+        self._stopping = False
+        self._task = None
+
+    async def _run(self):
+        delay = self.restart_delay
+        while not self._stopping:
+            started = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(*self.command, env=self.env)
+            logger.info(f"Worker {self.index} started (pid {self.process.pid})")
+            code = await self.process.wait()
+            if self._stopping:
+                break
+            # A worker that ran for a while gets restarted right away
+            if time.monotonic() - started > self.max_restart_delay:
+                delay = self.restart_delay
+            logger.error(f"Worker {self.index} exited with code {code}, restarting in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_restart_delay)
+            self.restarts += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def restart(self):
+        """Terminate the current process; the supervisor loop starts a fresh one"""
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+
+    async def stop(self, timeout: float = 15):
+        self._stopping = True
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Worker {self.index} did not stop in {timeout}s, killing it")
+                self.process.kill()
+                await self.process.wait()
+        if self._task:
+            await self._task
+            self._task = None
+
+
+def worker_env(index: int, workers: int, port: int, secret: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "BOT_ROLE": "worker",
+        "BOT_WORKERS": str(workers),
+        "WORKER_INDEX": str(index),
+        "WORKER_PORT": str(port),
+        "WORKER_SECRET": secret,
+    })
+    return env
+
+
+async def poll_into(bot, on_update, allowed_updates, stop_event: asyncio.Event, timeout: int = 30):
+    """Long-poll getUpdates and hand every update (as a dict) to ``on_update``"""
+    await bot.delete_webhook()
+    offset = None
+    while not stop_event.is_set():
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=timeout, allowed_updates=list(allowed_updates))
+        except TelegramError as e:
+            logger.error(f"getUpdates failed: {e}")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            await on_update(update.to_dict())
+            offset = update.update_id + 1
+
+
+async def serve_sharded(token: str, workers: int, command, allowed_updates, mode: str = "polling",
+                        webhook_url: str = None, secret_token: str = None, path: str = "/telegram",
+                        listen: str = "0.0.0.0", port: int = 8443, worker_base_port: int = 9100,
+                        base_url: str = None, stop_event: asyncio.Event = None):
+    """Run the ingress and supervise ``workers`` worker processes until ``stop_event`` is set"""
+    stop_event = stop_event or asyncio.Event()
+    ipc_secret = secrets.token_urlsafe(32)
+    ports = [worker_base_port + i for i in range(workers)]
+    processes = [WorkerProcess(i, command, worker_env(i, workers, p, ipc_secret)) for i, p in enumerate(ports)]
+    router = ShardRouter([f"http://127.0.0.1:{p}{WORKER_PATH}" for p in ports], ipc_secret)
+    bot = Bot(token, base_url=base_url) if base_url else Bot(token)
+
+    for process in processes:
+        process.start()
+    await router.start()
+    await bot.initialize()
+    server = None
+    poller = None
+    try:
+        if mode == "webhook":
+            secret_token = secret_token or secrets.token_urlsafe(32)
+            server = WebhookServer(router.route, secret_token, allowed_updates, path=path, listen=listen, port=port)
+            await server.start()
+            await bot.set_webhook(url=webhook_url, allowed_updates=list(allowed_updates), secret_token=secret_token)
+        else:
+            poller = asyncio.create_task(poll_into(bot, router.route, allowed_updates, stop_event))
+        logger.info(f"Ingress ({mode}) routing to {workers} workers on ports {ports[0]}-{ports[-1]}")
+        await stop_event.wait()
+    finally:
+        if poller:
+            poller.cancel()
+            try:
+                await poller
+            except asyncio.CancelledError:
+                pass
+        if server:
+            await server.stop()
+        await router.stop()
+        logger.info(f"Ingress delivery per shard: {router.stats()}")
+        await asyncio.gather(*(process.stop() for process in processes))
+        await bot.shutdown()
+
+
+def run_sharded(token: str, workers: int, command, allowed_updates, **kwargs):
+    """Blocking entry point used by ``main()`` when BOT_WORKERS > 0"""
+    async def runner():
+        stop_event = asyncio.Event()
+        install_stop_signals(stop_event)
+        await serve_sharded(token, workers, command, allowed_updates, stop_event=stop_event, **kwargs)
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        logger.info("Sharded bot stopped")
@@ -0,0 +1,107 @@
+# bot/update_processor.py
+# Concurrent update processing that keeps each user's updates in order
+import asyncio
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# Base-class semaphore size. Waiting for a user's turn must not hold a global slot,
+# so the real limit is applied in do_process_update once the user lock is taken.
+_UNBOUNDED = 1 << 30
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Process updates of different users concurrently, one at a time per user.
+
+    Updates are serialised per ``effective_user`` so ConversationHandler states and
+    ``context.user_data`` flags always see a user's messages in arrival order. At most
+    ``max_concurrent`` handlers run at once across all users. Updates without a user
+    (e.g. channel posts) only count against the global limit. Inline queries are not
+    ordered: they touch no per-user state, and most of their time is spent in the
+    keystroke debounce, which must not hold up the user's next query. They have a
+    limit of their own (``max_inline``, default ``max_concurrent``) so a burst of
+    keystrokes can neither run unbounded nor take the slots other updates need.
+    """
+
+    def __init__(self, max_concurrent: int = 32, max_inline: int = None):
+        super().__init__(_UNBOUNDED)
+        max_inline = max_concurrent if max_inline is None else max_inline
+        if max_concurrent < 1 or max_inline < 1:
+            raise ValueError("`max_concurrent` and `max_inline` must be positive integers!")
+        self.max_concurrent = max_concurrent
+        self.max_inline = max_inline
+        self._limit = asyncio.BoundedSemaphore(max_concurrent)
+        self._inline_limit = asyncio.BoundedSemaphore(max_inline)
+        self._user_locks = {}
+        self._waiters = {}
+        # Queue wait statistics (seconds), from hand-off to handler start
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.active = 0
+
+    @staticmethod
+    def ordering_key(update: object):
+        if isinstance(update, Update) and update.effective_user:
+            return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        queued_at = time.monotonic()
+        if isinstance(update, Update) and update.inline_query:
+            async with self._inline_limit:
+                await self._run(coroutine, queued_at)
+            return
+        key = self.ordering_key(update)
+        if key is None:
+            async with self._limit:
+                await self._run(coroutine, queued_at)
+            return
+
+        # asyncio.Lock wakes waiters in FIFO order, which preserves arrival order per user
+        lock = self._user_locks.get(key)
+        if lock is None:
+            lock = self._user_locks[key] = asyncio.Lock()
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                async with self._limit:
+                    await self._run(coroutine, queued_at)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                # Drop idle users so the lock table does not grow without bound
+                del self._waiters[key]
+                del self._user_locks[key]
+
+    async def _run(self, coroutine, queued_at: float) -> None:
+        wait = time.monotonic() - queued_at
+        self.processed += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+        self.active += 1
+        try:
+            await coroutine
+        finally:
+            self.active -= 1
+
+    def stats(self) -> dict:
+        """Snapshot of queue wait times and current load"""
+        return {
+            "processed": self.processed,
+            "avg_wait_ms": (self.total_wait / self.processed * 1000) if self.processed else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "active": self.active,
+            "waiting_users": len(self._waiters),
+        }
+
+    async def initialize(self) -> None:
+        """Nothing to allocate; locks are created lazily per user."""
+
+    async def shutdown(self) -> None:
+        logger.info(f"Update processor stats: {self.stats()}")
@@ -0,0 +1,283 @@
+# bot/user_store.py
+# Durable per-user state: in-memory hot layer over a WAL-mode SQLite file
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cached marker for users known to have no row, so misses stay in memory too
+_ABSENT = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_state (
+    namespace TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, user_id)
+) WITHOUT ROWID
+"""
+
+UPSERT = (
+    "INSERT INTO user_state (namespace, user_id, value, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (namespace, user_id) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at"
+)
+DELETE = "DELETE FROM user_state WHERE namespace = ? AND user_id = ?"
+SELECT = "SELECT value FROM user_state WHERE namespace = ? AND user_id = ?"
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class UserTable:
+    """Dict-like view of one namespace (``languages``, ``cvs``, ...) keyed by user id.
+
+    Hits are served from a plain dict; a miss reads the row once and caches the
+    result (including "no row"). Assignments update memory immediately and are
+    written behind by the store. Values are JSON; mutate a copy and assign it back
+    (``table[uid] = value``) so the change is marked dirty. Entries that are dirty,
+    or drained into a flush that has not committed yet, are never evicted: the
+    database does not have their value yet.
+    """
+
+    __slots__ = ("store", "name", "_hot", "_dirty", "_inflight")
+
+    def __init__(self, store, name: str):
+        self.store = store
+        self.name = name
+        self._hot = {}
+        self._dirty = set()
+        self._inflight = set()  # drained, waiting for the flush to commit
+
+    def get(self, user_id, default=None):
+        try:
+            value = self._hot[user_id]
+        except KeyError:
+            value = self._read_through(user_id)
+        return default if value is _ABSENT else value
+
+    def __getitem__(self, user_id):
+        value = self.get(user_id, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(user_id)
+        return value
+
+    def __contains__(self, user_id) -> bool:
+        return self.get(user_id, _ABSENT) is not _ABSENT
+
+    def __setitem__(self, user_id, value):
+        self._hot[user_id] = value
+        self._mark(user_id)
+
+    def __delitem__(self, user_id):
+        if user_id not in self:
+            raise KeyError(user_id)
+        self._hot[user_id] = _ABSENT
+        self._mark(user_id)
+
+    def pop(self, user_id, default=None):
+        value = self.get(user_id, _ABSENT)
+        if value is _ABSENT:
+            return default
+        self._hot[user_id] = _ABSENT
+        self._mark(user_id)
+        return value
+
+    def _mark(self, user_id):
+        if user_id not in self._dirty:
+            self._dirty.add(user_id)
+            self.store._note_dirty()
+
+    def _read_through(self, user_id):
+        value = self.store._load(self.name, user_id)
+        self._hot[user_id] = value
+        if len(self._hot) > self.store.max_hot:
+            self._evict()
+        return value
+
+    def _evict(self):
+        """Drop the oldest clean entries (a tenth of the capacity)"""
+        target = max(1, self.store.max_hot // 10)
+        victims = []
+        for user_id in self._hot:
+            if user_id not in self._dirty and user_id not in self._inflight:
+                victims.append(user_id)
+                if len(victims) >= target:
+                    break
+        for user_id in victims:
+            del self._hot[user_id]
+
+    def _drain(self, now: float):
+        """Take the dirty set as (upserts, deletes) rows"""
+        upserts, deletes = [], []
+        for user_id in self._dirty:
+            value = self._hot.get(user_id, _ABSENT)
+            if value is _ABSENT:
+                deletes.append((self.name, user_id))
+            else:
+                upserts.append((self.name, user_id, json.dumps(value), now))
+        dirty, self._dirty = self._dirty, set()
+        self._inflight |= dirty
+        return dirty, upserts, deletes
+
+    def _settle(self, dirty):
+        """The flush that took ``dirty`` has committed (or put them back on the dirty set)"""
+        self._inflight -= dirty
+
+
+class UserStore:
+    """Owner of the SQLite file and the write-behind flusher.
+
+    Dirty entries are flushed in one transaction every ``flush_interval`` seconds,
+    or sooner once ``max_pending`` entries are waiting, and on :meth:`stop`. Reads
+    use their own connection on the event loop; flushes run in a worker thread on
+    a second connection (WAL lets both proceed at once).
+    """
+
+    def __init__(self, path: str, flush_interval: float = 2.0, max_pending: int = 500,
+                 max_hot: int = 100000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_hot = max_hot
+        self._tables = {}
+        self._pending = 0
+        self._reader = None
+        self._writer = None
+        self._flush_lock = None
+        self._flush_now = None
+        self._task = None
+        self.loads = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def table(self, name: str) -> UserTable:
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = UserTable(self, name)
+        return table
+
+    def open(self):
+        """Open the database; usable without an event loop (reads and flush_sync)"""
+        if self._reader is not None:
+            return
+        self._writer = connect(self.path)
+        self._writer.execute(SCHEMA)
+        self._reader = connect(self.path)
+
+    def _load(self, name: str, user_id):
+        if self._reader is None:
+            raise RuntimeError("User store is not started")
+        self.loads += 1
+        row = self._reader.execute(SELECT, (name, user_id)).fetchone()
+        return json.loads(row[0]) if row else _ABSENT
+
+    def _note_dirty(self):
+        self._pending += 1
+        if self._pending >= self.max_pending and self._flush_now is not None:
+            self._flush_now.set()
+
+    def _collect(self):
+        now = time.time()
+        taken, upserts, deletes = [], [], []
+        for table in self._tables.values():
+            if table._dirty:
+                dirty, table_upserts, table_deletes = table._drain(now)
+                taken.append((table, dirty))
+                upserts += table_upserts
+                deletes += table_deletes
+        self._pending = 0
+        return taken, upserts, deletes
+
+    def _write(self, upserts, deletes):
+        with self._writer:
+            self._writer.execute("BEGIN")
+            if upserts:
+                self._writer.executemany(UPSERT, upserts)
+            if deletes:
+                self._writer.executemany(DELETE, deletes)
+
+    def _restore(self, taken):
+        """Put entries back on the dirty sets after a failed write"""
+        for table, dirty in taken:
+            for user_id in dirty:
+                table._mark(user_id)
+
+    def _settle(self, taken):
+        for table, dirty in taken:
+            table._settle(dirty)
+
+    async def flush(self):
+        async with self._flush_lock:
+            taken, upserts, deletes = self._collect()
+            if not taken:
+                return
+            try:
+                await asyncio.to_thread(self._write, upserts, deletes)
+            except sqlite3.Error as e:
+                logger.error(f"User state flush failed, will retry: {e}")
+                self._restore(taken)
+                return
+            finally:
+                self._settle(taken)
+            self.flushes += 1
+            self.rows_written += len(upserts) + len(deletes)
+
+    def flush_sync(self):
+        """Flush on the calling thread (benchmarks, shutdown without a loop)"""
+        taken, upserts, deletes = self._collect()
+        if taken:
+            try:
+                self._write(upserts, deletes)
+            finally:
+                self._settle(taken)
+            self.flushes += 1
+            self.rows_written += len(upserts) + len(deletes)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def start(self):
+        self.open()
+        self._flush_lock = asyncio.Lock()
+        self._flush_now = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._reader is None:
+            return
+        await self.flush()
+        self._reader.close()
+        self._writer.close()
+        self._reader = self._writer = None
+        self._flush_now = None
+        logger.info(f"User store closed: {self.rows_written} rows in {self.flushes} flushes, {self.loads} reads")
+
+    def stats(self) -> dict:
+        return {
+            "cached": {name: len(table._hot) for name, table in self._tables.items()},
+            "pending": sum(len(table._dirty) for table in self._tables.values()),
+            "loads": self.loads,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+        }
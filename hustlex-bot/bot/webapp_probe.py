@@ -0,0 +1,68 @@
+# bot/webapp_probe.py
+# Background reachability prober for the WebApp pages shown in the menu
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReachabilityProber:
+    """Keeps an up/down flag per URL fresh so handlers can read it in O(1).
+
+    ``check`` is an ``async (url) -> bool`` probe. Every URL starts out
+    reachable, and its state only flips after ``fail_threshold`` consecutive
+    failures (or ``recover_threshold`` consecutive successes), so a single slow
+    response from the host, even the very first one, does not hide the menu.
+    """
+
+    def __init__(self, urls, check, interval: float = 60, fail_threshold: int = 3,
+                 recover_threshold: int = 2):
+        self.urls = list(urls)
+        self.check = check
+        self.interval = interval
+        self.fail_threshold = fail_threshold
+        self.recover_threshold = recover_threshold
+        self._state = {}
+        self._streak = {}
+        self._task = None
+
+    def is_reachable(self, url: str) -> bool:
+        # Unknown URLs (not probed yet) are assumed reachable
+        return self._state.get(url, True)
+
+    def record(self, url: str, ok: bool):
+        current = self.is_reachable(url)
+        if ok == current:
+            self._streak[url] = 0
+            return
+        self._streak[url] = self._streak.get(url, 0) + 1
+        threshold = self.recover_threshold if ok else self.fail_threshold
+        if self._streak[url] >= threshold:
+            self._state[url] = ok
+            self._streak[url] = 0
+            if ok:
+                logger.info(f"WebApp URL {url} is reachable again")
+            else:
+                logger.error(f"WebApp URL {url} marked unreachable after {threshold} failed probes")
+
+    async def probe_once(self):
+        results = await asyncio.gather(*(self.check(url) for url in self.urls), return_exceptions=True)
+        for url, result in zip(self.urls, results):
+            self.record(url, result is True)
+
+    async def _probe_loop(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,154 @@
+# bot/webhook.py
+# Webhook ingress for the bot (alternative to Application.run_polling)
+import asyncio
+import hmac
+import json
+import logging
+import secrets
+import signal
+
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """aiohttp server that accepts Telegram updates and hands them to a callback.
+
+    Requests without the expected secret token are rejected with 403. Updates whose
+    type is not in ``allowed_updates`` are acknowledged and dropped, so Telegram does
+    not retry them and they never reach the Application.
+    """
+
+    def __init__(self, on_update, secret_token: str, allowed_updates, path: str = "/telegram",
+                 listen: str = "0.0.0.0", port: int = 8443):
+        self.on_update = on_update
+        self.secret_token = secret_token
+        self.allowed_updates = frozenset(allowed_updates)
+        self.path = path
+        self.listen = listen
+        self.port = port
+        self._runner = None
+        self._site = None
+
+    def authorized(self, request: web.Request) -> bool:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            logger.warning(f"Rejected webhook request from {request.remote}: bad secret token")
+            return False
+        return True
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not self.authorized(request):
+            return web.Response(status=403)
+
+        try:
+            data = json.loads(await request.read())
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(data, dict):
+            return web.Response(status=400)
+
+        if not self.allowed_updates.intersection(data):
+            logger.debug(f"Dropping update {data.get('update_id')} of unhandled type")
+            return web.Response()
+
+        await self.on_update(data)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get("/", self.handle_health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        self._site = web.TCPSite(self._runner, self.listen, self.port)
+        await self._site.start()
+        # Pick up the real port when started with port=0
+        self.port = self._site._server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook server listening on {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+            self._site = None
+
+
+def application_sink(application):
+    """Return an ``on_update`` callback that puts updates straight onto the Application queue."""
+    async def put(data: dict):
+        await application.update_queue.put(Update.de_json(data, application.bot))
+    return put
+
+
+async def serve_application(application, url: str, allowed_updates, secret_token: str = None,
+                            path: str = "/telegram", listen: str = "0.0.0.0", port: int = 8443,
+                            stop_event: asyncio.Event = None, ready: asyncio.Future = None,
+                            server_factory=WebhookServer):
+    """Run ``application`` behind a webhook until ``stop_event`` is set.
+
+    Mirrors the lifecycle of ``Application.run_polling`` (post_init, post_stop and
+    post_shutdown are called) but registers the webhook with Telegram instead of polling.
+    With ``url=None`` no webhook is registered (sharded workers are fed by the ingress).
+    ``ready`` is resolved with the running ``WebhookServer`` once updates are accepted.
+    """
+    secret_token = secret_token or secrets.token_urlsafe(32)
+    stop_event = stop_event or asyncio.Event()
+    server = server_factory(application_sink(application), secret_token, allowed_updates,
+                            path=path, listen=listen, port=port)
+
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await server.start()
+        if url is not None:
+            await application.bot.set_webhook(
+                url=url,
+                allowed_updates=list(allowed_updates),
+                secret_token=secret_token,
+            )
+        await application.start()
+        if ready:
+            ready.set_result(server)
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def install_stop_signals(stop_event: asyncio.Event):
+    """Set ``stop_event`` on SIGINT/SIGTERM where the event loop supports it"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers
+            pass
+
+
+def run_webhook(application, url: str, allowed_updates, **kwargs):
+    """Blocking entry point used by ``main()`` when BOT_MODE=webhook."""
+    async def runner():
+        stop_event = asyncio.Event()
+        install_stop_signals(stop_event)
+        await serve_application(application, url, allowed_updates, stop_event=stop_event, **kwargs)
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        logger.info("Webhook server stopped")
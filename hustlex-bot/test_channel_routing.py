@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Channel routing: RoutingTable rule matching and fan_out retries across channels
+"""
+
+import os
+import sys
+import asyncio
+
+from telegram.error import BadRequest, Forbidden, NetworkError, TimedOut
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.channel_routing import RoutingTable, fan_out, normalize
+
+RULES = [
+    {"job_type": ["Freelance", "Part-time"], "channels": ["-1001", "@gigs"]},
+    {"work_location": "Remote", "client_type": "Private", "channels": "-1002"},
+    {"work_location": "remote", "channels": ["@gigs"]},
+]
+
+
+def test_rules_match_on_normalized_values():
+    """A job goes to the union of its matching rules' channels, in rule order, else to the defaults"""
+    routing = RoutingTable(RULES, default_channels=["-1000"])
+    assert normalize(" Part_TIME ") == "part time"
+    assert routing.channels_for({"job_type": "part-time", "work_location": "Addis Ababa"}) == ("-1001", "@gigs")
+    assert routing.channels_for({"job_type": "Freelance", "work_location": "REMOTE", "client_type": "private"}) == (
+        "-1001", "@gigs", "-1002")
+    assert routing.channels_for({"work_location": "Remote", "client_type": "Company"}) == ("@gigs",)
+    assert routing.channels_for({"job_type": "Full-time"}) == ("-1000",)
+    assert routing.all_channels() == ("-1000", "-1001", "@gigs", "-1002")
+
+
+def test_bad_rules():
+    """Unknown fields or a rule without channels are rejected; from_json falls back to the defaults"""
+    for rule in ({"salary": "1", "channels": ["-1"]}, {"job_type": "Contract"}):
+        try:
+            RoutingTable([rule])
+            assert False, f"{rule} accepted"
+        except ValueError:
+            pass
+    routing = RoutingTable.from_json('[{"job_type": "Contract"}]', default_channels=["-1000"])
+    assert routing.channels_for({"job_type": "Contract"}) == ("-1000",)
+    assert RoutingTable.from_json("not json", ["-1000"]).rules == []
+    assert RoutingTable.from_json(None, ["-1000"]).channels_for({}) == ("-1000",)
+
+
+def test_fan_out_retries_only_transient_failures():
+    """Posted channels are never sent again; lasting errors and timeouts are not retried"""
+    async def check():
+        calls = []
+        errors = {"-1": [], "-2": [NetworkError("bad gateway")], "-3": [BadRequest("Chat not found")],
+                  "-4": [Forbidden("not an admin")], "-5": [TimedOut()], "-6": [NetworkError("down")] * 5}
+
+        async def post(channel_id):
+            calls.append(channel_id)
+            if errors[channel_id]:
+                raise errors[channel_id].pop(0)
+            return f"message in {channel_id}"
+
+        results = await fan_out(list(errors), post, attempts=3, retry_delay=0.01)
+        assert [channel for channel, result in results.items() if result.ok] == ["-1", "-2"]
+        assert {channel: result.attempts for channel, result in results.items()} == {
+            "-1": 1, "-2": 2, "-3": 1, "-4": 1, "-5": 1, "-6": 3}
+        assert results["-5"].uncertain and not results["-6"].uncertain
+        assert calls.count("-1") == 1
+
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    for test in (test_rules_match_on_normalized_values, test_bad_rules, test_fan_out_retries_only_transient_failures):
+        test()
+        print(f"✅ {test.__name__}")
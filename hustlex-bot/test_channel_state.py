@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Channel state cache: transient failures are not cached, LRU bound, my_chat_member updates
+"""
+
+import os
+import sys
+import asyncio
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Chat, ChatMemberAdministrator, ChatMemberLeft, ChatMemberUpdated, User
+from telegram.error import BadRequest, TimedOut
+
+from bot.channel_state import ChannelStateCache
+
+BOT_USER = User(123456, "HustleX", is_bot=True)
+
+
+class FakeBot:
+    """get_chat / get_chat_member answering from queues of results (exceptions are raised)"""
+
+    id = BOT_USER.id
+
+    def __init__(self, chats=(), members=()):
+        self.chats = list(chats)
+        self.members = list(members)
+        self.calls = 0
+
+    async def get_chat(self, chat_id):
+        self.calls += 1
+        result = self.chats.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def get_chat_member(self, chat_id, user_id):
+        result = self.members.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def admin(can_post=True):
+    return ChatMemberAdministrator(
+        BOT_USER, can_be_edited=False, is_anonymous=False, can_manage_chat=True, can_delete_messages=True,
+        can_manage_video_chats=True, can_restrict_members=True, can_promote_members=False,
+        can_change_info=True, can_invite_users=True, can_post_messages=can_post)
+
+
+def channel(chat_id=-100111, username=None):
+    return Chat(chat_id, Chat.CHANNEL, title="Jobs", username=username)
+
+
+def test_timeout_is_not_cached():
+    """A get_chat timeout is reported with the state and checked again on the next call"""
+    cache = ChannelStateCache()
+    bot = FakeBot(chats=[TimedOut(), channel()], members=[admin()])
+
+    async def check():
+        state = await cache.ensure(bot, "-100111")
+        assert state.error is not None and cache.get("-100111") is None
+        state = await cache.ensure(bot, "-100111")
+        assert state.error is None and state.valid and state.can_post
+        assert await cache.ensure(bot, "-100111") is state and bot.calls == 2
+
+    asyncio.run(check())
+
+
+def test_member_check_timeout_is_not_cached():
+    cache = ChannelStateCache()
+    bot = FakeBot(chats=[channel(), channel()], members=[TimedOut(), admin(can_post=False)])
+
+    async def check():
+        state = await cache.ensure(bot, "-100111")
+        assert state.valid and state.error is not None and cache.get("-100111") is None
+        state = await cache.ensure(bot, "-100111")
+        assert state.error is None and not state.can_post and cache.get("-100111") is state
+
+    asyncio.run(check())
+
+
+def test_bad_channel_is_cached_until_invalidated():
+    cache = ChannelStateCache()
+    bot = FakeBot(chats=[BadRequest("Chat not found"), channel(username="hustlex_jobs")], members=[admin()])
+
+    async def check():
+        assert not (await cache.ensure(bot, "-100111")).valid
+        assert not (await cache.ensure(bot, "-100111")).valid and bot.calls == 1
+        cache.invalidate("-100111")
+        state = await cache.ensure(bot, "-100111")
+        assert state.valid and cache.get("@hustlex_jobs") is state
+        cache.invalidate("-100111")
+        assert cache.get("@hustlex_jobs") is None
+
+    asyncio.run(check())
+
+
+def test_cache_is_bounded_lru():
+    cache = ChannelStateCache(max_size=3)
+    bot = FakeBot(chats=[channel(-n) for n in range(1, 5)], members=[admin()] * 4)
+
+    async def check():
+        for n in (1, 2, 3):
+            await cache.ensure(bot, str(-n))
+        cache.get("-1")                 # recently used: survives
+        await cache.ensure(bot, "-4")
+        assert cache.get("-1") and cache.get("-2") is None and cache.get("-3") and cache.get("-4")
+
+    asyncio.run(check())
+
+
+def test_member_updates_patch_the_entry():
+    cache = ChannelStateCache()
+    old, new = admin(), ChatMemberLeft(BOT_USER)
+    cache.apply_member_update(ChatMemberUpdated(channel(username="hustlex_jobs"), BOT_USER, 0, old, admin()))
+    assert cache.get("-100111").can_post and cache.get("@hustlex_jobs") is cache.get("-100111")
+    cache.apply_member_update(ChatMemberUpdated(channel(), BOT_USER, 0, old, new))
+    assert not cache.get("-100111").valid
+    cache.apply_member_update(ChatMemberUpdated(Chat(42, Chat.PRIVATE), BOT_USER, 0, old, new))
+    assert cache.get("42") is None
+
+
+if __name__ == "__main__":
+    for test in (test_timeout_is_not_cached, test_member_check_timeout_is_not_cached,
+                 test_bad_channel_is_cached_until_invalidated, test_cache_is_bounded_lru,
+                 test_member_updates_patch_the_entry):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+HttpClientPool: one shared session that reuses connections per host,
+with per-host reuse counters
+"""
+
+import os
+import sys
+import asyncio
+
+from aiohttp import web
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.http_client import HttpClientPool
+
+
+async def start_server():
+    async def ok(request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", ok)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+
+def test_connections_are_reused_and_counted():
+    """Sequential requests to one host share a kept-alive connection"""
+    async def check():
+        runner, url = await start_server()
+        pool = HttpClientPool()
+        await pool.start()
+        for _ in range(5):
+            async with pool.session.get(url) as response:
+                assert await response.text() == "ok"
+        assert pool.stats() == {"127.0.0.1": {"new": 1, "reused": 4, "reuse_ratio": 0.8}}
+        await pool.close()
+        await runner.cleanup()
+
+    asyncio.run(check())
+
+
+def test_session_only_between_start_and_close():
+    """The session is refused before start() and after close(); start() twice keeps one session"""
+    async def check():
+        pool = HttpClientPool()
+        try:
+            pool.session
+            assert False, "session available before start()"
+        except RuntimeError:
+            pass
+        await pool.start()
+        session = pool.session
+        await pool.start()
+        assert pool.session is session
+        await pool.close()
+        try:
+            pool.session
+            assert False, "session available after close()"
+        except RuntimeError:
+            pass
+
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    for test in (test_connections_are_reused_and_counted, test_session_only_between_start_and_close):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+SendScheduler: per-chat and global pacing, RetryAfter per chat vs bot-wide,
+priorities between chats and order within a chat, draining on stop
+"""
+
+import os
+import sys
+import asyncio
+import time
+
+from telegram.error import RetryAfter
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.send_scheduler import SendScheduler, BULK, INTERACTIVE
+
+
+class FakeSends:
+    """Records (chat, text, time) for every send; ``floods`` lists RetryAfter seconds per chat"""
+
+    def __init__(self):
+        self.sent = []
+        self.started = []
+        self.floods = {}
+        self.t0 = time.monotonic()
+
+    def send(self, chat_id, text, delay=0.0):
+        async def call():
+            self.started.append(text)
+            if self.floods.get(chat_id):
+                raise RetryAfter(self.floods[chat_id].pop(0))
+            await asyncio.sleep(delay)
+            self.sent.append((chat_id, text, time.monotonic() - self.t0))
+            return text
+        return call
+
+    def times(self, chat_id):
+        return [t for chat, _, t in self.sent if chat == chat_id]
+
+
+def test_each_chat_is_paced_by_its_bucket():
+    """Private chats get private_rate, groups a burst then group_rate; the global bucket caps the total"""
+    async def check():
+        fake = FakeSends()
+        scheduler = SendScheduler(global_rate=100, private_rate=10, group_rate=5, group_burst=2)
+        await scheduler.start()
+        futures = [scheduler.submit(42, fake.send(42, f"p{n}")) for n in range(4)]
+        futures += [scheduler.submit(-100, fake.send(-100, f"g{n}")) for n in range(4)]
+        assert await asyncio.gather(*futures) == ["p0", "p1", "p2", "p3", "g0", "g1", "g2", "g3"]
+        private, group = fake.times(42), fake.times(-100)
+        assert all(b - a >= 0.08 for a, b in zip(private, private[1:]))
+        assert group[1] - group[0] < 0.05 and all(b - a >= 0.17 for a, b in zip(group[1:], group[2:]))
+        await scheduler.stop()
+
+        fake = FakeSends()
+        scheduler = SendScheduler(global_rate=20)
+        await scheduler.start()
+        await asyncio.gather(*[scheduler.submit(chat, fake.send(chat, "x")) for chat in range(30)])
+        # 20 go out at once, the other 10 at 20 per second
+        assert fake.sent[-1][2] >= 0.45
+        await scheduler.stop()
+
+    asyncio.run(check())
+
+
+def test_retry_after_pauses_only_that_chat():
+    """One chat's flood wait delays that chat and is retried; other chats keep sending"""
+    async def check():
+        fake = FakeSends()
+        fake.floods[1] = [0.3]
+        scheduler = SendScheduler(private_rate=100, flood_chats=2)
+        await scheduler.start()
+        first = scheduler.submit(1, fake.send(1, "a"))
+        await asyncio.sleep(0.05)
+        other = scheduler.submit(2, fake.send(2, "b"))
+        assert await other == "b" and not first.done()
+        assert await first == "a"
+        assert fake.times(1)[0] >= 0.3 and fake.times(2)[0] < 0.2 and scheduler.retried == 1
+        await scheduler.stop()
+
+    asyncio.run(check())
+
+
+def test_retry_after_in_many_chats_pauses_every_chat():
+    """flood_chats chats hitting a flood wait together pause the global bucket"""
+    async def check():
+        fake = FakeSends()
+        fake.floods = {1: [0.3], 2: [0.3]}
+        scheduler = SendScheduler(private_rate=100, flood_chats=2)
+        await scheduler.start()
+        floods = [scheduler.submit(1, fake.send(1, "a")), scheduler.submit(2, fake.send(2, "b"))]
+        await asyncio.sleep(0.05)
+        assert await scheduler.submit(3, fake.send(3, "c")) == "c"
+        assert fake.times(3)[0] >= 0.3
+        await asyncio.gather(*floods)
+        await scheduler.stop()
+
+    asyncio.run(check())
+
+
+def test_retry_after_gives_up_after_max_retries():
+    """A chat that keeps hitting flood waits fails the send after max_retries"""
+    async def check():
+        fake = FakeSends()
+        fake.floods[1] = [0.01, 0.01, 0.01]
+        scheduler = SendScheduler(private_rate=100, max_retries=2)
+        await scheduler.start()
+        try:
+            await scheduler.submit(1, fake.send(1, "a"))
+            assert False, "RetryAfter expected"
+        except RetryAfter:
+            pass
+        assert fake.started == ["a", "a", "a"]
+        await scheduler.stop()
+
+    asyncio.run(check())
+
+
+def test_interactive_chat_goes_first_but_chat_order_is_kept():
+    """A chat with an INTERACTIVE item overtakes BULK-only chats; inside a chat, submit order wins"""
+    async def check():
+        fake = FakeSends()
+        scheduler = SendScheduler(private_rate=100)
+        futures = [scheduler.submit(1, fake.send(1, "bulk 1")),
+                   scheduler.submit(2, fake.send(2, "bulk 2")),
+                   scheduler.submit(3, fake.send(3, "bulk 3a")),
+                   scheduler.submit(3, fake.send(3, "reply 3b"), priority=INTERACTIVE)]
+        await scheduler.start()
+        await asyncio.gather(*futures)
+        assert fake.started[:3] == ["bulk 3a", "bulk 1", "bulk 2"]
+        assert fake.started.index("bulk 3a") < fake.started.index("reply 3b")
+        await scheduler.stop()
+
+    asyncio.run(check())
+
+
+def test_stop_waits_for_sends_in_flight():
+    """stop() lets running sends finish within the drain time and fails the ones that do not"""
+    async def check():
+        fake = FakeSends()
+        scheduler = SendScheduler()
+        await scheduler.start()
+        quick = scheduler.submit(1, fake.send(1, "quick", delay=0.2))
+        stuck = scheduler.submit(2, fake.send(2, "stuck", delay=30))
+        await asyncio.sleep(0.05)
+        await scheduler.stop(drain_timeout=0.5)
+        assert quick.result() == "quick"
+        assert isinstance(stuck.exception(), RuntimeError)
+        assert not scheduler._deliveries
+
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    for test in (test_each_chat_is_paced_by_its_bucket, test_retry_after_pauses_only_that_chat,
+                 test_retry_after_in_many_chats_pauses_every_chat, test_retry_after_gives_up_after_max_retries,
+                 test_interactive_chat_goes_first_but_chat_order_is_kept, test_stop_waits_for_sends_in_flight):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Sharded mode: route_key/shard_for routing, ordered delivery per shard, per-update
+acknowledgement and duplicate skipping between ShardLink and BatchServer
+"""
+
+import os
+import sys
+import asyncio
+
+import aiohttp
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.sharding import BatchServer, ShardLink, ShardRouter, route_key, shard_for, WORKER_PATH
+
+SECRET = "ipc-secret"
+
+
+def test_route_key_uses_the_sender():
+    """The sender decides the shard; without one, the chat does; neither means shard of 0"""
+    message = {"update_id": 1, "message": {"from": {"id": 42}, "chat": {"id": -100}}}
+    callback = {"update_id": 2, "callback_query": {"from": {"id": 43}, "message": {"chat": {"id": 7}}}}
+    inline = {"update_id": 3, "inline_query": {"from": {"id": 44}, "query": "py"}}
+    channel_post = {"update_id": 4, "channel_post": {"chat": {"id": -1001}}}
+    member = {"update_id": 5, "my_chat_member": {"from": {"id": 45}, "chat": {"id": -1002}}}
+    assert [route_key(u) for u in (message, callback, inline, channel_post, member)] == [42, 43, 44, -1001, 45]
+    assert route_key({"update_id": 6}) == 0
+    assert [shard_for(user_id, 4) for user_id in (42, 43, 44, 45)] == [2, 3, 0, 1]
+    assert shard_for(-1001, 4) == -1001 % 4
+
+
+async def start_worker(on_update):
+    server = BatchServer(on_update, SECRET, ["message"], path=WORKER_PATH, listen="127.0.0.1", port=0)
+    await server.start()
+    return server, f"http://127.0.0.1:{server.port}{WORKER_PATH}"
+
+
+def updates(user_ids, start=1):
+    return [{"update_id": start + n, "message": {"from": {"id": user_id}, "chat": {"id": user_id}}}
+            for n, user_id in enumerate(user_ids)]
+
+
+def test_router_delivers_each_shard_in_order():
+    """Updates of many users reach the worker of their shard, in arrival order"""
+    async def check():
+        received = [[], []]
+        servers, urls = [], []
+        for shard in range(2):
+            async def on_update(data, shard=shard):
+                await asyncio.sleep(0)
+                received[shard].append(data["update_id"])
+            server, url = await start_worker(on_update)
+            servers.append(server)
+            urls.append(url)
+        router = ShardRouter(urls, SECRET, max_batch=7)
+        await router.start()
+        sent = updates([n % 5 for n in range(200)])
+        for data in sent:
+            await router.route(data)
+        await router.stop()
+        for server in servers:
+            await server.stop()
+        for shard in range(2):
+            assert received[shard] == [u["update_id"] for u in sent if shard_for(route_key(u), 2) == shard]
+        assert sum(link.delivered for link in router.links) == 200
+
+    asyncio.run(check())
+
+
+def test_refused_update_resent_alone_and_duplicates_skipped():
+    """A failure mid-batch resends only the refused updates; a replayed batch is not handled twice"""
+    async def check():
+        handled, failures = [], {3: 2}
+
+        async def on_update(data):
+            if failures.get(data["update_id"]):
+                failures[data["update_id"]] -= 1
+                raise RuntimeError("queue closed")
+            handled.append(data["update_id"])
+
+        server, url = await start_worker(on_update)
+        async with aiohttp.ClientSession() as session:
+            link = ShardLink(0, url, SECRET)
+            link.start(session)
+            for data in updates([1] * 5):
+                await link.put(data)
+            await link.stop()
+            assert handled == [1, 2, 3, 4, 5] and link.retries == 1 and server.duplicates == 0
+
+            # Same batch again (its answer was lost): every update is skipped
+            async with session.post(url, json=updates([1] * 5), headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}) as response:
+                assert response.status == 200
+            assert handled == [1, 2, 3, 4, 5] and server.duplicates == 5
+        await server.stop()
+
+    asyncio.run(check())
+
+
+def test_refused_update_dropped_after_max_attempts_only():
+    """An update the worker keeps refusing is dropped after max_attempts; the ones after it still go"""
+    async def check():
+        handled = []
+
+        async def on_update(data):
+            if data["update_id"] == 2:
+                raise RuntimeError("cannot be parsed")
+            handled.append(data["update_id"])
+
+        server, url = await start_worker(on_update)
+        async with aiohttp.ClientSession() as session:
+            link = ShardLink(0, url, SECRET, max_attempts=3)
+            link.start(session)
+            for data in updates([1] * 4):
+                await link.put(data)
+            await link.stop()
+            assert handled == [1, 3, 4] and link.dropped == 1
+        await server.stop()
+
+    asyncio.run(check())
+
+
+def test_nothing_dropped_while_the_worker_is_down():
+    """Connection errors (worker restarting) never use up the attempts"""
+    async def check():
+        handled = []
+
+        async def on_update(data):
+            handled.append(data["update_id"])
+
+        # Reserve a port, then start the worker there only after many failed sends
+        probe, _ = await start_worker(on_update)
+        port = probe.port
+        await probe.stop()
+        async with aiohttp.ClientSession() as session:
+            link = ShardLink(0, f"http://127.0.0.1:{port}{WORKER_PATH}", SECRET, max_attempts=2)
+            link.start(session)
+            for data in updates([1] * 3):
+                await link.put(data)
+            while link.retries < 5:
+                await asyncio.sleep(0.05)
+            server = BatchServer(on_update, SECRET, ["message"], path=WORKER_PATH, listen="127.0.0.1", port=port)
+            await server.start()
+            await link.stop()
+            assert handled == [1, 2, 3] and link.dropped == 0
+        await server.stop()
+
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    for test in (test_route_key_uses_the_sender, test_router_delivers_each_shard_in_order,
+                 test_refused_update_resent_alone_and_duplicates_skipped,
+                 test_refused_update_dropped_after_max_attempts_only, test_nothing_dropped_while_the_worker_is_down):
+        test()
+        print(f"✅ {test.__name__}")
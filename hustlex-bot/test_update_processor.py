@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+PerUserUpdateProcessor: per-user order, the global limit and the separate inline query limit
+"""
+
+import os
+import sys
+import asyncio
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from telegram import Chat, InlineQuery, Message, Update, User
+
+from bot.update_processor import PerUserUpdateProcessor
+
+
+def message_update(update_id: int, user_id: int) -> Update:
+    user = User(user_id, "Tester", False)
+    return Update(update_id, message=Message(update_id, None, Chat(user_id, Chat.PRIVATE), from_user=user,
+                                             text=str(update_id)))
+
+
+def inline_update(update_id: int, user_id: int) -> Update:
+    return Update(update_id, inline_query=InlineQuery(str(update_id), User(user_id, "Tester", False), "q", ""))
+
+
+class Tracker:
+    """Slow handlers that record when they run and how many run at once"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.done = []
+
+    async def handler(self, label, delay: float = 0.02):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.active -= 1
+        self.done.append(label)
+
+
+def test_each_users_updates_run_in_order():
+    """Two users with slow handlers: each user's updates finish in arrival order, the users overlap"""
+    processor = PerUserUpdateProcessor(max_concurrent=8)
+    tracker = Tracker()
+
+    async def check():
+        tasks = []
+        for n in range(6):
+            # User 1's first update is the slowest; its later ones must still wait for it
+            delay = 0.1 if n == 0 else 0.01
+            tasks.append(asyncio.create_task(
+                processor.process_update(message_update(n, 1), tracker.handler(("a", n), delay))))
+            tasks.append(asyncio.create_task(
+                processor.process_update(message_update(100 + n, 2), tracker.handler(("b", n), 0.01))))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(check())
+    assert [n for user, n in tracker.done if user == "a"] == list(range(6))
+    assert [n for user, n in tracker.done if user == "b"] == list(range(6))
+    # User 2 was not held up by user 1's slow first update
+    assert tracker.done.index(("b", 5)) < tracker.done.index(("a", 0))
+    assert tracker.peak == 2
+    assert processor.stats()["waiting_users"] == 0 and not processor._user_locks
+
+
+def test_global_limit_caps_active_handlers():
+    """Many users at once: never more than max_concurrent handlers run"""
+    processor = PerUserUpdateProcessor(max_concurrent=4)
+    tracker = Tracker()
+
+    async def check():
+        await asyncio.gather(*(processor.process_update(message_update(n, n), tracker.handler(n))
+                               for n in range(1, 21)))
+
+    asyncio.run(check())
+    assert tracker.peak == 4 and len(tracker.done) == 20 and processor.stats()["processed"] == 20
+
+
+def test_inline_queries_are_limited_but_not_ordered():
+    """Inline queries of one user overlap, but never more than max_inline at once"""
+    processor = PerUserUpdateProcessor(max_concurrent=8, max_inline=3)
+    tracker = Tracker()
+
+    async def check():
+        await asyncio.gather(*(processor.process_update(inline_update(n, 7), tracker.handler(n))
+                               for n in range(10)))
+
+    asyncio.run(check())
+    assert tracker.peak == 3 and len(tracker.done) == 10
+
+
+if __name__ == "__main__":
+    for test in (test_each_users_updates_run_in_order, test_global_limit_caps_active_handlers,
+                 test_inline_queries_are_limited_but_not_ordered):
+        test()
+        print(f"✅ {test.__name__}")
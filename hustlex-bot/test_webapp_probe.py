@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ReachabilityProber: URLs start reachable and only flip after a streak of
+failed (or successful) probes
+"""
+
+import os
+import sys
+import asyncio
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bot.webapp_probe import ReachabilityProber
+
+URL = "https://example.com/app"
+
+
+def test_flips_only_after_a_streak():
+    """fail_threshold failures in a row hide a URL, recover_threshold successes bring it back"""
+    prober = ReachabilityProber([URL], None, fail_threshold=3, recover_threshold=2)
+    assert prober.is_reachable(URL) and prober.is_reachable("https://never.probed/")
+    for ok in (False, False, True, False, False):
+        prober.record(URL, ok)
+    assert prober.is_reachable(URL)
+    prober.record(URL, False)
+    assert not prober.is_reachable(URL)
+    prober.record(URL, True)
+    assert not prober.is_reachable(URL)
+    prober.record(URL, True)
+    assert prober.is_reachable(URL)
+
+
+def test_probe_once_counts_errors_as_failures():
+    """Probes run concurrently; an exception or a non-True answer is a failure"""
+    async def check():
+        answers = {"https://a/": True, "https://b/": False, "https://c/": RuntimeError("boom")}
+
+        async def probe(url):
+            if isinstance(answers[url], Exception):
+                raise answers[url]
+            return answers[url]
+
+        prober = ReachabilityProber(answers, probe, fail_threshold=1)
+        await prober.probe_once()
+        assert [prober.is_reachable(url) for url in answers] == [True, False, False]
+
+    asyncio.run(check())
+
+
+def test_background_loop_probes_until_stopped():
+    """The loop keeps probing every interval and stops with stop()"""
+    async def check():
+        probes = []
+
+        async def probe(url):
+            probes.append(url)
+            return False
+
+        prober = ReachabilityProber([URL], probe, interval=0.01, fail_threshold=3)
+        await prober.start()
+        await asyncio.sleep(0.2)
+        await prober.stop()
+        count = len(probes)
+        assert count >= 3 and not prober.is_reachable(URL)
+        await asyncio.sleep(0.05)
+        assert len(probes) == count
+
+    asyncio.run(check())
+
+
+if __name__ == "__main__":
+    for test in (test_flips_only_after_a_streak, test_probe_once_counts_errors_as_failures,
+                 test_background_loop_probes_until_stopped):
+        test()
+        print(f"✅ {test.__name__}")
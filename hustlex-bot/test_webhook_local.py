@@ -0,0 +1,942 @@
+#!/usr/bin/env python3
+"""
+Webhook ingress test against a local fake Bot API (no network access needed)
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import tempfile
+
+import aiohttp
+from aiohttp import web
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Keep user state and jobs from the scenarios out of the working directory
+_state_dir = tempfile.mkdtemp()
+os.environ.setdefault("USER_STATE_DB", os.path.join(_state_dir, "user_state.db"))
+os.environ.setdefault("JOBS_DB", os.path.join(_state_dir, "jobs.db"))
+os.environ.setdefault("CV_STORE_DIR", os.path.join(_state_dir, "cv"))
+# Bulk import is denied unless the user is listed; the scenarios run as user 42
+os.environ.setdefault("IMPORT_ALLOWED_USERS", "42")
+
+from bot.main import build_application, ALLOWED_UPDATES
+from bot.webhook import serve_application, SECRET_HEADER
+
+logger = logging.getLogger(__name__)
+
+FAKE_TOKEN = "123456:TEST-TOKEN"
+SECRET = "test-secret"
+
+
+class FakeBotAPI:
+    """Minimal Bot API stand-in that records every method call"""
+
+    def __init__(self):
+        self.calls = []
+        self.files = {}  # file_id -> bytes served by getFile + the file endpoint
+        self.profiles = []  # multipart fields of each POST /api/profile (files as bytes)
+        self.profile_failures = 0  # answer that many profile posts with 503 first
+        self.channel_failures = 0  # answer that many sendMessage calls to channels with 502 first
+        self.channel_stalls = 0  # post that many channel messages only after the client has timed out
+        self.channel_error = None  # (status, description) for every sendMessage to a channel
+        self.runner = None
+        self.port = None
+
+    async def handle(self, request):
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        self.calls.append((method, params))
+        if method == "sendMessage" and params["chat_id"].startswith("-") and self.channel_failures:
+            self.channel_failures -= 1
+            return web.json_response({"ok": False, "error_code": 502, "description": "Bad Gateway"}, status=502)
+        if method == "sendMessage" and params["chat_id"].startswith("-") and self.channel_error:
+            status, description = self.channel_error
+            return web.json_response({"ok": False, "error_code": status, "description": description}, status=status)
+        if method == "sendMessage" and params["chat_id"].startswith("-") and self.channel_stalls:
+            self.channel_stalls -= 1
+            await asyncio.sleep(6)  # past python-telegram-bot's 5 s read timeout
+        if method == "getMe":
+            result = {"id": 123456, "is_bot": True, "first_name": "HustleX", "username": "HustleXet_bot"}
+        elif method == "getChat":
+            result = {"id": int(params["chat_id"]), "type": "channel", "title": "HustleX Jobs"}
+        elif method == "getChatMember":
+            result = {"status": "administrator", "can_be_edited": False, "is_anonymous": False,
+                      "can_manage_chat": True, "can_delete_messages": True, "can_manage_video_chats": True,
+                      "can_restrict_members": True, "can_promote_members": False, "can_change_info": True,
+                      "can_invite_users": True, "can_post_messages": True,
+                      "user": {"id": 123456, "is_bot": True, "first_name": "HustleX"}}
+        elif method == "sendMessage":
+            result = {"message_id": len(self.calls), "date": int(time.time()),
+                      "chat": {"id": int(params["chat_id"]), "type": "private"},
+                      "text": params.get("text", "")}
+        elif method == "getFile":
+            result = {"file_id": params["file_id"], "file_unique_id": params["file_id"],
+                      "file_size": len(self.files[params["file_id"]]), "file_path": f"documents/{params['file_id']}"}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def download(self, request):
+        return web.Response(body=self.files[request.match_info["path"].rsplit("/", 1)[-1]])
+
+    async def profile(self, request):
+        fields = {}
+        async for part in await request.multipart():
+            fields[part.name] = await part.read() if part.filename else await part.text()
+        self.profiles.append(fields)
+        if self.profile_failures:
+            self.profile_failures -= 1
+            return web.json_response({"detail": "unavailable"}, status=503)
+        return web.json_response({"status": "success"})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_post("/api/profile", self.profile)
+        app.router.add_get("/file/bot{token}/{path:.+}", self.download)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+
+def text_update(update_id: int, text: str) -> dict:
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+
+def document_update(update_id: int, file_id: str, file_name: str, size: int) -> dict:
+    update = text_update(update_id, "")
+    del update["message"]["text"]
+    update["message"]["document"] = {"file_id": file_id, "file_unique_id": file_id,
+                                     "file_name": file_name, "file_size": size}
+    return update
+
+
+def start_update(update_id: int) -> dict:
+    return text_update(update_id, "/start")
+
+
+def callback_update(update_id: int, data: str) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": "1",
+            "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+            "data": data,
+            "message": {
+                "message_id": 7,
+                "date": int(time.time()),
+                "chat": {"id": 42, "type": "private"},
+                "from": {"id": 123456, "is_bot": True, "first_name": "HustleX"},
+                "text": "menu",
+            },
+        },
+    }
+
+
+async def run_scenario(check):
+    api = FakeBotAPI()
+    await api.start()
+    app = build_application(FAKE_TOKEN, base_url=f"http://127.0.0.1:{api.port}/bot")
+    stop_event = asyncio.Event()
+    ready = asyncio.get_running_loop().create_future()
+    serve = asyncio.create_task(serve_application(
+        app, "https://example.com/telegram", ALLOWED_UPDATES, secret_token=SECRET,
+        listen="127.0.0.1", port=0, stop_event=stop_event, ready=ready,
+    ))
+    try:
+        server = await asyncio.wait_for(ready, 10)
+        url = f"http://127.0.0.1:{server.port}{server.path}"
+        async with aiohttp.ClientSession() as session:
+            await check(api, session, url)
+    finally:
+        stop_event.set()
+        await serve
+        await api.stop()
+
+
+async def wait_for_call(api, method, timeout=5.0, count=1):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if api.methods().count(method) >= count:
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+def test_webhook_registered_with_secret_and_filter():
+    """setWebhook carries the secret token and the filtered allowed_updates"""
+    async def check(api, session, url):
+        params = dict(api.calls)["setWebhook"]
+        assert params["secret_token"] == SECRET
+        assert sorted(json.loads(params["allowed_updates"])) == sorted(ALLOWED_UPDATES)
+
+    asyncio.run(run_scenario(check))
+
+
+def test_webhook_rejects_bad_secret():
+    """Requests without the right secret never reach the Application"""
+    async def check(api, session, url):
+        async with session.post(url, json=start_update(1), headers={SECRET_HEADER: "wrong"}) as resp:
+            assert resp.status == 403
+        async with session.post(url, json=start_update(2)) as resp:
+            assert resp.status == 403
+        await asyncio.sleep(0.2)
+        assert "sendMessage" not in api.methods()
+
+    asyncio.run(run_scenario(check))
+
+
+def test_webhook_drops_unhandled_update_types():
+    """Update types outside allowed_updates are acknowledged but not processed"""
+    async def check(api, session, url):
+        update = start_update(3)
+        update["edited_message"] = update.pop("message")
+        async with session.post(url, json=update, headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        await asyncio.sleep(0.2)
+        assert "sendMessage" not in api.methods()
+
+    asyncio.run(run_scenario(check))
+
+
+def test_webhook_delivers_start_command():
+    """A valid /start update is fed into the Application and answered"""
+    async def check(api, session, url):
+        async with session.post(url, json=start_update(4), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        # Identity comes from the startup check, not a get_me per /start
+        assert api.methods().count("getMe") == 1
+
+    asyncio.run(run_scenario(check))
+
+
+def test_revoked_token_reported_on_start():
+    """A Forbidden recorded by the identity refresh is reported like an invalid token"""
+    import bot.main
+    from telegram.error import Forbidden
+
+    async def check(api, session, url):
+        bot.main.bot_identity.error = Forbidden("Forbidden: bot was kicked")
+        try:
+            async with session.post(url, json=start_update(5), headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+            assert await wait_for_call(api, "sendMessage")
+        finally:
+            bot.main.bot_identity.error = None
+        assert "Invalid bot token" in api.calls[-1][1]["text"]
+
+    asyncio.run(run_scenario(check))
+
+
+def test_repeated_tap_skips_identical_edit():
+    """Tapping the same button twice edits the message only once"""
+    async def check(api, session, url):
+        for update_id in (5, 6):
+            async with session.post(url, json=callback_update(update_id, "settings"),
+                                    headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+        deadline = time.monotonic() + 5
+        while api.methods().count("answerCallbackQuery") < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.2)
+        assert api.methods().count("answerCallbackQuery") == 2
+        assert api.methods().count("editMessageText") == 1
+        assert "sendMessage" not in api.methods()
+
+    asyncio.run(run_scenario(check))
+
+
+def test_job_wizard_survives_restart():
+    """A half-finished /postjob wizard continues after the bot restarts"""
+    async def first_run(api, session, url):
+        for update_id, text in ((20, "/postjob"), (21, "Designer")):
+            async with session.post(url, json=text_update(update_id, text), headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+            assert await wait_for_call(api, "sendMessage", count=update_id - 19)
+
+    async def second_run(api, session, url):
+        async with session.post(url, json=text_update(22, "Freelance"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        replies = [params["text"] for method, params in api.calls if method == "sendMessage"]
+        assert "Location" in replies[0]
+
+    asyncio.run(run_scenario(first_run))
+    asyncio.run(run_scenario(second_run))
+
+    import sqlite3
+    with sqlite3.connect(os.environ["USER_STATE_DB"]) as conn:
+        data = json.loads(conn.execute("SELECT data FROM ptb_user_data WHERE user_id = 42").fetchone()[0])
+    assert data["job_title"] == "Designer" and data["job_type"] == "Freelance"
+
+
+def test_user_state_not_evicted_before_commit():
+    """An entry drained into a slow flush stays cached until the flush commits"""
+    from bot.user_store import UserStore
+
+    async def check():
+        store = UserStore(os.path.join(tempfile.mkdtemp(), "user_state.db"), flush_interval=60, max_hot=10)
+        await store.start()
+        table = store.table("languages")
+        table[1] = "am"
+        write = store._write
+
+        def slow_write(upserts, deletes):
+            time.sleep(0.3)
+            write(upserts, deletes)
+
+        store._write = slow_write
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0.05)
+        for user_id in range(2, 40):    # misses that push the table over max_hot
+            table.get(user_id)
+        assert table.get(1) == "am"
+        await flush
+        for user_id in range(40, 80):
+            table.get(user_id)
+        assert 1 not in table._hot and table.get(1) == "am"
+        await store.stop()
+
+    asyncio.run(check())
+
+
+def test_search_command_pages_results():
+    """/search answers from the job store and the Next button edits in the second page"""
+    from bot.job_store import JobStore
+    store = JobStore(os.environ["JOBS_DB"])
+    store.add_many([{"job_title": f"Python Developer {n}", "company_name": "Acme", "work_location": "Remote"}
+                    for n in range(7)] + [{"job_title": "Accountant", "description": "Finance"}], source="test")
+    store.close()
+
+    async def check(api, session, url):
+        async with session.post(url, json=text_update(30, "/search pyth dev"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        params = dict(api.calls)["sendMessage"]
+        assert params["text"].count("Python Developer") == 5 and "Accountant" not in params["text"]
+        assert "search_page:1" in params["reply_markup"]
+
+        async with session.post(url, json=callback_update(31, "search_page:1"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "editMessageText")
+        params = dict(api.calls)["editMessageText"]
+        assert params["text"].count("Python Developer") == 2 and "search_page:0" in params["reply_markup"]
+
+    asyncio.run(run_scenario(check))
+
+
+def inline_update(update_id: int, query: str, offset: str = "") -> dict:
+    return {
+        "update_id": update_id,
+        "inline_query": {
+            "id": str(update_id),
+            "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+            "query": query,
+            "offset": offset,
+        },
+    }
+
+
+def test_inline_search_debounces_and_pages():
+    """Fast keystrokes get one answer; next_offset pages through the rest"""
+    from bot.job_store import JobStore
+    store = JobStore(os.environ["JOBS_DB"])
+    store.add_many([{"job_title": f"Kotlin Engineer {n}", "job_link": "https://example.com"} for n in range(25)],
+                   source="test")
+    store.close()
+
+    def answers(api):
+        return [params for method, params in api.calls if method == "answerInlineQuery"]
+
+    async def check(api, session, url):
+        for update_id, text in ((40, "kot"), (41, "Kotlin  eng")):
+            async with session.post(url, json=inline_update(update_id, text), headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+        assert await wait_for_call(api, "answerInlineQuery")
+        await asyncio.sleep(0.5)
+        assert len(answers(api)) == 1
+        first = answers(api)[0]
+        assert first["inline_query_id"] == "41" and first["next_offset"] == "20"
+        assert len(json.loads(first["results"])) == 20
+
+        async with session.post(url, json=inline_update(42, "kotlin eng", "20"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "answerInlineQuery", count=2)
+        second = answers(api)[1]
+        assert len(json.loads(second["results"])) == 5 and not second.get("next_offset")
+
+    asyncio.run(run_scenario(check))
+
+
+def test_job_alert_sent_for_matching_job():
+    """/alert subscribes; a new matching job is DMed to the user, a non-matching one is not"""
+    import bot.main
+    from bot.job_store import JobStore
+
+    async def check(api, session, url):
+        async with session.post(url, json=text_update(50, "/alert flutter | location: Remote"),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        assert "Alert saved" in dict(api.calls)["sendMessage"]["text"]
+
+        store = JobStore(os.environ["JOBS_DB"])
+        store.add({"job_title": "Flutter Developer", "work_location": "Bahir Dar"}, source="test")
+        store.add({"job_title": "Senior Flutter Developer", "work_location": "Remote",
+                   "job_link": "https://example.com/flutter"}, source="test")
+        store.close()
+        bot.main.job_alerts.poke()
+        assert await wait_for_call(api, "sendMessage", count=2)
+        await asyncio.sleep(0.3)
+        alerts = [params["text"] for method, params in api.calls
+                  if method == "sendMessage" and "New job matching" in params["text"]]
+        assert len(alerts) == 1 and "Senior Flutter Developer" in alerts[0]
+
+        # A link that is not a URL must not break the alert: it goes out without the button
+        store = JobStore(os.environ["JOBS_DB"])
+        store.add({"job_title": "Flutter Lead", "work_location": "Remote", "job_link": "apply in person"},
+                  source="test")
+        store.close()
+        bot.main.job_alerts.poke()
+        assert await wait_for_call(api, "sendMessage", count=3)
+        params = [params for method, params in api.calls if method == "sendMessage"][-1]
+        assert "Flutter Lead" in params["text"] and "reply_markup" not in params
+
+    asyncio.run(run_scenario(check))
+
+
+def test_import_jobs_from_csv():
+    """/importjobs + a CSV: valid rows are stored and posted, bad rows reported in the status message"""
+    from bot.job_store import JobStore
+
+    csv_file = (
+        "job_title,job_type,work_location,salary,deadline,description,client_type,company_name,job_link\n"
+        'Import Tester,Full-time,Remote,1000 ETB,2030-01-31,"Two lines\nof text",Private,Acme,acme.example/1\n'
+        "Broken Row,Part-time,Adama,500,next week,Desc,Other,Acme,acme.example/2\n"
+        "Second Tester,Freelance,Adama,800 ETB,2030-02-28,Short,Other,Beta,https://beta.example/2\n"
+    ).encode()
+
+    async def check(api, session, url):
+        api.files["import-1"] = csv_file
+        for update in (text_update(60, "/importjobs"), document_update(61, "import-1", "jobs.csv", len(csv_file))):
+            async with session.post(url, json=update, headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            edits = [params["text"] for method, params in api.calls if method == "editMessageText"]
+            if edits and "finished" in edits[-1]:
+                break
+            await asyncio.sleep(0.05)
+        assert "finished" in edits[-1]
+        assert "Stored: 2" in edits[-1] and "Skipped: 1" in edits[-1] and "Posted to channels: 2 of 2" in edits[-1]
+        assert "line 4: deadline: not a YYYY-MM-DD date" in edits[-1]  # row 1 spans two lines
+        posts = [params["text"] for method, params in api.calls
+                 if method == "sendMessage" and "New Job Posted" in params["text"]]
+        assert len(posts) == 2 and "Import Tester" in posts[0]
+
+        store = JobStore(os.environ["JOBS_DB"])
+        results, _ = store.search("tester")
+        store.close()
+        assert {job["job_title"] for job in results} >= {"Import Tester", "Second Tester"}
+
+    asyncio.run(run_scenario(check))
+
+
+def test_expired_channel_post_is_closed():
+    """A recorded channel post past its deadline is edited to its closed form; a live one is left alone"""
+    import bot.main
+    from bot.job_store import JobStore
+
+    job = {"job_title": "Expiring Job", "job_type": "Contract", "work_location": "Remote", "salary": "1",
+           "deadline": "2020-01-01", "description": "d", "client_type": "Private", "company_name": "Acme",
+           "verified": "No", "previous_jobs": "None", "job_link": "https://example.com/expiring"}
+
+    async def check(api, session, url):
+        store = JobStore(os.environ["JOBS_DB"])
+        expired_id = store.add(job, source="test")
+        live_id = store.add(dict(job, job_title="Live Job", deadline="2099-01-01"), source="test")
+        store.add_posts(expired_id, [("-100777", 501)], time.time() - 60)
+        store.add_posts(live_id, [("-100777", 502)], time.time() + 3600)
+        # The timer runs on the JobQueue of python-telegram-bot[job-queue] (requirements.txt)
+        assert bot.main.post_expiry._job_queue is not None
+        bot.main.post_expiry.poke()
+        assert await wait_for_call(api, "editMessageText")
+        await asyncio.sleep(0.3)
+        edits = [params for method, params in api.calls if method == "editMessageText"]
+        assert len(edits) == 1
+        assert edits[0]["chat_id"] == "-100777" and edits[0]["message_id"] == "501"
+        assert "Closed" in edits[0]["text"] and "Expiring Job" in edits[0]["text"]
+        assert [post["message_id"] for post in store.pending_posts() if post["chat_id"] == "-100777"] == [502]
+        store.close()
+
+    asyncio.run(run_scenario(check))
+
+
+def test_digest_mode_batches_jobs():
+    """Queued jobs go out as one channel digest with deep links; a deep link opens the job in the bot"""
+    import bot.main
+    from bot.job_store import JobStore
+    from bot.job_digest import render_digest, MESSAGE_LIMIT
+
+    jobs = [{"id": n, "job_title": f"Digest Job {n}", "company_name": "Acme", "work_location": "Remote",
+             "description": "x" * 50, "deadline": "2099-01-01", "job_link": "https://example.com"} for n in range(60)]
+    pages = render_digest(jobs, lambda job: f"https://t.me/bot?start=job_{job['id']}")
+    assert len(pages) == 3 and all(len(text) <= MESSAGE_LIMIT and len(buttons) <= 20 for text, buttons in pages)
+    assert pages[1][0].startswith("📢 New jobs on HustleX (2/3)")
+
+    async def check(api, session, url):
+        store = JobStore(os.environ["JOBS_DB"])
+        ids = [store.add(dict(job, job_title=f"Digest Job {n}", job_type="Contract", salary="1",
+                              client_type="Private", verified="No", previous_jobs="None"), source="test")
+               for n, job in enumerate(jobs[:3])]
+        store.queue_digest(ids)
+        store.close()
+        bot.main.job_digest.poke()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            digests = [params for method, params in api.calls
+                       if method == "sendMessage" and params["text"].startswith("📢 New jobs on HustleX")]
+            if digests:
+                break
+            await asyncio.sleep(0.02)
+        assert len(digests) == 1 and "3. Digest Job 2 — Acme · Remote" in digests[0]["text"]
+        buttons = [row[0]["url"] for row in json.loads(digests[0]["reply_markup"])["inline_keyboard"]]
+        assert buttons == [f"https://t.me/HustleXet_bot?start=job_{job_id}" for job_id in ids]
+
+        calls = len(api.calls)
+        async with session.post(url, json=text_update(70, f"/start job_{ids[1]}"),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=api.methods().count("sendMessage") + 1)
+        assert "Digest Job 1" in api.calls[calls:][-1][1]["text"]
+
+    previous = bot.main.DIGEST_INTERVAL_MINUTES, bot.main.job_digest.max_jobs
+    bot.main.DIGEST_INTERVAL_MINUTES, bot.main.job_digest.max_jobs = 60, 3
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        bot.main.DIGEST_INTERVAL_MINUTES, bot.main.job_digest.max_jobs = previous
+
+
+def test_digest_jobs_stay_queued_until_posted():
+    """A digest the channel did not get leaves its jobs queued; they go out after the backoff"""
+    import bot.main
+    from bot.job_store import JobStore
+
+    def digests(api):
+        return [params for method, params in api.calls
+                if method == "sendMessage" and params["text"].startswith("📢 New jobs on HustleX")]
+
+    async def check(api, session, url):
+        store = JobStore(os.environ["JOBS_DB"])
+        ids = [store.add({"job_title": f"Retry Job {n}", "job_link": "https://example.com"}, source="test")
+               for n in range(2)]
+        api.channel_failures = 1
+        store.queue_digest(ids)
+        bot.main.job_digest.poke()
+        deadline = time.monotonic() + 5
+        while not digests(api) and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.1)
+        assert len(digests(api)) == 1 and store.digest_backlog()[0] == 2
+
+        bot.main.job_digest.poke()      # still backing off: nothing is sent
+        await asyncio.sleep(0.1)
+        assert len(digests(api)) == 1
+
+        await asyncio.sleep(0.5)
+        bot.main.job_digest.poke()
+        deadline = time.monotonic() + 5
+        while store.digest_backlog()[0] and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        assert len(digests(api)) == 2 and "2. Retry Job 1" in digests(api)[1]["text"]
+        assert store.digest_backlog()[0] == 0
+        store.close()
+
+    digest = bot.main.job_digest
+    previous = bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs, digest.retry_backoff
+    bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs, digest.retry_backoff = 60, 2, 0.5
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs, digest.retry_backoff = previous
+
+
+def test_digest_not_blocked_by_a_channel_that_always_fails():
+    """Jobs for a channel the bot was removed from leave the queue instead of holding up later jobs"""
+    import bot.main
+    from bot.job_store import JobStore
+
+    def digests(api):
+        return [params for method, params in api.calls
+                if method == "sendMessage" and params["text"].startswith("📢 New jobs on HustleX")]
+
+    async def check(api, session, url):
+        store = JobStore(os.environ["JOBS_DB"])
+        api.channel_error = (403, "Forbidden: bot was kicked from the channel chat")
+        store.queue_digest([store.add({"job_title": f"Stuck Job {n}"}, source="test") for n in range(2)])
+        bot.main.job_digest.poke()
+        deadline = time.monotonic() + 5
+        while store.digest_backlog()[0] and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        assert store.digest_backlog()[0] == 0 and len(digests(api)) == 1
+
+        api.channel_error = None
+        bot.main.channel_states.invalidate(os.environ.get("CHANNEL_ID", bot.main.CHANNEL_ID))
+        store.queue_digest([store.add({"job_title": f"Fresh Job {n}"}, source="test") for n in range(2)])
+        bot.main.job_digest.poke()
+        deadline = time.monotonic() + 5
+        while store.digest_backlog()[0] and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        assert store.digest_backlog()[0] == 0 and "Fresh Job 1" in digests(api)[-1]["text"]
+        store.close()
+
+    digest = bot.main.job_digest
+    previous = bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs
+    bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs = 60, 2
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        bot.main.DIGEST_INTERVAL_MINUTES, digest.max_jobs = previous
+
+
+def test_cv_upload_is_deduplicated_and_refcounted():
+    """CVs are stored once per content; removing one user's CV keeps the file for the others"""
+    import bot.main
+    from bot.cv_store import CVStore
+
+    content = b"%PDF-1.4 " + os.urandom(200_000)
+
+    async def chunks(data):
+        for start in range(0, len(data), 65536):
+            yield data[start:start + 65536]
+
+    async def check(api, session, url):
+        api.files["cv-1"] = content
+        api.files["cv-big"] = content * 2
+        async with session.post(url, json=document_update(80, "cv-1", "cv.pdf", len(content)),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        assert "CV Upload Successful" in api.calls[-1][1]["text"]
+
+        store = CVStore(os.environ["CV_STORE_DIR"])
+        mine = store.get("tg:42")
+        with open(mine["path"], "rb") as f:
+            assert f.read() == content
+        other = await store.put("tg:99", chunks(content), filename="my_cv.pdf")
+        assert other["sha256"] == mine["sha256"]
+        assert store.stats()["files"] == 1 and store.stats()["owners"] == 2
+
+        async with session.post(url, json=callback_update(81, "cv_remove"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "editMessageText")
+        assert store.get("tg:42") is None and os.path.exists(mine["path"])
+        assert store.release("tg:99") and not os.path.exists(mine["path"])
+
+        # Past the limit while streaming: rejected, nothing kept
+        bot.main.cv_store.max_bytes = len(content) + 1
+        async with session.post(url, json=document_update(82, "cv-big", "big.pdf", 0),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=api.methods().count("sendMessage") + 1)
+        assert "CV Too Large" in [params for method, params in api.calls if method == "sendMessage"][-1]["text"]
+        assert store.get("tg:42") is None and store.stats()["files"] == 0
+        assert os.listdir(os.path.join(os.environ["CV_STORE_DIR"], "tmp")) == []
+        store.close()
+
+    max_bytes = bot.main.cv_store.max_bytes
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        bot.main.cv_store.max_bytes = max_bytes
+
+
+def test_cv_text_extracted_off_loop():
+    """Uploaded CVs are read in the worker processes; the skills show in the CV view and are searchable"""
+    import io
+    import zipfile
+    from bot.cv_store import CVStore
+
+    paragraphs = ["Abebe Kebede", "Accountant, 5 years", "Skills: Excel, QuickBooks, Python and SQL"]
+    document = ('<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+                + "".join(f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>" for text in paragraphs)
+                + "</w:body></w:document>")
+    docx = io.BytesIO()
+    with zipfile.ZipFile(docx, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+    async def check(api, session, url):
+        api.files["cv-docx"] = docx.getvalue()
+        async with session.post(url, json=document_update(90, "cv-docx", "abebe.docx", len(docx.getvalue())),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+
+        store = CVStore(os.environ["CV_STORE_DIR"])
+        deadline = time.monotonic() + 30
+        while store.text_for("tg:42") is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        extracted = store.text_for("tg:42")
+        assert extracted and extracted["error"] is None
+        assert extracted["skills"] == ["excel", "python", "quickbooks", "sql"]
+        assert store.search("quickbooks accountant") == ["tg:42"]
+        assert store.search("java") == []
+
+        async with session.post(url, json=callback_update(91, "cv_view"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "editMessageText")
+        assert "Skills found:* excel" in api.calls[-1][1]["text"]
+        store.close()
+
+        # Approved employers find the CV with /cvsearch
+        for update_id, text in ((92, "/cvsearch QuickBooks accountant"), (93, "/cvsearch java")):
+            async with session.post(url, json=text_update(update_id, text), headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=3)
+        found, missing = [params["text"] for method, params in api.calls if method == "sendMessage"][1:]
+        assert "tg://user?id=42" in found and "excel, python, quickbooks, sql" in found
+        assert missing == "No CVs mention all of: java"
+
+    asyncio.run(run_scenario(check))
+
+
+def test_profile_edits_are_coalesced_and_retried():
+    """Rapid profile edits reach the API as one signed multipart request, retried after a 503"""
+    import hashlib
+    import hmac
+    import urllib.parse
+    import bot.main
+
+    async def check(api, session, url):
+        bot.main.PROFILE_API_URL = f"http://127.0.0.1:{api.port}/api/profile"
+        api.files["photo-1"] = b"\xff\xd8 fake jpeg"
+        api.profile_failures = 1
+        sync = bot.main.profile_sync
+        profile = {"custom_name": "Abebe"}
+        for field, value in (("contact_info", "@abebe"), ("age", 27), ("profile_pic_file_id", "photo-1"),
+                             ("custom_name", "Abebe K.")):
+            profile[field] = value
+            assert await bot.main.save_profile_to_api(42, profile)
+        assert sync.coalesced == 3 and api.profiles == []
+
+        deadline = time.monotonic() + 10
+        while sync.sent < 1 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert sync.sent == 1 and sync.retries == 1 and len(api.profiles) == 2
+        fields = api.profiles[-1]
+        assert (fields["name"], fields["age"], fields["contact_info"]) == ("Abebe K.", "27", "@abebe")
+        assert fields["profile_pic"] == api.files["photo-1"]
+
+        # The initData passes api/main.py's check with the bot's token
+        params = dict(urllib.parse.parse_qsl(fields["init_data"]))
+        received = params.pop("hash")
+        check_string = "\n".join(f"{k}={v}" for k, v in sorted(params.items()))
+        secret = hashlib.sha256(FAKE_TOKEN.encode()).digest()
+        assert hmac.new(secret, check_string.encode(), hashlib.sha256).hexdigest() == received
+        assert params["user_id"] == "42"
+
+        # Unchanged picture is not uploaded again
+        profile["age"] = 28
+        await bot.main.save_profile_to_api(42, profile)
+        while sync.sent < 2 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert api.profiles[-1]["age"] == "28" and "profile_pic" not in api.profiles[-1]
+
+    settings = (bot.main.PROFILE_API_URL, bot.main.profile_sync.delay, bot.main.profile_sync.backoff)
+    bot.main.PROFILE_API_URL = "http://127.0.0.1/api/profile"
+    bot.main.profile_sync.delay, bot.main.profile_sync.backoff = 0.3, 0.1
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        bot.main.PROFILE_API_URL, bot.main.profile_sync.delay, bot.main.profile_sync.backoff = settings
+
+
+def test_one_message_job_asks_only_for_what_is_missing():
+    """/postjob with a filled-in template: one pass, then only the bad and missing fields are asked for"""
+    template = (
+        "/postjob\n"
+        "Job Title: Template Tester\n"
+        "Tipo de empleo: Full-time\n"
+        "*Location:* Hawassa\n"
+        "Salary: 9000 ETB\n"
+        "Deadline: next Friday\n"
+        "Description: Keeps the books.\n"
+        "\n"
+        "Must know: Peachtree\n"
+        "Client Type: Private\n"
+        "Vérifiée: oui\n"
+        "Job Link: template.example/jobs/7\n"
+    )
+
+    def replies(api):
+        return [params["text"] for method, params in api.calls if method == "sendMessage"]
+
+    async def check(api, session, url):
+        async def say(update_id, text, count):
+            async with session.post(url, json=text_update(update_id, text), headers={SECRET_HEADER: SECRET}) as resp:
+                assert resp.status == 200
+            assert await wait_for_call(api, "sendMessage", count=count)
+            return replies(api)[count - 1]
+
+        reply = await say(95, template, 1)
+        assert "Got 9 of 11 fields" in reply
+        assert "Deadline: not a YYYY-MM-DD date" in reply and "Company Name: missing" in reply
+        assert reply.endswith("Enter Deadline (YYYY-MM-DD):")
+        assert "Deadline: not a YYYY-MM-DD date" in await say(96, "soon", 2)
+        assert await say(97, "2030-03-31", 3) == "Enter Company Name:"
+        await say(98, "Gamma PLC", 4)
+        assert await wait_for_call(api, "sendMessage", count=5)
+        post = next(text for text in replies(api) if "New Job Posted" in text)
+        assert "Template Tester" in post and "Gamma PLC" in post and "Must know: Peachtree" in post
+        assert "2030\\-03\\-31" in post
+
+    asyncio.run(run_scenario(check))
+
+
+def web_app_data_update(update_id: int, data: str) -> dict:
+    update = text_update(update_id, "")
+    del update["message"]["text"]
+    update["message"]["web_app_data"] = {"data": data, "button_text": "Post Job via Website"}
+    return update
+
+
+def test_web_app_job_is_posted_in_one_step():
+    """A complete job from the WebApp form is posted at once; a bad field is asked for in the chat"""
+    import bot.main
+    job = {
+        "job_title": "WebApp Tester", "job_type": "Contract", "work_location": "Remote", "salary": "Negotiable",
+        "deadline": "2030-04-30", "description": "Sent with sendData", "client_type": "Startup",
+        "company_name": "Delta", "verified": "✅", "job_link": "https://delta.example/jobs/1",
+    }
+
+    def replies(api):
+        return [params for method, params in api.calls if method == "sendMessage"]
+
+    async def check(api, session, url):
+        async with session.post(url, json=text_update(99, "/postjob"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage")
+        keyboard = json.loads(replies(api)[0]["reply_markup"])["keyboard"]
+        assert keyboard[0][0]["web_app"]["url"].startswith("https://")
+
+        async with session.post(url, json=web_app_data_update(100, json.dumps(job)),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=2)
+        post = replies(api)[1]
+        assert "New Job Posted" in post["text"] and "WebApp Tester" in post["text"]
+        assert "delta.example/jobs/1" in post["reply_markup"]
+        assert await wait_for_call(api, "sendMessage", count=3)
+        assert "posted successfully" in replies(api)[2]["text"]
+
+        # Same rules as the wizard's one-message path: only the bad field is asked for
+        async with session.post(url, json=web_app_data_update(101, json.dumps(dict(job, deadline="someday"))),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        count = len(replies(api)) + 1
+        assert await wait_for_call(api, "sendMessage", count=count)
+        assert "Got 10 of 11 fields" in replies(api)[count - 1]["text"]
+
+        async with session.post(url, json=web_app_data_update(102, "not json"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=count + 1)
+        assert "could not be read" in replies(api)[count]["text"]
+
+        # The form button is left out while the prober finds the page down
+        for _ in range(prober.fail_threshold):
+            prober.record(bot.main.WEBAPP_URL, False)
+        async with session.post(url, json=text_update(103, "/postjob"), headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", count=count + 2)
+        prompt = replies(api)[count + 1]
+        assert "Job Title" in prompt["text"] and "reply_markup" not in prompt
+
+    # The tests cannot reach the real WebApp host: report it up until the check above
+    prober = bot.main.webapp_prober
+    check_url = prober.check
+
+    async def reachable(url):
+        return True
+
+    prober.check = reachable
+    for _ in range(prober.recover_threshold):
+        prober.record(bot.main.WEBAPP_URL, True)
+    try:
+        asyncio.run(run_scenario(check))
+    finally:
+        prober.check = check_url
+
+
+def test_timed_out_channel_post_is_not_sent_again():
+    """A channel post that timed out may have gone out: it is reported, not retried automatically"""
+    job = {
+        "job_title": "Timeout Tester", "job_type": "Contract", "work_location": "Remote", "salary": "1",
+        "deadline": "2030-05-31", "description": "Slow channel", "client_type": "Startup",
+        "company_name": "Epsilon", "verified": "No", "job_link": "https://epsilon.example/1",
+    }
+
+    def channel_posts(api):
+        return [params for method, params in api.calls
+                if method == "sendMessage" and params["chat_id"].startswith("-")]
+
+    async def check(api, session, url):
+        api.channel_stalls = 1
+        async with session.post(url, json=web_app_data_update(110, json.dumps(job)),
+                                headers={SECRET_HEADER: SECRET}) as resp:
+            assert resp.status == 200
+        assert await wait_for_call(api, "sendMessage", timeout=15)
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            report = [params["text"] for method, params in api.calls
+                      if method == "sendMessage" and "Failed to post job" in params["text"]]
+            if report:
+                break
+            await asyncio.sleep(0.05)
+        assert report and "check the channel before retrying" in report[0]
+        await asyncio.sleep(0.5)
+        assert len(channel_posts(api)) == 1
+
+    asyncio.run(run_scenario(check))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for test in (test_webhook_registered_with_secret_and_filter, test_webhook_rejects_bad_secret,
+                 test_webhook_drops_unhandled_update_types, test_webhook_delivers_start_command,
+                 test_revoked_token_reported_on_start,
+                 test_repeated_tap_skips_identical_edit, test_job_wizard_survives_restart,
+                 test_user_state_not_evicted_before_commit,
+                 test_search_command_pages_results, test_inline_search_debounces_and_pages,
+                 test_job_alert_sent_for_matching_job, test_import_jobs_from_csv,
+                 test_expired_channel_post_is_closed, test_digest_mode_batches_jobs,
+                 test_digest_jobs_stay_queued_until_posted, test_digest_not_blocked_by_a_channel_that_always_fails,
+                 test_cv_upload_is_deduplicated_and_refcounted, test_cv_text_extracted_off_loop,
+                 test_profile_edits_are_coalesced_and_retried, test_one_message_job_asks_only_for_what_is_missing,
+                 test_web_app_job_is_posted_in_one_step, test_timed_out_channel_post_is_not_sent_again):
+        test()
+        print(f"✅ {test.__name__}")